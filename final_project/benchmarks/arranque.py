@@ -0,0 +1,121 @@
+"""
+Benchmark de arranque en frío del dashboard
+
+Lanza varios procesos nuevos que importan dashboards/app.py con el perfil
+de arranque activo (sin precarga ni recarga en segundo plano), piden el
+layout y el primer callback del tab Overview, y resume la mediana de cada
+fase. Termina con código 1 si la mediana hasta el primer callback supera
+el presupuesto: así una regresión en el arranque se ve en CI.
+
+Uso (desde final_project/):
+    python benchmarks/arranque.py                   # 5 repeticiones, presupuesto 3 s
+    python benchmarks/arranque.py --repeticiones 10 --presupuesto 2.5 --json arranque.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DIR_PROYECTO = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+DIR_DASHBOARD = os.path.join(DIR_PROYECTO, 'dashboards')
+
+# Se ejecuta en cada proceso nuevo: layout y primer callback del Overview
+PROGRAMA = """
+import app
+
+cliente = app.app.server.test_client()
+cliente.get('/_dash-layout')
+salida = next(k for k in app.app.callback_map if 'graph-temporal-overview' in k)
+respuesta = cliente.post('/_dash-update-component', json={
+    'output': salida,
+    'outputs': [dict(zip(('id', 'property'), o.split('.'))) for o in salida.strip('.').split('...')],
+    'inputs': [
+        {'id': 'tabs', 'property': 'active_tab', 'value': 'tab-overview'},
+        {'id': 'dataset-selector', 'property': 'value', 'value': ['academica']},
+    ],
+    'changedPropIds': ['tabs.active_tab'],
+    'state': [],
+})
+assert respuesta.status_code == 200, respuesta.status_code
+"""
+
+
+def ejecutar_arranque():
+    """Un arranque en un proceso nuevo: reporte del perfil y tiempo de reloj del proceso completo"""
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_reporte = os.path.join(directorio, 'arranque.json')
+        entorno = {
+            **os.environ,
+            'DASHBOARD_PERFIL_ARRANQUE': ruta_reporte,
+            'DASHBOARD_PRECARGA': '0',
+            'DASHBOARD_RECARGA_SEG': '0',
+            # Caché de figuras vacía en cada arranque
+            'DASHBOARD_CACHE_DIR': os.path.join(directorio, 'cache'),
+        }
+        entorno.pop('DASHBOARD_SEGMENTOS_DIR', None)
+
+        inicio = time.perf_counter()
+        subprocess.run(
+            [sys.executable, '-c', PROGRAMA], cwd=DIR_DASHBOARD, env=entorno,
+            check=True, stdout=subprocess.DEVNULL
+        )
+        proceso_ms = (time.perf_counter() - inicio) * 1000
+
+        with open(ruta_reporte, encoding='utf-8') as archivo:
+            reporte = json.load(archivo)
+    reporte['proceso_ms'] = round(proceso_ms, 2)
+    return reporte
+
+
+def resumir(reportes):
+    """Mediana por fase (sumando las llamadas repetidas de una fase dentro de un arranque)"""
+    por_fase = {}
+    for reporte in reportes:
+        totales = {}
+        for fase in reporte['fases']:
+            totales[fase['fase']] = totales.get(fase['fase'], 0.0) + fase['duracion_ms']
+        for nombre, duracion in totales.items():
+            por_fase.setdefault(nombre, []).append(duracion)
+
+    return {
+        'repeticiones': len(reportes),
+        'fases_ms': {nombre: round(statistics.median(v), 2) for nombre, v in por_fase.items()},
+        'hasta_primer_callback_ms': round(statistics.median(r['hasta_primer_callback_ms'] for r in reportes), 2),
+        'proceso_ms': round(statistics.median(r['proceso_ms'] for r in reportes), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide el arranque en frío del dashboard hasta el primer callback")
+    parser.add_argument('--repeticiones', type=int, default=5, help="Procesos a lanzar (se reporta la mediana)")
+    parser.add_argument('--presupuesto', type=float, default=3.0,
+                        help="Segundos máximos hasta el primer callback (mediana)")
+    parser.add_argument('--json', help="Ruta donde guardar el resumen y los reportes de cada arranque")
+    args = parser.parse_args()
+
+    reportes = [ejecutar_arranque() for _ in range(args.repeticiones)]
+    resumen = resumir(reportes)
+    resumen['presupuesto_ms'] = args.presupuesto * 1000
+
+    for nombre, duracion in sorted(resumen['fases_ms'].items(), key=lambda f: -f[1]):
+        print(f"{nombre:<32} {duracion:>10.1f} ms")
+    print(f"{'hasta el primer callback':<32} {resumen['hasta_primer_callback_ms']:>10.1f} ms")
+    print(f"{'proceso completo':<32} {resumen['proceso_ms']:>10.1f} ms")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as archivo:
+            json.dump({**resumen, 'arranques': reportes}, archivo, ensure_ascii=False, indent=2)
+
+    if resumen['hasta_primer_callback_ms'] > resumen['presupuesto_ms']:
+        print(f"✗ Arranque fuera del presupuesto ({args.presupuesto:.1f} s)")
+        sys.exit(1)
+    print(f"✓ Arranque dentro del presupuesto ({args.presupuesto:.1f} s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,381 @@
+"""
+Benchmark de los callbacks del dashboard a distintas escalas de datos
+
+Para cada escala (1x, 10x, 100x y 1000x las filas de los datasets
+procesados) genera un directorio de datos con los CSV replicados y lanza
+un proceso nuevo que importa dashboards/app.py sobre ese directorio
+(DASHBOARD_DATOS_DIR) e invoca directamente cada callback, sin navegador
+ni caché de figuras, para todas las combinaciones de `dataset-selector` y
+valores representativos de los filtros. Por callback y escala reporta
+percentiles de latencia, memoria pico (tracemalloc) y tamaño de la
+respuesta serializada.
+
+El resultado se escribe en JSON y se compara con una línea base guardada:
+el proceso termina con código 1 si la mediana de algún callback empeora
+más que el umbral. Cada proceso mide también una carga de referencia fija
+(pandas, numpy y JSON) y la comparación usa la mediana relativa a esa
+referencia, así que un host más lento o más cargado que el de la línea
+base no cuenta como regresión.
+
+Uso (desde final_project/):
+    python benchmarks/callbacks.py                            # 1x 10x 100x 1000x
+    python benchmarks/callbacks.py --escalas 1 10 --json resultado.json
+    python benchmarks/callbacks.py --escalas 1 10 --guardar-linea-base
+"""
+
+import argparse
+import inspect
+import itertools
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+DIR_PROYECTO = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+DIR_DASHBOARD = os.path.join(DIR_PROYECTO, 'dashboards')
+DIR_DATOS = os.path.join(DIR_PROYECTO, 'data')
+LINEA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'linea_base_callbacks.json')
+
+ESCALAS = [1, 10, 100, 1000]
+# Datasets procesados que se replican en cada escala (el resto se copia tal cual)
+DATASETS_ESCALADOS = [
+    'desercion_academica_clean.csv',
+    'desercion_no_academica_clean.csv',
+    'desercion_sena_clean.csv',
+]
+DATASETS = ['academica', 'no_academica', 'sena']
+TABS = ['tab-overview', 'tab-demografico', 'tab-academico', 'tab-metricas', 'tab-predictor']
+
+# Valores de las entradas que no son tab ni selección de datasets; los
+# filtros se prueban sin filtrar ('all') y con un valor concreto
+FILTROS = {
+    'filter-genero': 'F',
+    'filter-edad': '21-25',
+    'filter-estrato': '2',
+    'filter-facultad': None,  # primera facultad de los datos
+    'filter-modalidad': 'PRESENCIAL',
+    'filter-jornada': 'DIURNA',
+}
+ENTRADAS_PREDICTOR = {
+    'btn-predecir': 1,
+    'input-edad': 20,
+    'input-genero': 'M',
+    'input-estrato': 2,
+    'input-modalidad': 'VIRTUAL',
+    'input-jornada': 'NOCTURNA',
+}
+
+
+# ---------------------------------------------------------------------
+# Datos escalados
+# ---------------------------------------------------------------------
+
+def preparar_datos(escala, destino):
+    """Copia data/ en `destino` con los datasets procesados replicados `escala` veces"""
+    import pandas as pd
+
+    for subdirectorio in ('processed', 'bi'):
+        origen = os.path.join(DIR_DATOS, subdirectorio)
+        os.makedirs(os.path.join(destino, subdirectorio), exist_ok=True)
+        for nombre in os.listdir(origen):
+            if not nombre.endswith('.csv'):
+                continue
+            ruta = os.path.join(origen, nombre)
+            salida = os.path.join(destino, subdirectorio, nombre)
+            if subdirectorio == 'processed' and nombre in DATASETS_ESCALADOS and escala > 1:
+                df = pd.read_csv(ruta)
+                pd.concat([df] * escala, ignore_index=True).to_csv(salida, index=False)
+            else:
+                shutil.copyfile(ruta, salida)
+    return destino
+
+
+# ---------------------------------------------------------------------
+# Ejecución en el proceso de cada escala
+# ---------------------------------------------------------------------
+
+def combinaciones_datasets():
+    """Todas las selecciones no vacías de `dataset-selector`"""
+    return [
+        list(seleccion)
+        for n in range(1, len(DATASETS) + 1)
+        for seleccion in itertools.combinations(DATASETS, n)
+    ]
+
+
+def escenarios(funcion, entradas, valores_filtros):
+    """Argumentos de cada invocación representativa de un callback"""
+    ids = [f"{e['id']}.{e['property']}" for e in entradas]
+    # Los callbacks de un tab solo responden a ese tab
+    if 'tabs.active_tab' not in ids:
+        # Sin el tab como entrada, todos los tabs darían el mismo escenario
+        tabs = [None]
+    else:
+        tabs = [tab for tab in TABS if tab.split('-')[1] in funcion.__name__] or TABS
+    selecciones = combinaciones_datasets() if 'dataset-selector.value' in ids else [None]
+    con_filtros = any(e['id'] in FILTROS for e in entradas)
+
+    for tab, seleccion, filtrado in itertools.product(tabs, selecciones, [False, True] if con_filtros else [False]):
+        argumentos = []
+        for entrada in entradas:
+            if entrada['id'] == 'tabs':
+                argumentos.append(tab)
+            elif entrada['id'] == 'dataset-selector':
+                argumentos.append(seleccion)
+            elif entrada['id'] in FILTROS:
+                argumentos.append(valores_filtros[entrada['id']] if filtrado else 'all')
+            else:
+                argumentos.append(ENTRADAS_PREDICTOR.get(entrada['id']))
+        yield {'tab': tab, 'datasets': seleccion, 'filtrado': filtrado}, argumentos
+
+
+def percentil(valores, q):
+    ordenados = sorted(valores)
+    if not ordenados:
+        return None
+    posicion = (len(ordenados) - 1) * q / 100
+    inferior = int(posicion)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicion - inferior)
+
+
+def carga_referencia():
+    """Trabajo fijo de pandas, numpy y JSON, parecido al de los callbacks"""
+    import numpy as np
+    import pandas as pd
+
+    generador = np.random.default_rng(0)
+    n = 200_000
+    df = pd.DataFrame({
+        'anio': generador.integers(2015, 2025, n),
+        'categoria': pd.Categorical(generador.choice(list('abcdefgh'), n)),
+        'valor': generador.random(n),
+    })
+    tabla = df.groupby(['anio', 'categoria'], observed=True)['valor'].agg(['sum', 'mean', 'count'])
+    return json.dumps(tabla.reset_index().to_dict('list'), default=str)
+
+
+def medir_referencia(repeticiones=7):
+    """Tiempos en ms de la carga de referencia en este proceso (tras una ejecución de calentamiento)"""
+    carga_referencia()
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        carga_referencia()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+
+def medir_escala(repeticiones):
+    """Invoca cada callback de app.py sobre los datos de DASHBOARD_DATOS_DIR"""
+    sys.path.insert(0, DIR_DASHBOARD)
+    import app
+    from dash.exceptions import PreventUpdate
+    from serializacion import serializar_salida
+
+    inicio = time.perf_counter()
+    procesados = app.datos.cargar('procesados')
+    carga_ms = (time.perf_counter() - inicio) * 1000
+    filas = {nombre: len(procesados[nombre]) for nombre in DATASETS if nombre in procesados}
+
+    indice = app.indice_datasets(DATASETS)
+    facultades = indice.valores('nombre_facultad') if indice is not None else []
+    valores_filtros = {**FILTROS, 'filter-facultad': facultades[0] if facultades else 'all'}
+
+    # La referencia se mide antes y después de los callbacks para cubrir cambios de carga del host
+    referencia = medir_referencia()
+
+    resultados = []
+    for entrada in app.app.callback_map.values():
+        # Los callbacks del navegador (clientside) no tienen función en el servidor
+        if 'callback' not in entrada:
+            continue
+        # Función original del callback, sin la caché de figuras ni las métricas
+        funcion = inspect.unwrap(entrada['callback'])
+        entradas = entrada['inputs'] + entrada.get('state', [])
+
+        latencias, memoria, tamanos, omitidos = [], [], [], 0
+        for escenario, argumentos in escenarios(funcion, entradas, valores_filtros):
+            try:
+                # Una pasada con tracemalloc para la memoria pico y el tamaño de la respuesta
+                tracemalloc.start()
+                respuesta = funcion(*argumentos)
+                memoria.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+                tamanos.append(len(serializar_salida(respuesta)))
+
+                for _ in range(repeticiones):
+                    inicio = time.perf_counter()
+                    funcion(*argumentos)
+                    latencias.append((time.perf_counter() - inicio) * 1000)
+            except PreventUpdate:
+                tracemalloc.stop()
+                omitidos += 1
+
+        resultados.append({
+            'callback': funcion.__name__,
+            'invocaciones': len(latencias),
+            'omitidas': omitidos,
+            'p50_ms': percentil(latencias, 50),
+            'p95_ms': percentil(latencias, 95),
+            'p99_ms': percentil(latencias, 99),
+            'max_ms': max(latencias, default=None),
+            'memoria_pico_mb': max(memoria, default=0) / 2**20,
+            'bytes_p50': percentil(tamanos, 50),
+            'bytes_max': max(tamanos, default=None),
+        })
+
+    referencia += medir_referencia()
+    return {
+        'filas': filas,
+        'carga_procesados_ms': carga_ms,
+        'referencia_ms': percentil(referencia, 50),
+        'callbacks': resultados,
+    }
+
+
+def ejecutar_escala(escala, repeticiones):
+    """Prepara los datos de una escala y la mide en un proceso nuevo"""
+    with tempfile.TemporaryDirectory(prefix=f"bench_{escala}x_") as directorio:
+        preparar_datos(escala, directorio)
+        entorno = {
+            **os.environ,
+            'DASHBOARD_DATOS_DIR': directorio,
+            'DASHBOARD_PRECARGA': '0',
+            'DASHBOARD_RECARGA_SEG': '0',
+            'DASHBOARD_METRICAS': '0',
+        }
+        for variable in ('DASHBOARD_SEGMENTOS_DIR', 'DASHBOARD_CACHE_DIR', 'DASHBOARD_PERFIL_ARRANQUE'):
+            entorno.pop(variable, None)
+
+        proceso = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--trabajador', '--repeticiones', str(repeticiones)],
+            cwd=DIR_DASHBOARD, env=entorno, check=True, capture_output=True, text=True
+        )
+    # La última línea de la salida es el resultado (antes puede haber avisos del dashboard)
+    return json.loads(proceso.stdout.strip().splitlines()[-1])
+
+
+# ---------------------------------------------------------------------
+# Comparación con la línea base
+# ---------------------------------------------------------------------
+
+def comparar(resultado, linea_base, umbral, minimo_ms):
+    """Cociente de la mediana actual frente a la línea base por escala y callback
+
+    La mediana de la línea base se escala por el cociente entre la carga de
+    referencia de esta ejecución y la de la línea base (la velocidad relativa
+    del host). Un callback empeora si supera el umbral frente a esa mediana
+    esperada y además tarda al menos `minimo_ms` más (el ruido de los
+    callbacks de microsegundos no cuenta).
+    """
+    escalas_base = linea_base.get('escalas', {})
+    base = {
+        (escala, c['callback']): c
+        for escala, datos in escalas_base.items()
+        for c in datos['callbacks']
+    }
+    comparacion = []
+    for escala, datos in resultado['escalas'].items():
+        referencia_base = escalas_base.get(escala, {}).get('referencia_ms')
+        factor = datos['referencia_ms'] / referencia_base if referencia_base else 1.0
+        for callback in datos['callbacks']:
+            referencia = base.get((escala, callback['callback']))
+            if referencia is None or not referencia.get('p50_ms') or callback['p50_ms'] is None:
+                continue
+            esperado = referencia['p50_ms'] * factor
+            cociente = callback['p50_ms'] / esperado
+            comparacion.append({
+                'escala': escala,
+                'callback': callback['callback'],
+                'p50_ms': callback['p50_ms'],
+                'p50_base_ms': referencia['p50_ms'],
+                'factor_host': factor,
+                'cociente': cociente,
+                'regresion': cociente > umbral and callback['p50_ms'] - esperado >= minimo_ms,
+            })
+    return comparacion
+
+
+def imprimir(resultado):
+    for escala, datos in resultado['escalas'].items():
+        filas = ', '.join(f"{n}={v:,}" for n, v in datos['filas'].items())
+        print(f"\n{escala}x ({filas}; carga {datos['carga_procesados_ms']:.0f} ms; "
+              f"referencia {datos['referencia_ms']:.1f} ms)")
+        print(f"  {'callback':<32} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'mem MB':>8} {'KB p50':>9}")
+        for c in datos['callbacks']:
+            if c['p50_ms'] is None:
+                continue
+            print(f"  {c['callback']:<32} {c['p50_ms']:>9.2f} {c['p95_ms']:>9.2f} {c['p99_ms']:>9.2f} "
+                  f"{c['memoria_pico_mb']:>8.1f} {c['bytes_p50'] / 1024:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de los callbacks del dashboard a varias escalas de datos")
+    parser.add_argument('--escalas', type=int, nargs='+', default=ESCALAS, help="Multiplicadores de filas")
+    parser.add_argument('--repeticiones', type=int, default=5, help="Invocaciones cronometradas por escenario")
+    parser.add_argument('--json', help="Ruta donde guardar el resultado")
+    parser.add_argument('--linea-base', default=LINEA_BASE, help="Resultado de referencia para comparar")
+    parser.add_argument('--guardar-linea-base', action='store_true', help="Guarda este resultado como línea base")
+    parser.add_argument('--umbral', type=float, default=1.5,
+                        help="Cociente p50 actual / línea base a partir del cual hay regresión")
+    parser.add_argument('--minimo-ms', type=float, default=5.0,
+                        help="Diferencia mínima de la mediana (ms) para contar una regresión")
+    parser.add_argument('--trabajador', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.trabajador:
+        print(json.dumps(medir_escala(args.repeticiones)))
+        return
+
+    resultado = {
+        'meta': {
+            'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'host': platform.node(),
+            'cpus': os.cpu_count(),
+            'repeticiones': args.repeticiones,
+        },
+        'escalas': {},
+    }
+    for escala in args.escalas:
+        print(f"Midiendo {escala}x...", flush=True)
+        resultado['escalas'][str(escala)] = ejecutar_escala(escala, args.repeticiones)
+    imprimir(resultado)
+
+    regresiones = []
+    if os.path.exists(args.linea_base) and not args.guardar_linea_base:
+        with open(args.linea_base, encoding='utf-8') as archivo:
+            linea_base = json.load(archivo)
+        host_base = linea_base.get('meta', {}).get('host')
+        if host_base and host_base != resultado['meta']['host']:
+            print(f"Aviso: la línea base es de otro host ({host_base}); se compara relativa a la carga de referencia")
+        resultado['comparacion'] = comparar(resultado, linea_base, args.umbral, args.minimo_ms)
+        regresiones = [c for c in resultado['comparacion'] if c['regresion']]
+        for c in regresiones:
+            print(f"✗ {c['callback']} ({c['escala']}x): p50 {c['p50_ms']:.2f} ms "
+                  f"vs {c['p50_base_ms']:.2f} ms en la línea base, host {c['factor_host']:.2f}x "
+                  f"({c['cociente']:.2f}x)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as archivo:
+            json.dump(resultado, archivo, ensure_ascii=False, indent=2)
+    if args.guardar_linea_base:
+        with open(args.linea_base, 'w', encoding='utf-8') as archivo:
+            json.dump(resultado, archivo, ensure_ascii=False, indent=2)
+        print(f"✓ Línea base guardada en {os.path.relpath(args.linea_base, DIR_PROYECTO)}")
+
+    if regresiones:
+        sys.exit(1)
+    if 'comparacion' in resultado:
+        print(f"✓ Sin regresiones frente a la línea base (umbral {args.umbral:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,545 @@
+"""
+Prueba de carga del dashboard con usuarios concurrentes
+
+Simula analistas que recorren el dashboard como lo haría el navegador:
+cada usuario virtual abre la página (GET /_dash-layout), y en cada paso de
+su sesión cambia propiedades de los componentes y dispara por
+POST /_dash-update-component los callbacks cuyas entradas cambiaron, en
+cascada (un tab nuevo trae componentes nuevos, que disparan sus propios
+callbacks). Los callbacks se descubren en /_dash-dependencies, así que el
+guion no depende de cómo estén escritos en app.py.
+
+Guion de cada sesión:
+    abrir el Overview → cambiar `dataset-selector` → tab Demográfico →
+    mover `filter-estrato` → tab Predictor → predecir
+
+Los usuarios arrancan escalonados durante la rampa y repiten sesiones
+hasta que termina la prueba, con una pausa entre pasos. Cada usuario usa
+una conexión keep-alive y dispara los callbacks de un paso uno tras otro.
+Se reporta el throughput (total y tras la rampa), percentiles de latencia
+y tasa de errores por callback, y latencia por paso del guion.
+
+Sin --url lanza gunicorn (gunicorn.conf.py) en un puerto libre, con una
+caché de figuras vacía, y espera a que /api/listo responda.
+
+Uso (desde final_project/):
+    python benchmarks/carga.py --usuarios 20 --rampa 10 --duracion 60
+    python benchmarks/carga.py --workers 4 --threads 4 --datos /tmp/sintetico --json carga.json
+    python benchmarks/carga.py --url http://127.0.0.1:8050 --usuarios 50 --pausa 0
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+DIR_PROYECTO = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+DIR_DASHBOARD = os.path.join(DIR_PROYECTO, 'dashboards')
+
+RUTA_LAYOUT = '/_dash-layout'
+RUTA_DEPENDENCIAS = '/_dash-dependencies'
+RUTA_CALLBACK = '/_dash-update-component'
+RUTA_LISTO = '/api/listo'
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+# ---------------------------------------------------------------------
+# Guion de la sesión
+# ---------------------------------------------------------------------
+
+def opcion(estado, componente, rng, excluir=('all',)):
+    """Un valor al azar entre las opciones actuales de un componente (dropdown, radio, checklist)
+
+    Las opciones de los filtros las deriva el navegador: se toman del
+    manifiesto que viene con el layout.
+    """
+    manifiesto = (estado.get(('manifiesto-filtros', 'data')) or {}).get('filtros', {})
+    opciones = [
+        o['value'] if isinstance(o, dict) else o
+        for o in estado.get((componente, 'options')) or manifiesto.get(componente, {}).get('opciones', [])
+    ]
+    opciones = [v for v in opciones if v not in excluir]
+    return rng.choice(opciones) if opciones else None
+
+
+def entero(estado, componente, rng):
+    """Un entero al azar dentro del rango min-max de un componente (slider, input numérico)"""
+    return rng.randint(estado[(componente, 'min')], estado[(componente, 'max')])
+
+
+def paso_datasets(estado, rng):
+    opciones = [o['value'] for o in estado.get(('dataset-selector', 'options')) or []]
+    seleccion = rng.sample(opciones, rng.randint(1, len(opciones))) if opciones else ['academica']
+    return {('dataset-selector', 'value'): seleccion}
+
+
+def paso_estrato(estado, rng):
+    return {('filter-estrato', 'value'): opcion(estado, 'filter-estrato', rng) or 'all'}
+
+
+def paso_prediccion(estado, rng):
+    return {
+        ('input-edad', 'value'): entero(estado, 'input-edad', rng),
+        ('input-genero', 'value'): opcion(estado, 'input-genero', rng),
+        ('input-estrato', 'value'): entero(estado, 'input-estrato', rng),
+        ('input-modalidad', 'value'): opcion(estado, 'input-modalidad', rng),
+        ('input-jornada', 'value'): opcion(estado, 'input-jornada', rng),
+        ('btn-predecir', 'n_clicks'): (estado.get(('btn-predecir', 'n_clicks')) or 0) + 1,
+    }
+
+
+# (nombre del paso, función estado, rng -> {(id, propiedad): valor}); None = abrir la página
+GUION = [
+    ('abrir', None),
+    ('datasets', paso_datasets),
+    ('tab-demografico', lambda estado, rng: {('tabs', 'active_tab'): 'tab-demografico'}),
+    ('filtro-estrato', paso_estrato),
+    ('tab-predictor', lambda estado, rng: {('tabs', 'active_tab'): 'tab-predictor'}),
+    ('prediccion', paso_prediccion),
+]
+
+
+# ---------------------------------------------------------------------
+# Protocolo de callbacks de Dash
+# ---------------------------------------------------------------------
+
+class Callback:
+    """Un callback tal como lo describe /_dash-dependencies"""
+
+    def __init__(self, dependencia):
+        self.salida = dependencia['output']
+        self.multiple = self.salida.startswith('..')
+        self.salidas = [
+            tuple(s.rsplit('.', 1))
+            for s in (self.salida.strip('.').split('...') if self.multiple else [self.salida])
+        ]
+        self.entradas = [(e['id'], e['property']) for e in dependencia['inputs']]
+        self.estados = [(e['id'], e['property']) for e in dependencia['state']]
+        self.llamada_inicial = not dependencia.get('prevent_initial_call')
+        # Nombre corto para el reporte: la primera salida (+n si hay más)
+        extra = len(self.salidas) - 1
+        self.nombre = '.'.join(self.salidas[0]) + (f" (+{extra})" if extra else '')
+
+    def cuerpo(self, estado, cambiadas):
+        def valores(claves):
+            return [{'id': i, 'property': p, 'value': estado.get((i, p))} for i, p in claves]
+
+        salidas = [{'id': i, 'property': p} for i, p in self.salidas]
+        return {
+            'output': self.salida,
+            'outputs': salidas if self.multiple else salidas[0],
+            'inputs': valores(self.entradas),
+            'state': valores(self.estados),
+            'changedPropIds': [f"{i}.{p}" for i, p in self.entradas if (i, p) in cambiadas],
+        }
+
+
+def recorrer_componentes(nodo, estado, ids):
+    """Registra las propiedades de cada componente con id del árbol y devuelve los ids encontrados"""
+    if isinstance(nodo, list):
+        for hijo in nodo:
+            recorrer_componentes(hijo, estado, ids)
+    elif isinstance(nodo, dict) and 'props' in nodo and 'type' in nodo:
+        propiedades = nodo['props']
+        componente = propiedades.get('id')
+        if isinstance(componente, str):
+            ids.add(componente)
+            for propiedad, valor in propiedades.items():
+                if propiedad != 'children':
+                    estado[(componente, propiedad)] = valor
+        recorrer_componentes(propiedades.get('children'), estado, ids)
+    return ids
+
+
+class Sesion:
+    """Un usuario virtual: estado de los componentes y una conexión keep-alive"""
+
+    def __init__(self, url, callbacks, registro, rng, timeout):
+        partes = urllib.parse.urlsplit(url)
+        self.host, self.puerto = partes.hostname, partes.port or 80
+        self.callbacks = callbacks
+        self.registro = registro
+        self.rng = rng
+        self.timeout = timeout
+        self.conexion = None
+        self.estado = {}
+        self.presentes = set()
+        # Componentes creados por cada salida `children` (se retiran al reemplazarla)
+        self.contenidos = {}
+
+    def _peticion(self, metodo, ruta, cuerpo=None):
+        """(código, bytes de la respuesta); reabre la conexión si el servidor la cerró"""
+        datos = json.dumps(cuerpo).encode() if cuerpo is not None else None
+        cabeceras = {'Content-Type': 'application/json'} if datos is not None else {}
+        for intento in (0, 1):
+            if self.conexion is None:
+                self.conexion = http.client.HTTPConnection(self.host, self.puerto, timeout=self.timeout)
+            try:
+                self.conexion.request(metodo, ruta, body=datos, headers=cabeceras)
+                respuesta = self.conexion.getresponse()
+                return respuesta.status, respuesta.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self.cerrar()
+                if intento:
+                    raise
+
+    def cerrar(self):
+        if self.conexion is not None:
+            self.conexion.close()
+            self.conexion = None
+
+    def abrir(self, paso):
+        """Carga el layout y dispara las llamadas iniciales de los callbacks"""
+        self.estado, self.presentes, self.contenidos = {}, set(), {}
+        inicio = time.perf_counter()
+        try:
+            codigo, contenido = self._peticion('GET', RUTA_LAYOUT)
+        except OSError as e:
+            self.registro.anotar(paso, 'layout', inicio, None, 0, repr(e))
+            return
+        self.registro.anotar(paso, 'layout', inicio, codigo, len(contenido))
+        if codigo != 200:
+            return
+        nuevos = recorrer_componentes(json.loads(contenido), self.estado, set())
+        self.presentes |= nuevos
+        self._disparar(paso, set(), nuevos)
+
+    def cambiar(self, paso, cambios):
+        self.estado.update(cambios)
+        self._disparar(paso, set(cambios), set())
+
+    def _disparar(self, paso, cambiadas, nuevos):
+        """Dispara en cascada los callbacks afectados por propiedades cambiadas o componentes nuevos
+
+        Como el navegador, omite los callbacks con entradas o salidas que no están en la página.
+        """
+        while cambiadas or nuevos:
+            pendientes = [
+                cb for cb in self.callbacks
+                if all(i in self.presentes for i, _ in cb.entradas + cb.salidas)
+                and (any(e in cambiadas for e in cb.entradas)
+                     or (cb.llamada_inicial and any(i in nuevos for i, _ in cb.entradas)))
+            ]
+            disparadoras, cambiadas, nuevos = cambiadas, set(), set()
+            for cb in pendientes:
+                actualizadas, creados = self._llamar(paso, cb, disparadoras)
+                cambiadas |= actualizadas
+                nuevos |= creados
+
+    def _llamar(self, paso, cb, disparadoras):
+        inicio = time.perf_counter()
+        try:
+            codigo, contenido = self._peticion('POST', RUTA_CALLBACK, cb.cuerpo(self.estado, disparadoras))
+        except OSError as e:
+            self.registro.anotar(paso, cb.nombre, inicio, None, 0, repr(e))
+            return set(), set()
+        self.registro.anotar(paso, cb.nombre, inicio, codigo, len(contenido))
+        # 204: PreventUpdate, sin cambios en el navegador
+        if codigo != 200:
+            return set(), set()
+        return self._aplicar(json.loads(contenido).get('response', {}))
+
+    def _aplicar(self, respuesta):
+        """Actualiza el estado con la respuesta; devuelve propiedades actualizadas y componentes creados"""
+        actualizadas, creados = set(), set()
+        for componente, propiedades in respuesta.items():
+            for propiedad, valor in propiedades.items():
+                clave = (componente, propiedad)
+                if propiedad == 'children':
+                    for retirado in self.contenidos.pop(clave, set()):
+                        self.presentes.discard(retirado)
+                        for k in [k for k in self.estado if k[0] == retirado]:
+                            del self.estado[k]
+                    ids = recorrer_componentes(valor, self.estado, set())
+                    self.contenidos[clave] = ids
+                    self.presentes |= ids
+                    creados |= ids
+                else:
+                    self.estado[clave] = valor
+                actualizadas.add(clave)
+        return actualizadas, creados
+
+
+# ---------------------------------------------------------------------
+# Registro de peticiones y reporte
+# ---------------------------------------------------------------------
+
+class Registro:
+    """Peticiones realizadas: (paso, callback, inicio, duración, código, bytes, error)"""
+
+    def __init__(self):
+        self.peticiones = []
+        self.pasos = []
+        self._lock = threading.Lock()
+
+    def anotar(self, paso, nombre, inicio, codigo, tamano, error=None):
+        fin = time.perf_counter()
+        if error is None and codigo is not None and codigo >= 400:
+            error = f"HTTP {codigo}"
+        with self._lock:
+            self.peticiones.append((paso, nombre, inicio, fin - inicio, codigo, tamano, error))
+
+    def anotar_paso(self, paso, inicio, fin):
+        with self._lock:
+            self.pasos.append((paso, inicio, fin - inicio))
+
+
+def percentiles(duraciones):
+    if len(duraciones) < 2:
+        valor = round(duraciones[0] * 1000, 2) if duraciones else None
+        return {f"p{p}": valor for p in PERCENTILES}
+    cortes = statistics.quantiles(duraciones, n=100, method='inclusive')
+    return {f"p{p}": round(cortes[p - 1] * 1000, 2) for p in PERCENTILES}
+
+
+def resumir(registro, inicio, fin_rampa, fin):
+    """Throughput, latencias por callback y por paso, errores"""
+    peticiones = registro.peticiones
+    estables = [p for p in peticiones if fin_rampa <= p[2] < fin]
+    ventana = max(fin - fin_rampa, 1e-9)
+
+    por_callback = {}
+    for _, nombre, inicio_p, duracion, codigo, tamano, error in peticiones:
+        por_callback.setdefault(nombre, []).append((duracion, codigo, tamano, error, inicio_p >= fin_rampa))
+
+    callbacks = {}
+    for nombre, filas in sorted(por_callback.items()):
+        duraciones = [d for d, _, _, error, _ in filas if error is None]
+        errores = sum(1 for *_, error, _ in filas if error is not None)
+        callbacks[nombre] = {
+            'peticiones': len(filas),
+            'por_segundo': round(sum(1 for *_, estable in filas if estable) / ventana, 2),
+            'errores': errores,
+            'tasa_error': round(errores / len(filas), 4),
+            'sin_cambios': sum(1 for _, codigo, *_ in filas if codigo == 204),
+            **percentiles(duraciones),
+            'max': round(max(duraciones) * 1000, 2) if duraciones else None,
+            'kb_medio': round(statistics.mean(t for _, _, t, _, _ in filas) / 1024, 1),
+        }
+
+    pasos = {}
+    for paso, _ in GUION:
+        duraciones = [d for p, _, d in registro.pasos if p == paso]
+        if duraciones:
+            pasos[paso] = {'sesiones': len(duraciones), **percentiles(duraciones)}
+
+    errores = [p for p in peticiones if p[6] is not None]
+    ejemplos = {}
+    for _, nombre, _, _, _, _, error in errores:
+        ejemplos.setdefault(f"{nombre}: {error}", 0)
+        ejemplos[f"{nombre}: {error}"] += 1
+
+    return {
+        'peticiones': len(peticiones),
+        'duracion_s': round(fin - inicio, 2),
+        'por_segundo': round(len(peticiones) / max(fin - inicio, 1e-9), 2),
+        'por_segundo_estable': round(len(estables) / ventana, 2),
+        'sesiones_completas': sum(1 for p, _, _ in registro.pasos if p == GUION[-1][0]),
+        'errores': len(errores),
+        'tasa_error': round(len(errores) / len(peticiones), 4) if peticiones else 0.0,
+        'latencia_estable': percentiles([p[3] for p in estables if p[6] is None]),
+        'callbacks': callbacks,
+        'pasos': pasos,
+        'errores_frecuentes': dict(sorted(ejemplos.items(), key=lambda e: -e[1])[:10]),
+    }
+
+
+def imprimir(resumen):
+    print(f"\n{resumen['peticiones']} peticiones en {resumen['duracion_s']:.1f} s: "
+          f"{resumen['por_segundo']:.1f}/s ({resumen['por_segundo_estable']:.1f}/s tras la rampa), "
+          f"{resumen['sesiones_completas']} sesiones completas, "
+          f"{resumen['errores']} errores ({resumen['tasa_error']:.2%})")
+    latencia = resumen['latencia_estable']
+    print("Latencia tras la rampa: " + "  ".join(f"{p} {v} ms" for p, v in latencia.items()))
+
+    print(f"\n{'callback':<42} {'n':>6} {'/s':>7} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'KB':>8}")
+    for nombre, c in resumen['callbacks'].items():
+        celdas = [c['p50'], c['p95'], c['p99'], c['max']]
+        print(f"{nombre[:42]:<42} {c['peticiones']:>6} {c['por_segundo']:>7.1f} {c['tasa_error'] * 100:>6.1f} "
+              + " ".join(f"{v:>8.1f}" if v is not None else f"{'-':>8}" for v in celdas)
+              + f" {c['kb_medio']:>8.1f}")
+
+    print(f"\n{'paso del guion':<42} {'n':>6} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for paso, p in resumen['pasos'].items():
+        print(f"{paso:<42} {p['sesiones']:>6} {p['p50']:>8.1f} {p['p95']:>8.1f} {p['p99']:>8.1f}")
+
+    for error, veces in resumen['errores_frecuentes'].items():
+        print(f"  ✗ {veces}x {error}")
+
+
+# ---------------------------------------------------------------------
+# Ejecución
+# ---------------------------------------------------------------------
+
+def usuario(url, callbacks, registro, semilla, inicio, fin, pausa, timeout):
+    """Repite sesiones del guion desde `inicio` hasta `fin` (tiempos de perf_counter)"""
+    rng = random.Random(semilla)
+    time.sleep(max(inicio - time.perf_counter(), 0))
+    sesion = Sesion(url, callbacks, registro, rng, timeout)
+    try:
+        while time.perf_counter() < fin:
+            for paso, cambios in GUION:
+                if time.perf_counter() >= fin:
+                    return
+                inicio_paso = time.perf_counter()
+                if cambios is None:
+                    sesion.abrir(paso)
+                else:
+                    sesion.cambiar(paso, cambios(sesion.estado, rng))
+                registro.anotar_paso(paso, inicio_paso, time.perf_counter())
+                if pausa:
+                    time.sleep(rng.uniform(0.5, 1.5) * pausa)
+    finally:
+        sesion.cerrar()
+
+
+def obtener_json(url, ruta, timeout=10):
+    partes = urllib.parse.urlsplit(url)
+    conexion = http.client.HTTPConnection(partes.hostname, partes.port or 80, timeout=timeout)
+    try:
+        conexion.request('GET', ruta)
+        respuesta = conexion.getresponse()
+        return respuesta.status, json.loads(respuesta.read() or b'null')
+    finally:
+        conexion.close()
+
+
+def esperar_listo(url, proceso=None, limite=180):
+    """Espera a que /api/listo responda 200 (el servidor cargó los datos)"""
+    fin = time.monotonic() + limite
+    while time.monotonic() < fin:
+        if proceso is not None and proceso.poll() is not None:
+            raise RuntimeError(f"el servidor terminó con código {proceso.returncode}")
+        try:
+            codigo, cuerpo = obtener_json(url, RUTA_LISTO)
+            if codigo == 200:
+                return cuerpo
+        except (OSError, ValueError):
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"el servidor no respondió {RUTA_LISTO} en {limite} s")
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def lanzar_servidor(args, directorio):
+    """gunicorn con gunicorn.conf.py en un puerto libre; devuelve (url, proceso, ruta del log)"""
+    puerto = puerto_libre()
+    entorno = {
+        **os.environ,
+        'DASHBOARD_BIND': f"127.0.0.1:{puerto}",
+        'DASHBOARD_WORKERS': str(args.workers),
+        'DASHBOARD_THREADS': str(args.threads),
+        # Caché de figuras y segmentos propios de esta prueba
+        'DASHBOARD_CACHE_DIR': os.path.join(directorio, 'cache'),
+        'DASHBOARD_SEGMENTOS_DIR': os.path.join(directorio, 'segmentos'),
+        'DASHBOARD_RECARGA_SEG': '0',
+    }
+    if args.cache_mb is not None:
+        entorno['DASHBOARD_CACHE_MB'] = str(args.cache_mb)
+    if args.datos:
+        entorno['DASHBOARD_DATOS_DIR'] = os.path.abspath(args.datos)
+
+    ruta_log = os.path.join(directorio, 'servidor.log')
+    with open(ruta_log, 'w') as log:
+        proceso = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:server'],
+            cwd=DIR_DASHBOARD, env=entorno, stdout=log, stderr=subprocess.STDOUT
+        )
+    return f"http://127.0.0.1:{puerto}", proceso, ruta_log
+
+
+def ejecutar(url, args):
+    codigo, dependencias = obtener_json(url, RUTA_DEPENDENCIAS)
+    if codigo != 200:
+        raise RuntimeError(f"{RUTA_DEPENDENCIAS} respondió {codigo}")
+    callbacks = [Callback(d) for d in dependencias if not d.get('clientside_function')]
+
+    registro = Registro()
+    inicio = time.perf_counter() + 0.1
+    fin_rampa = inicio + args.rampa
+    fin = fin_rampa + args.duracion
+    hilos = [
+        threading.Thread(
+            target=usuario, name=f"usuario-{i}", daemon=True,
+            args=(url, callbacks, registro, args.semilla + i,
+                  inicio + args.rampa * i / max(args.usuarios, 1), fin, args.pausa, args.timeout)
+        )
+        for i in range(args.usuarios)
+    ]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return resumir(registro, inicio, fin_rampa, max(fin, time.perf_counter()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del dashboard con usuarios concurrentes")
+    parser.add_argument('--url', help="Servidor ya iniciado (si no, se lanza gunicorn en un puerto libre)")
+    parser.add_argument('--usuarios', type=int, default=10, help="Usuarios virtuales concurrentes")
+    parser.add_argument('--rampa', type=float, default=5.0, help="Segundos para arrancar todos los usuarios")
+    parser.add_argument('--duracion', type=float, default=30.0, help="Segundos de carga tras la rampa")
+    parser.add_argument('--pausa', type=float, default=1.0,
+                        help="Pausa media entre pasos de una sesión en segundos (0: sin pausa)")
+    parser.add_argument('--timeout', type=float, default=60.0, help="Timeout de cada petición en segundos")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=2, help="Workers de gunicorn (sin --url)")
+    parser.add_argument('--threads', type=int, default=4, help="Hilos por worker (sin --url)")
+    parser.add_argument('--datos', help="Directorio de datos del servidor (DASHBOARD_DATOS_DIR, sin --url)")
+    parser.add_argument('--cache-mb', type=float, help="Tamaño de la caché de figuras (sin --url)")
+    parser.add_argument('--json', help="Ruta donde guardar el resumen")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        proceso = None
+        try:
+            if args.url:
+                url = args.url.rstrip('/')
+            else:
+                url, proceso, ruta_log = lanzar_servidor(args, directorio)
+                print(f"Servidor en {url} ({args.workers} workers x {args.threads} hilos)")
+            try:
+                listo = esperar_listo(url, proceso)
+            except RuntimeError:
+                if proceso is not None:
+                    with open(ruta_log) as log:
+                        sys.stderr.write(log.read()[-4000:])
+                raise
+            print(f"Datos {listo.get('version')}: {listo.get('registros')}")
+            print(f"{args.usuarios} usuarios, rampa {args.rampa:g} s, duración {args.duracion:g} s, "
+                  f"pausa {args.pausa:g} s")
+            resumen = ejecutar(url, args)
+        finally:
+            if proceso is not None:
+                proceso.terminate()
+                try:
+                    proceso.wait(timeout=30)
+                except subprocess.TimeoutExpired:
+                    proceso.kill()
+
+    resumen['configuracion'] = {
+        k: getattr(args, k) for k in ('url', 'usuarios', 'rampa', 'duracion', 'pausa', 'workers', 'threads', 'datos')
+    }
+    imprimir(resumen)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as archivo:
+            json.dump(resumen, archivo, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Agregados para histogramas y box plots calculados en el servidor
+
+En lugar de enviar cada valor al navegador para que plotly agrupe y
+calcule cuartiles, se envían los conteos por intervalo y, por grupo, los
+cuartiles, los bigotes y una muestra acotada de atípicos. El tamaño de la
+figura no depende del número de registros.
+
+Los intervalos y las estadísticas siguen las reglas de plotly.js (autobin
+con `nbinsx`, cuartiles 'linear' y bigotes a 1.5 IQR), así que los gráficos
+se ven igual que con los datos crudos.
+"""
+
+import math
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+# Atípicos distintos que se envían por caja (los extremos siempre se incluyen)
+MAX_ATIPICOS = 200
+
+
+@dataclass
+class Intervalos:
+    """Conteos de un histograma de intervalos de igual ancho desde `inicio`"""
+    inicio: float
+    ancho: float
+    conteos: np.ndarray
+
+    @property
+    def fin(self):
+        return self.inicio + len(self.conteos) * self.ancho
+
+    @property
+    def centros(self):
+        return self.inicio + (np.arange(len(self.conteos)) + 0.5) * self.ancho
+
+
+@dataclass
+class Caja:
+    """Estadísticas de la caja de un grupo"""
+    nombre: object
+    n: int
+    q1: float
+    mediana: float
+    q3: float
+    bigote_inferior: float
+    bigote_superior: float
+    atipicos: list = field(default_factory=list)
+
+
+def _numericos(serie):
+    """Valores numéricos sin nulos como float64"""
+    valores = pd.to_numeric(serie, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    return valores[~np.isnan(valores)]
+
+
+def _ancho_redondo(aproximado):
+    """Menor ancho 2, 5 o 10 × 10^n mayor o igual al aproximado (como los ticks de plotly)"""
+    if not aproximado > 0:
+        return 1.0
+    base = 10 ** math.floor(math.log10(aproximado))
+    for paso in (2, 5, 10):
+        if aproximado / base <= paso:
+            return paso * base
+
+
+def _desplazar_inicio(inicio, valores, ancho, minimo, maximo):
+    """Aleja los bordes de los intervalos de los valores (autoShiftNumericBins de plotly.js)"""
+    def cerca_de_borde(v):
+        return (1 + (v - inicio) * 100 / ancho) % 100 < 2
+
+    if np.all(valores % 1 == 0):
+        if ancho < 1:
+            return minimo - 0.5 * ancho
+        inicio -= 0.5
+        return inicio + ancho if inicio + ancho < minimo else inicio
+
+    n = len(valores)
+    en_medio = np.count_nonzero(cerca_de_borde(valores + ancho / 2))
+    if en_medio < n * 0.1 and (
+        np.count_nonzero(cerca_de_borde(valores)) > n * 0.3 or cerca_de_borde(minimo) or cerca_de_borde(maximo)
+    ):
+        mitad = ancho / 2
+        inicio += mitad if inicio + mitad < minimo else -mitad
+    return inicio
+
+
+def intervalos(serie, nbins=30):
+    """Conteos por intervalo de una columna numérica (None si no hay valores)"""
+    valores = _numericos(serie)
+    if not len(valores):
+        return None
+
+    minimo, maximo = float(valores.min()), float(valores.max())
+    ancho = _ancho_redondo((maximo - minimo) / nbins)
+    # Primer múltiplo del ancho menor que el mínimo
+    inicio = math.ceil(minimo / ancho) * ancho - ancho
+    inicio = _desplazar_inicio(inicio, valores, ancho, minimo, maximo)
+
+    n_intervalos = 1 + math.floor((maximo - inicio) / ancho)
+    posiciones = np.clip(((valores - inicio) // ancho).astype(np.int64), 0, n_intervalos - 1)
+    return Intervalos(inicio, ancho, np.bincount(posiciones, minlength=n_intervalos))
+
+
+def _cuantil(ordenados, p):
+    """Cuantil con la interpolación de plotly.js (posición p·n − 0.5)"""
+    r = p * len(ordenados) - 0.5
+    if r < 0:
+        return float(ordenados[0])
+    if r > len(ordenados) - 1:
+        return float(ordenados[-1])
+    fraccion = r % 1
+    return float(fraccion * ordenados[math.ceil(r)] + (1 - fraccion) * ordenados[math.floor(r)])
+
+
+def _muestra(valores, maximo):
+    """Valores distintos; si son más que `maximo`, una muestra equiespaciada con los extremos"""
+    distintos = np.unique(valores)
+    if len(distintos) > maximo:
+        distintos = distintos[np.linspace(0, len(distintos) - 1, maximo).round().astype(np.int64)]
+    return distintos.tolist()
+
+
+def cajas(valores, grupos, max_atipicos=MAX_ATIPICOS):
+    """Estadísticas de caja de `valores` por grupo, en orden de primera aparición"""
+    numericos = pd.to_numeric(valores, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    codigos, nombres = pd.factorize(grupos, sort=False)
+    validos = (codigos >= 0) & ~np.isnan(numericos)
+    codigos, numericos = codigos[validos], numericos[validos]
+
+    # Un solo ordenamiento por (grupo, valor); cada grupo es un tramo contiguo
+    orden = np.lexsort((numericos, codigos))
+    codigos, numericos = codigos[orden], numericos[orden]
+    limites = np.searchsorted(codigos, np.arange(len(nombres) + 1))
+
+    resultado = []
+    for codigo, nombre in enumerate(nombres):
+        tramo = numericos[limites[codigo]:limites[codigo + 1]]
+        if not len(tramo):
+            continue
+        q1, mediana, q3 = (_cuantil(tramo, p) for p in (0.25, 0.5, 0.75))
+        # Bigotes: el valor más extremo dentro de 1.5 IQR (nunca dentro de la caja)
+        desde = np.searchsorted(tramo, 2.5 * q1 - 1.5 * q3, side='left')
+        hasta = np.searchsorted(tramo, 2.5 * q3 - 1.5 * q1, side='right')
+        inferior = min(q1, float(tramo[min(desde, len(tramo) - 1)]))
+        superior = max(q3, float(tramo[max(hasta - 1, 0)]))
+        fuera = np.concatenate([tramo[tramo < inferior], tramo[tramo > superior]])
+        resultado.append(Caja(
+            nombre, len(tramo), q1, mediana, q3, inferior, superior, _muestra(fuera, max_atipicos)
+        ))
+    return resultado
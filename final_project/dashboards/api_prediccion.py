@@ -0,0 +1,179 @@
+"""
+API de predicción por lotes
+
+Expone POST /api/prediccion en el servidor Flask del dashboard para
+puntuar estudiantes desde otros sistemas (JSON o CSV). Las solicitudes
+concurrentes que llegan con pocos milisegundos de diferencia se agrupan
+en un micro-lote y se puntúan con una sola llamada al modelo; cada
+respuesta informa su latencia y cuántas solicitudes compartieron el lote.
+Si el lote falla, cada solicitud se reintenta sola: solo falla la que
+tenía datos no válidos, con una respuesta JSON de error.
+"""
+
+import io
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import pandas as pd
+from flask import Response, jsonify, request
+
+RUTA = '/api/prediccion'
+TIPOS_CSV = ('text/csv', 'application/csv')
+# Errores del predictor causados por los datos recibidos (columnas o valores no válidos)
+ERRORES_DATOS = (ValueError, TypeError, KeyError)
+
+
+class MicroLotes:
+    """Agrupa las solicitudes concurrentes en una sola llamada a `procesar`"""
+
+    def __init__(self, procesar, max_lote=256, max_espera_ms=5):
+        # procesar(DataFrame) -> DataFrame con una fila por registro, en el mismo orden
+        self.procesar = procesar
+        self.max_lote = max_lote
+        self.max_espera = max_espera_ms / 1000
+        self.lotes = 0
+        self.solicitudes = 0
+        self.filas = 0
+        self._cola = queue.Queue()
+        self._hilo = None
+        self._lock = threading.Lock()
+
+    def puntuar(self, df):
+        """Resultado de las filas de `df` y número de solicitudes que compartieron su lote"""
+        # Una solicitud que ya llena un lote no espera a otras
+        if len(df) >= self.max_lote:
+            self._contar(1, len(df))
+            return self.procesar(df.reset_index(drop=True)), 1
+
+        futuro = Future()
+        self._cola.put((df.reset_index(drop=True), futuro))
+        self._asegurar_hilo()
+        return futuro.result()
+
+    def estadisticas(self):
+        return {
+            'lotes': self.lotes,
+            'solicitudes': self.solicitudes,
+            'filas': self.filas,
+            'solicitudes_por_lote': self.solicitudes / self.lotes if self.lotes else 0.0,
+        }
+
+    def _asegurar_hilo(self):
+        # El hilo se crea en la primera solicitud, dentro del worker que la atiende
+        with self._lock:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._ejecutar, name='micro-lotes', daemon=True)
+                self._hilo.start()
+
+    def _ejecutar(self):
+        while True:
+            lote = [self._cola.get()]
+            filas = len(lote[0][0])
+            limite = time.monotonic() + self.max_espera
+            while filas < self.max_lote:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    solicitud = self._cola.get(timeout=restante)
+                except queue.Empty:
+                    break
+                lote.append(solicitud)
+                filas += len(solicitud[0])
+            self._procesar_lote(lote)
+
+    def _procesar_lote(self, lote):
+        try:
+            entrada = pd.concat([df for df, _ in lote], ignore_index=True)
+            salida = self.procesar(entrada).reset_index(drop=True)
+        except Exception as e:
+            if len(lote) == 1:
+                lote[0][1].set_exception(e)
+            else:
+                self._procesar_por_separado(lote)
+            return
+
+        self._contar(len(lote), len(entrada))
+        inicio = 0
+        for df, futuro in lote:
+            fin = inicio + len(df)
+            futuro.set_result((salida.iloc[inicio:fin].reset_index(drop=True), len(lote)))
+            inicio = fin
+
+    def _procesar_por_separado(self, lote):
+        """Reintenta cada solicitud de un lote fallido: solo fallan las que tienen el error"""
+        for df, futuro in lote:
+            try:
+                salida = self.procesar(df).reset_index(drop=True)
+            except Exception as e:
+                futuro.set_exception(e)
+                continue
+            self._contar(1, len(df))
+            futuro.set_result((salida, 1))
+
+    def _contar(self, solicitudes, filas):
+        with self._lock:
+            self.lotes += 1
+            self.solicitudes += solicitudes
+            self.filas += filas
+
+
+def leer_estudiantes(peticion):
+    """DataFrame de estudiantes desde un CSV o un JSON (objeto, lista o {'estudiantes': [...]})"""
+    if peticion.mimetype in TIPOS_CSV:
+        return pd.read_csv(io.StringIO(peticion.get_data(as_text=True)))
+
+    cuerpo = peticion.get_json(silent=True)
+    if isinstance(cuerpo, dict) and 'estudiantes' in cuerpo:
+        cuerpo = cuerpo['estudiantes']
+    if isinstance(cuerpo, dict):
+        cuerpo = [cuerpo]
+    if not isinstance(cuerpo, list) or not all(isinstance(e, dict) for e in cuerpo):
+        raise ValueError("Se espera un CSV, un objeto JSON, una lista de objetos o {'estudiantes': [...]}")
+    return pd.DataFrame(cuerpo)
+
+
+def registrar_api(server, obtener_predictor, max_lote=256, max_espera_ms=5):
+    """Monta el endpoint de predicción por lotes en el servidor Flask"""
+    # El predictor se consulta en cada lote: una recarga del modelo aplica a las siguientes solicitudes
+    lotes = MicroLotes(lambda df: obtener_predictor().predecir(df), max_lote, max_espera_ms)
+
+    @server.route(RUTA, methods=['POST'])
+    def api_prediccion():
+        inicio = time.perf_counter()
+        try:
+            estudiantes = leer_estudiantes(request)
+        except (ValueError, pd.errors.ParserError) as e:
+            return jsonify({'error': str(e)}), 400
+        if estudiantes.empty:
+            return jsonify({'error': "No se recibieron estudiantes"}), 400
+
+        try:
+            resultado, solicitudes_lote = lotes.puntuar(estudiantes)
+        except ERRORES_DATOS as e:
+            return jsonify({'error': f"Datos de estudiantes no válidos: {e}"}), 422
+        except Exception as e:
+            server.logger.exception("Error al puntuar %d estudiantes", len(estudiantes))
+            return jsonify({'error': f"Error interno al puntuar: {type(e).__name__}"}), 500
+        latencia_ms = (time.perf_counter() - inicio) * 1000
+
+        encabezados = {
+            'X-Latencia-ms': f"{latencia_ms:.2f}",
+            'X-Solicitudes-Lote': str(solicitudes_lote),
+        }
+        if request.mimetype in TIPOS_CSV:
+            salida = pd.concat([estudiantes.reset_index(drop=True), resultado], axis=1)
+            return Response(salida.to_csv(index=False), mimetype='text/csv', headers=encabezados)
+
+        respuesta = jsonify({
+            'resultados': resultado.to_dict(orient='records'),
+            'n': len(resultado),
+            'latencia_ms': round(latencia_ms, 2),
+            'solicitudes_lote': solicitudes_lote,
+        })
+        respuesta.headers.update(encabezados)
+        return respuesta
+
+    return lotes
@@ -6,18 +6,67 @@ Autor: Sistema de Análisis de Datos
 Descripción: Dashboard interactivo con múltiples páginas para análisis de deserción
 """
 
+# Primero: el perfil de arranque mide las importaciones siguientes
+from perfil_arranque import perfil
+
 import dash
-from dash import dcc, html, Input, Output, callback
+from dash import dcc, html, Input, Output, State, ClientsideFunction, callback
+from flask import has_request_context, jsonify
 import dash_bootstrap_components as dbc
-import plotly.express as px
+perfil.hito('importacion:dash')
+# plotly.express se importa al construir el primer gráfico (o en la precarga)
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from plotly.colors import qualitative
+perfil.hito('importacion:plotly')
 import pandas as pd
 import numpy as np
-import joblib
+perfil.hito('importacion:pandas')
+import hashlib
+import importlib
+import itertools
 import os
+import re
+import sys
+import threading
+import traceback
+from collections import OrderedDict
 from datetime import datetime
 
+# Copy-on-Write: las vistas de los datasets combinados en caché no se
+# pueden modificar desde los callbacks (siempre activo en pandas >= 3)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+# Raíz del proyecto, para importar los módulos de src/ y ubicar los datos
+DIR_PROYECTO = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+if DIR_PROYECTO not in sys.path:
+    sys.path.insert(0, DIR_PROYECTO)
+
+# Directorio de datos (otro con la misma estructura, p. ej. para los benchmarks: DASHBOARD_DATOS_DIR)
+DIR_DATOS = os.environ.get('DASHBOARD_DATOS_DIR', os.path.join(DIR_PROYECTO, 'data'))
+DIR_PROCESSED = os.path.join(DIR_DATOS, 'processed')
+DIR_BI = os.path.join(DIR_DATOS, 'bi')
+DIR_MODELOS = os.path.join(DIR_PROYECTO, 'src', 'models')
+
+from src.data.columnar import firma_archivos, leer_tabla
+from src.data.particiones import TABLAS as TABLAS_PARTICIONADAS, leer_rango
+from src.data.estrella import kpis as kpis_hechos, resumen_hechos
+from src.data.segmentos import AlmacenSegmentos
+from src.models import predict
+from src.models.predict import PredictorDesercion, cargar_predictor
+from src.data.schema import (
+    ORIGENES, TIPO_ORIGEN, alinear_columnas, aplicar_esquema, construir_diccionarios, firma_diccionarios
+)
+from cubo import RANGOS_EDAD, CuboConteos
+from bitmap import IndiceBitmap
+from agregados import cajas, intervalos
+from cache_figuras import SalidaParcial, crear_cache
+from recarga import VigilanteArchivos
+from registro import RegistroDatos
+from metricas import crear_metricas
+from api_prediccion import registrar_api
+perfil.hito('importacion:proyecto')
+
 # Configuración
 app = dash.Dash(
     __name__,
@@ -31,75 +80,658 @@ app.title = "Dashboard de Deserción Educativa"
 # CARGA DE DATOS
 # =====================================================================
 
-def cargar_datos():
-    """Carga todos los datos necesarios para el dashboard"""
+# Archivos de origen de cada parte de los datos
+RUTAS_DATOS = {
+    'academica': os.path.join(DIR_PROCESSED, 'desercion_academica_clean.csv'),
+    'no_academica': os.path.join(DIR_PROCESSED, 'desercion_no_academica_clean.csv'),
+    'sena': os.path.join(DIR_PROCESSED, 'desercion_sena_clean.csv'),
+    'fact': os.path.join(DIR_BI, 'fact_desercion.csv'),
+    'dim_estudiante': os.path.join(DIR_BI, 'dim_estudiante.csv'),
+    'dim_tiempo': os.path.join(DIR_BI, 'dim_tiempo.csv'),
+    'kpis': os.path.join(DIR_BI, 'kpis_principales.csv'),
+}
+RUTAS_MODELO = {
+    'modelo': os.path.join(DIR_MODELOS, 'modelo_desercion.pkl'),
+    'scaler': os.path.join(DIR_MODELOS, 'scaler.pkl'),
+    'features': os.path.join(DIR_MODELOS, 'features.csv'),
+}
+TABLAS_BI = ['fact', 'dim_estudiante', 'dim_tiempo', 'kpis']
+# Partes que consultan los tabs, en orden de precarga (fact y las dimensiones
+# de BI solo se leen si alguien las pide)
+GRUPOS_PRECARGA = ['procesados', 'kpis', 'modelo']
+# Importaciones pesadas que no hacen falta para servir el layout
+IMPORTACIONES_DIFERIDAS = ['plotly.express']
+
+# Segmentos de memoria compartida (p. ej. /dev/shm): los workers de gunicorn
+# adjuntan las mismas columnas en lugar de tener cada uno su copia
+segmentos = AlmacenSegmentos(os.environ['DASHBOARD_SEGMENTOS_DIR']) if os.environ.get('DASHBOARD_SEGMENTOS_DIR') else None
+
+# Cada instantánea cargada recibe una generación mayor que la anterior
+_generaciones = itertools.count(1)
+
+# 'AAAA', 'AAAA-AAAA', 'AAAA-' o '-AAAA'
+PATRON_PERIODO = re.compile(r'(?P<desde>\d{4})?\s*(?P<guion>-)?\s*(?P<hasta>\d{4})?')
+
+def rango_años(texto):
+    """(desde, hasta) de un periodo 'AAAA', 'AAAA-AAAA', 'AAAA-' o '-AAAA' (None: sin límite)"""
+    texto = (texto or '').strip()
+    if not texto:
+        return None, None
+    partes = PATRON_PERIODO.fullmatch(texto)
+    if partes is None or not (partes['desde'] or partes['hasta']) or (partes['hasta'] and not partes['guion']):
+        raise ValueError(
+            f"DASHBOARD_PERIODO={texto!r} no es válido: use AAAA, AAAA-AAAA, AAAA- o -AAAA (p. ej. 2022-2024)"
+        )
+    desde = int(partes['desde']) if partes['desde'] else None
+    hasta = int(partes['hasta']) if partes['hasta'] else None
+    if not partes['guion']:
+        return desde, desde
+    if desde is not None and hasta is not None and desde > hasta:
+        raise ValueError(f"DASHBOARD_PERIODO={texto!r} no es válido: el año inicial es mayor que el final")
+    return desde, hasta
+
+# Años que carga el dashboard (DASHBOARD_PERIODO, p. ej. "2022-2024"): de las
+# tablas particionadas por periodo solo se leen las particiones de esos años, y
+# kpis_principales y dim_estudiante se restringen a los hechos de esos años
+RANGO_AÑOS = rango_años(os.environ.get('DASHBOARD_PERIODO'))
+# Tablas de BI que con un rango se derivan de los hechos cargados
+DERIVADAS_DE_HECHOS = ['kpis', 'dim_estudiante']
+
+def dependencias(nombre):
+    """Partes de los datos de las que depende una tabla (con un rango, las derivadas dependen de fact)"""
+    if RANGO_AÑOS != (None, None) and nombre in DERIVADAS_DE_HECHOS:
+        return [nombre, 'fact']
+    return [nombre]
+
+def firma_datos(rutas):
+    """Huella de unos archivos de datos y del rango de años cargado (otro rango son otros datos)"""
+    firma = firma_archivos(rutas)
+    return firma if RANGO_AÑOS == (None, None) else f"{firma}-{RANGO_AÑOS[0]}-{RANGO_AÑOS[1]}"
+
+def firmas_origen():
+    """Huella de cada archivo de origen (datos procesados, BI y modelo)"""
+    rutas = {**RUTAS_DATOS, **RUTAS_MODELO}
+    return {clave: firma_archivos([ruta]) for clave, ruta in rutas.items()}
+
+def versiones_fuentes(fuentes, diccionarios):
+    """Versión de cada fuente: huella de su archivo y de los diccionarios de categorías"""
+    firma_dic = firma_diccionarios(diccionarios)
+    return {nombre: f"{firma_datos([RUTAS_DATOS[nombre]])}-{firma_dic}" for nombre in fuentes}
+
+def compartir(grupo, rutas, construir):
+    """Tablas de un grupo; con segmentos compartidos las construye un solo proceso y el resto las adjunta"""
+    if segmentos is None:
+        return construir()
+    return segmentos.obtener(grupo, firma_datos(rutas), construir)
+
+def leer_en_rango(nombre):
+    """Tabla restringida a RANGO_AÑOS
+
+    Las tablas particionadas leen solo las particiones del rango; los KPIs se
+    recalculan con los hechos del rango y dim_estudiante conserva solo los
+    estudiantes de esos hechos, para que coincidan con los gráficos.
+    """
+    if nombre in TABLAS_PARTICIONADAS:
+        return leer_rango(nombre, *RANGO_AÑOS, datos=DIR_DATOS)
+    if nombre not in DERIVADAS_DE_HECHOS:
+        return leer_tabla(RUTAS_DATOS[nombre])
+    hechos = leer_rango('fact', *RANGO_AÑOS, datos=DIR_DATOS)
+    if nombre == 'kpis':
+        return kpis_hechos([resumen_hechos(hechos)])
+    estudiantes = leer_tabla(RUTAS_DATOS['dim_estudiante'])
+    return estudiantes[estudiantes['id_estudiante'].isin(hechos['id_estudiante'])].reset_index(drop=True)
+
+def leer_fuente(nombre):
+    """Lee un archivo de datos; si no existe, esa parte queda sin datos y las demás siguen disponibles"""
     try:
-        # Datos procesados
-        df_academica = pd.read_csv('../data/processed/desercion_academica_clean.csv')
-        df_no_academica = pd.read_csv('../data/processed/desercion_no_academica_clean.csv')
-        df_sena = pd.read_csv('../data/processed/desercion_sena_clean.csv')
-
-        # Datos de BI
-        fact_desercion = pd.read_csv('../data/bi/fact_desercion.csv')
-        dim_estudiante = pd.read_csv('../data/bi/dim_estudiante.csv')
-        dim_tiempo = pd.read_csv('../data/bi/dim_tiempo.csv')
-        kpis = pd.read_csv('../data/bi/kpis_principales.csv')
-
-        # Modelo ML
-        modelo = None
-        scaler = None
-        if os.path.exists('../src/models/modelo_desercion.pkl'):
-            modelo = joblib.load('../src/models/modelo_desercion.pkl')
-            scaler = joblib.load('../src/models/scaler.pkl')
+        with perfil.fase(f"lectura:{nombre}", archivo=os.path.basename(RUTAS_DATOS[nombre])):
+            if RANGO_AÑOS != (None, None):
+                # Solo los datos del rango (el resto del historial no se lee)
+                return leer_en_rango(nombre)
+            return leer_tabla(RUTAS_DATOS[nombre])
+    except FileNotFoundError as e:
+        print(f"Advertencia: no se encontró {e.filename or RUTAS_DATOS[nombre]}; '{nombre}' queda sin datos")
+        return None
 
+def cargar_procesados(previo=None, cambiadas=()):
+    """Datasets procesados tipados, con su cubo, su índice y su versión
+
+    Se cargan juntos porque comparten los diccionarios de categorías. Con
+    `previo` (el grupo ya cargado de la instantánea anterior) solo se leen
+    las fuentes cambiadas.
+    """
+    previo = previo or {}
+    versiones_anteriores = previo.get('versiones', {})
+
+    def tipar():
+        # Datos procesados (Arrow con memory-map si está generado, si no CSV);
+        # las fuentes sin cambios se reutilizan ya tipadas
+        fuentes = {}
+        for nombre in ORIGENES:
+            df = previo[nombre] if nombre in previo and nombre not in cambiadas else leer_fuente(nombre)
+            if df is not None:
+                fuentes[nombre] = df
+        # Tipos compactos con diccionarios de categorías compartidos entre fuentes
+        diccionarios = construir_diccionarios(fuentes)
+        versiones = versiones_fuentes(fuentes, diccionarios)
         return {
-            'academica': df_academica,
-            'no_academica': df_no_academica,
-            'sena': df_sena,
-            'fact': fact_desercion,
-            'dim_estudiante': dim_estudiante,
-            'dim_tiempo': dim_tiempo,
-            'kpis': kpis,
-            'modelo': modelo,
-            'scaler': scaler
+            nombre: df if versiones[nombre] == versiones_anteriores.get(nombre)
+            else aplicar_esquema(df, nombre, diccionarios)
+            for nombre, df in fuentes.items()
         }
+
+    rutas = [RUTAS_DATOS[nombre] for nombre in ORIGENES]
+    fuentes = compartir('procesados', rutas, tipar)
+    versiones = versiones_fuentes(fuentes, construir_diccionarios(fuentes))
+
+    def derivar():
+        # Cubo de conteos e índice bitmap por dataset; solo se reconstruyen las
+        # fuentes cuyo archivo o diccionario cambió
+        cubos = {n: c for n, c in previo.get('cubos', {}).items() if n in fuentes}
+        indices = {n: i for n, i in previo.get('indices', {}).items() if n in fuentes}
+        for nombre, df in fuentes.items():
+            if versiones[nombre] == versiones_anteriores.get(nombre):
+                continue
+            cubos[nombre] = CuboConteos.desde_dataset(df, ORIGENES[nombre], TIPO_ORIGEN)
+            indices[nombre] = IndiceBitmap.desde_dataset(df)
+        return cubos, indices
+
+    if segmentos is None:
+        cubos, indices = derivar()
+    else:
+        # Con segmentos, también los arreglos del cubo y de los bitmaps se comparten
+        tablas = compartir('derivados', rutas, lambda: tablas_derivadas(*derivar()))
+        cubos, indices = adjuntar_derivados(tablas, fuentes)
+
+    return {
+        **fuentes, 'cubos': cubos, 'indices': indices, 'versiones': versiones,
+        'opciones': manifiesto_opciones(indices),
+    }
+
+def tablas_derivadas(cubos, indices):
+    """Tablas del cubo y del índice de cada dataset, para publicarlas en segmentos"""
+    tablas = {}
+    for nombre in cubos:
+        tablas.update({f"{nombre}.cubo.{parte}": t for parte, t in cubos[nombre].tablas().items()})
+        tablas.update({f"{nombre}.indice.{parte}": t for parte, t in indices[nombre].tablas().items()})
+    return tablas
+
+def adjuntar_derivados(tablas, fuentes):
+    """Cubos e índices de los datasets a partir de sus tablas adjuntadas"""
+    def partes(nombre, tipo):
+        prefijo = f"{nombre}.{tipo}."
+        return {clave[len(prefijo):]: t for clave, t in tablas.items() if clave.startswith(prefijo)}
+
+    cubos = {nombre: CuboConteos.desde_tablas(partes(nombre, 'cubo')) for nombre in fuentes}
+    indices = {nombre: IndiceBitmap.desde_tablas(len(df), partes(nombre, 'indice')) for nombre, df in fuentes.items()}
+    return cubos, indices
+
+def cargar_tabla_bi(nombre):
+    """Cargador de una tabla de BI (vacía si el archivo no existe)"""
+    def leer():
+        df = leer_fuente(nombre)
+        return {nombre: pd.DataFrame() if df is None else df}
+    return lambda: compartir(nombre, [RUTAS_DATOS[parte] for parte in dependencias(nombre)], leer)
+
+def cargar_modelo():
+    """Modelo ML (predictor heurístico si no hay modelo entrenado)"""
+    predictor = cargar_predictor(DIR_MODELOS)
+    return {'predictor': predictor, 'modelo': predictor.modelo, 'scaler': predictor.scaler}
+
+def construir_instantanea(anterior=None, cambiadas=None):
+    """Instantánea de los datos cuyas partes se cargan al primer acceso
+
+    Con `anterior`, los grupos sin archivos cambiados se heredan tal como
+    estaban (cargados o pendientes) y solo se recargan las partes cambiadas.
+    """
+    if anterior is None or cambiadas is None:
+        anterior = None
+        cambiadas = set(RUTAS_DATOS) | set(RUTAS_MODELO)
+
+    # Versión de los datos: la misma en todos los workers que leen los mismos archivos
+    instantanea = RegistroDatos({
+        'version': firma_datos(RUTAS_DATOS.values()),
+        'generacion': next(_generaciones),
+    })
+
+    previo = anterior.valores_grupo('procesados') if anterior is not None else None
+    grupos = [
+        ('procesados', list(ORIGENES), [*ORIGENES, 'cubos', 'indices', 'versiones', 'opciones'],
+         lambda: cargar_procesados(previo, cambiadas)),
+        *[(nombre, dependencias(nombre), [nombre], cargar_tabla_bi(nombre)) for nombre in TABLAS_BI],
+        ('modelo', list(RUTAS_MODELO), ['predictor', 'modelo', 'scaler'], cargar_modelo),
+    ]
+    for grupo, archivos, claves, cargar in grupos:
+        if anterior is not None and not set(archivos) & set(cambiadas):
+            instantanea.heredar(anterior, grupo)
+        else:
+            instantanea.registrar(grupo, claves, perfil.medir(f"carga:{grupo}", cargar))
+    return instantanea
+
+def cargar_datos():
+    """Registra los datos del dashboard (se leen al primer acceso)"""
+    try:
+        return construir_instantanea()
     except Exception as e:
         print(f"Error cargando datos: {e}")
         return None
 
-# Cargar datos al iniciar
+def importar_diferidos():
+    """Importa los módulos pesados que se difieren hasta el primer gráfico"""
+    with perfil.fase('importacion:diferida'):
+        for modulo in IMPORTACIONES_DIFERIDAS:
+            importlib.import_module(modulo)
+
+def precargar(grupos=None):
+    """Módulos diferidos y partes de los datos que usan los tabs, en orden"""
+    importar_diferidos()
+    datos.precargar(GRUPOS_PRECARGA if grupos is None else grupos)
+
+def iniciar_precarga(grupos=None):
+    """Carga en segundo plano las partes que usan los tabs (DASHBOARD_PRECARGA=0 lo desactiva)"""
+    if datos is None or os.environ.get('DASHBOARD_PRECARGA', '1') == '0':
+        return None
+    hilo = threading.Thread(target=precargar, args=(grupos,), name='precarga-datos', daemon=True)
+    hilo.start()
+    return hilo
+
+# Perfil de arranque: cada joblib.load del modelo es una fase
+perfil.instrumentar(predict, 'cargar_pickle', 'joblib.load')
+
+# Cargar datos al iniciar (las huellas se toman antes para no perder cambios durante la carga)
+firmas_cargadas = firmas_origen()
 datos = cargar_datos()
+perfil.hito('registro_datos')
 
 # =====================================================================
 # FUNCIONES AUXILIARES
 # =====================================================================
 
-def combinar_datasets(datasets_seleccionados):
-    """Combina los datasets seleccionados"""
+def tamaño_derivado(valor):
+    """Bytes en memoria de un combinado, un cubo o un índice"""
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, CuboConteos):
+        return int(valor.conteos.memory_usage(deep=True).sum())
+    if isinstance(valor, IndiceBitmap):
+        return sum(bits.nbytes for por_valor in valor.bitmaps.values() for bits in por_valor.values())
+    return 0
+
+class AlmacenCombinados:
+    """Caché LRU de datasets combinados por selección normalizada, con límite en bytes
+
+    Cada entrada recuerda la versión de las fuentes con que se construyó: al
+    recargar una fuente solo se descartan las selecciones que la incluyen, y
+    un callback que aún usa la instantánea anterior no reemplaza entradas
+    de la vigente. Cada selección se construye fuera del lock del almacén,
+    con su propio lock: dos callbacks que piden la misma selección la
+    construyen una sola vez y los aciertos de otras selecciones no esperan.
+    """
+
+    def __init__(self, max_mb=256, tamaño=tamaño_derivado):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.bytes = 0
+        self._tamaño = tamaño
+        # clave -> (firma, valor, bytes)
+        self._entradas = OrderedDict()
+        self._en_curso = {}
+        self._generacion = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalizar(datasets_seleccionados):
+        """Clave de la selección: ordenada, sin duplicados e inmutable"""
+        return tuple(sorted(set(datasets_seleccionados or [])))
+
+    @staticmethod
+    def firma(fuente, clave):
+        """Versiones de las fuentes de una selección en una instantánea"""
+        versiones = fuente.get('versiones', {})
+        return tuple(versiones.get(d) for d in clave)
+
+    def obtener(self, datasets_seleccionados, fuente, construir):
+        """Retorna una vista de solo lectura del combinado, construyéndolo una sola vez"""
+        clave = self.normalizar(datasets_seleccionados)
+        firma = self.firma(fuente, clave)
+        with self._lock:
+            self._sincronizar(fuente)
+            df = self._leer(clave, firma)
+            if df is None:
+                construccion = self._en_curso.setdefault((clave, firma), threading.Lock())
+
+        if df is None:
+            with construccion:
+                # Otro callback pudo construirla mientras se esperaba
+                with self._lock:
+                    df = self._leer(clave, firma)
+                if df is None:
+                    try:
+                        df = construir(fuente, clave)
+                        tamaño = self._tamaño(df)
+                        with self._lock:
+                            if self._sincronizar(fuente):
+                                self._guardar(clave, firma, df, tamaño)
+                    finally:
+                        with self._lock:
+                            self._en_curso.pop((clave, firma), None)
+
+        # Copia superficial: con Copy-on-Write no duplica memoria ni expone el original
+        return df.copy(deep=False) if isinstance(df, pd.DataFrame) else df
+
+    def precalcular(self, fuente, construir):
+        """Construye, sin bloquear a los callbacks, las selecciones en caché que cambian con una instantánea nueva"""
+        with self._lock:
+            entradas = [(clave, firma) for clave, (firma, _, _) in self._entradas.items()]
+
+        preparadas = {}
+        for clave, firma_actual in entradas:
+            firma = self.firma(fuente, clave)
+            if firma != firma_actual:
+                df = construir(fuente, clave)
+                preparadas[clave] = (firma, df, self._tamaño(df))
+        return preparadas
+
+    def instalar(self, fuente, preparadas):
+        """Adopta una instantánea nueva con las selecciones ya precalculadas"""
+        with self._lock:
+            if not self._sincronizar(fuente):
+                return
+            for clave, (firma, df, tamaño) in preparadas.items():
+                self._guardar(clave, firma, df, tamaño)
+
+    def invalidar(self):
+        """Descarta todas las combinaciones almacenadas"""
+        with self._lock:
+            self._entradas.clear()
+            self.bytes = 0
+
+    def _leer(self, clave, firma):
+        entrada = self._entradas.get(clave)
+        if entrada is None or entrada[0] != firma:
+            return None
+        self._entradas.move_to_end(clave)
+        return entrada[1]
+
+    def _sincronizar(self, fuente):
+        """Adopta una instantánea más nueva descartando lo que depende de fuentes cambiadas; indica si es la vigente"""
+        generacion = fuente.get('generacion', 0)
+        if generacion > self._generacion:
+            self._generacion = generacion
+            obsoletas = [
+                clave for clave, (firma, _, _) in self._entradas.items()
+                if firma != self.firma(fuente, clave)
+            ]
+            for clave in obsoletas:
+                self.bytes -= self._entradas.pop(clave)[2]
+        return generacion == self._generacion
+
+    def _guardar(self, clave, firma, df, tamaño):
+        anterior = self._entradas.pop(clave, None)
+        if anterior is not None:
+            self.bytes -= anterior[2]
+        # Una selección más grande que el límite se usa pero no se guarda
+        if tamaño > self.max_bytes:
+            return
+        self._entradas[clave] = (firma, df, tamaño)
+        self.bytes += tamaño
+        while self.bytes > self.max_bytes:
+            _, (_, _, desalojado) = self._entradas.popitem(last=False)
+            self.bytes -= desalojado
+
+# Límites en memoria por worker de las cachés derivadas
+almacen_combinados = AlmacenCombinados(max_mb=float(os.environ.get('DASHBOARD_COMBINADOS_MB', 512)))
+almacen_cubos = AlmacenCombinados(max_mb=64)
+almacen_indices = AlmacenCombinados(max_mb=64)
+
+def recargar_datos():
+    """Recarga los datos desde disco e invalida las combinaciones en caché"""
+    global datos, firmas_cargadas
+    firmas_cargadas = firmas_origen()
+    datos = cargar_datos()
+    for almacen, _ in almacenes_derivados():
+        almacen.invalidar()
+    return datos
+
+def almacenes_derivados():
+    """Cachés derivadas de las fuentes, con la función que construye cada entrada"""
+    return [
+        (almacen_combinados, _construir_combinado),
+        (almacen_cubos, _construir_cubo),
+        (almacen_indices, _construir_indice),
+    ]
+
+def aplicar_recarga(cambiadas):
+    """Recarga las partes cambiadas y reemplaza la instantánea global de forma atómica"""
+    global datos
+    anterior = datos
+    nueva = construir_instantanea(anterior, cambiadas)
+    # Las partes cambiadas que ya estaban en uso se cargan antes del cambio; si
+    # alguna falla se conserva la instantánea anterior
+    for grupo in anterior.grupos_cargados() if anterior is not None else []:
+        nueva.cargar(grupo)
+
+    # Las selecciones en caché afectadas se recalculan antes del cambio, para
+    # que los usuarios no esperen una carga en frío tras la recarga
+    preparadas = [
+        (almacen, almacen.precalcular(nueva, construir))
+        for almacen, construir in almacenes_derivados()
+    ] if anterior is not None else []
+
+    # Los callbacks en curso conservan la instantánea que ya tomaron
+    datos = nueva
+    for almacen, entradas in preparadas:
+        almacen.instalar(nueva, entradas)
+
+    print(f"Datos recargados: {', '.join(sorted(cambiadas))}")
+    return nueva
+
+def iniciar_recarga(intervalo=None):
+    """Inicia el hilo que recarga los datos cuando cambian los archivos de origen (0 lo desactiva)"""
+    if intervalo is None:
+        intervalo = float(os.environ.get('DASHBOARD_RECARGA_SEG', 30))
+    if intervalo <= 0:
+        return None
+    vigilante = VigilanteArchivos(firmas_origen, aplicar_recarga, intervalo, firmas_iniciales=firmas_cargadas)
+    vigilante.iniciar()
+    return vigilante
+
+def version_figuras(tab, datasets_seleccionados, *filtros):
+    """Versión de las fuentes seleccionadas: recargar una fuente no invalida las figuras de las demás"""
     if datos is None:
         return None
+    return AlmacenCombinados.firma(datos, AlmacenCombinados.normalizar(datasets_seleccionados))
 
+# Posición de dataset-selector en los callbacks de los tabs: su orden no cambia la figura
+ENTRADA_DATASETS = 1
+
+# Caché de figuras: en disco compartido por los workers si se define DASHBOARD_CACHE_DIR
+cache_figuras = crear_cache(
+    version_figuras,
+    directorio=os.environ.get('DASHBOARD_CACHE_DIR'),
+    max_mb=float(os.environ.get('DASHBOARD_CACHE_MB', 256))
+)
+cache_figuras.montar(app.server)
+
+def combinar_datasets(datasets_seleccionados, fuente=None):
+    """Combina los datasets seleccionados"""
+    fuente = datos if fuente is None else fuente
+    if fuente is None:
+        return None
+
+    return almacen_combinados.obtener(datasets_seleccionados, fuente, _construir_combinado)
+
+def _construir_combinado(fuente, datasets_seleccionados):
+    """Concatena los datasets de una selección normalizada
+
+    Con segmentos, la concatenación de varios datasets la publica un solo
+    proceso y los demás workers la adjuntan (grupo `combinado.<datasets>`,
+    con la versión de cada fuente en la huella). Un solo dataset no se
+    publica: comparte sus columnas con la fuente.
+    """
+    presentes = tuple(d for d in datasets_seleccionados if d in ORIGENES and d in fuente)
+    if not presentes:
+        return None
+    if segmentos is None or len(presentes) == 1:
+        return _concatenar_fuentes(fuente, presentes)
+
+    firma = hashlib.sha1(repr(AlmacenCombinados.firma(fuente, presentes)).encode('utf-8')).hexdigest()[:16]
+    tablas = segmentos.obtener(
+        f"combinado.{'+'.join(presentes)}", firma, lambda: {'registros': _concatenar_fuentes(fuente, presentes)}
+    )
+    return tablas['registros']
+
+def _concatenar_fuentes(fuente, presentes):
+    """Registros de los datasets etiquetados con su origen, uno tras otro"""
     dfs = []
-    for dataset in datasets_seleccionados:
-        if dataset == 'academica' and 'academica' in datos:
-            df_temp = datos['academica'].copy()
-            df_temp['dataset_origen'] = 'Académica'
-            dfs.append(df_temp)
-        elif dataset == 'no_academica' and 'no_academica' in datos:
-            df_temp = datos['no_academica'].copy()
-            df_temp['dataset_origen'] = 'No Académica UPTC'
-            dfs.append(df_temp)
-        elif dataset == 'sena' and 'sena' in datos:
-            df_temp = datos['sena'].copy()
-            df_temp['dataset_origen'] = 'SENA'
-            dfs.append(df_temp)
-
-    if not dfs:
+    for dataset in presentes:
+        df = fuente[dataset]
+        origen = pd.Series(ORIGENES[dataset], index=df.index, dtype=TIPO_ORIGEN)
+        dfs.append(df.assign(dataset_origen=origen))
+
+    # Concatenar datasets (con columnas alineadas para conservar los tipos categóricos)
+    return pd.concat(alinear_columnas(dfs), ignore_index=True)
+
+def cubo_datasets(datasets_seleccionados, fuente=None):
+    """Cubo de conteos de los datasets seleccionados"""
+    fuente = datos if fuente is None else fuente
+    if fuente is None:
+        return None
+
+    return almacen_cubos.obtener(datasets_seleccionados, fuente, _construir_cubo)
+
+def _construir_cubo(fuente, datasets_seleccionados):
+    """Une los cubos de una selección normalizada"""
+    cubos = fuente.get('cubos', {})
+    return CuboConteos.combinar(cubos[d] for d in datasets_seleccionados if d in cubos)
+
+def indice_datasets(datasets_seleccionados, fuente=None):
+    """Índice bitmap alineado con los registros de combinar_datasets"""
+    fuente = datos if fuente is None else fuente
+    if fuente is None:
+        return None
+
+    return almacen_indices.obtener(datasets_seleccionados, fuente, _construir_indice)
+
+def _construir_indice(fuente, datasets_seleccionados):
+    """Une los índices de una selección normalizada en el orden de concatenación"""
+    indices = fuente.get('indices', {})
+    return IndiceBitmap.combinar(
+        indices[d] for d in datasets_seleccionados if d in ORIGENES and d in indices
+    )
+
+def filtrar_registros(df, indice, **valores):
+    """Filtra los registros combinados con el índice bitmap ('all' no filtra)"""
+    filtros = filtros_cubo(indice, **valores)
+    if not filtros:
+        return df
+    return df[indice.filas(indice.seleccionar(**filtros))]
+
+def valor_estrato(estrato):
+    """Valor numérico del filtro de estrato (None si es 'all' o no es numérico)"""
+    try:
+        return int(estrato)
+    except (ValueError, TypeError):
         return None
 
-    # Concatenar datasets
-    df_combinado = pd.concat(dfs, ignore_index=True)
-    return df_combinado
+class ContextoTab:
+    """Selección resuelta una sola vez para todos los gráficos de un tab"""
+
+    def __init__(self, datasets_seleccionados):
+        self.datasets_seleccionados = datasets_seleccionados
+        # Una sola instantánea por petición, aunque una recarga la reemplace a mitad de camino
+        self.fuente = datos
+        self.cubo = cubo_datasets(datasets_seleccionados, self.fuente)
+        self._df = None
+        self._indice = None
+        self._filtrados = {}
+
+    @property
+    def df(self):
+        """Registros combinados (solo se obtienen si algún gráfico los necesita)"""
+        if self._df is None:
+            self._df = combinar_datasets(self.datasets_seleccionados, self.fuente)
+        return self._df
+
+    @property
+    def indice(self):
+        """Índice bitmap alineado con los registros combinados"""
+        if self._indice is None:
+            self._indice = indice_datasets(self.datasets_seleccionados, self.fuente)
+        return self._indice
+
+    def filtrar(self, **valores):
+        """Registros combinados filtrados con el índice bitmap (una vez por combinación de filtros)"""
+        if self.df is None:
+            return None
+        clave = tuple(sorted(valores.items()))
+        if clave not in self._filtrados:
+            self._filtrados[clave] = filtrar_registros(self.df, self.indice, **valores)
+        return self._filtrados[clave]
+
+def ordenar_conteos(conteos):
+    """Ordena conteos de mayor a menor como value_counts"""
+    return conteos[conteos > 0].sort_values(ascending=False, kind='stable')
+
+def filtros_cubo(cubo, **valores):
+    """Filtros activos para el cubo o el índice: ignora 'all' y las dimensiones ausentes en la selección"""
+    return {
+        dim: valor for dim, valor in valores.items()
+        if valor is not None and valor != 'all' and dim in cubo.columnas
+    }
+
+# Opciones de los filtros de los tabs Demográfico y Académico:
+# filtro -> (dimensión del índice, orden, valor -> opción). 'aparicion' sigue el
+# orden de primera aparición en la concatenación (como IndiceBitmap.valores);
+# 'global' ordena los valores; una lista fija se ofrece si la dimensión existe
+OPCIONES_EDAD = [
+    {'label': '16-20 años', 'value': '16-20'},
+    {'label': '21-25 años', 'value': '21-25'},
+    {'label': '26-30 años', 'value': '26-30'},
+    {'label': '31+ años', 'value': '31+'},
+]
+FILTROS_OPCIONES = {
+    'filter-genero': ('genero', 'aparicion', lambda g: {'label': g, 'value': g}),
+    'filter-edad': ('rango_edad', OPCIONES_EDAD, None),
+    # Solo estratos numéricos (estrato_num es nulo para 'SIN INFORMACION')
+    'filter-estrato': ('estrato_num', 'global', lambda e: {'label': f'Estrato {e}', 'value': str(e)}),
+    'filter-facultad': ('nombre_facultad', 'global',
+                        lambda f: {'label': str(f)[:50] + '...' if len(str(f)) > 50 else str(f), 'value': f}),
+    'filter-modalidad': ('modalidad', 'global', lambda m: {'label': m, 'value': m}),
+    'filter-jornada': ('jornada', 'global', lambda j: {'label': j, 'value': j}),
+}
+
+def manifiesto_opciones(indices):
+    """Valores de cada filtro por fuente; el navegador deriva las opciones de cualquier selección (assets/filtros.js)
+
+    Cada filtro guarda la lista global de opciones y, por fuente, las
+    posiciones de las que aparecen en ella.
+    """
+    fuentes = sorted(indices)
+    filtros = {}
+    for filtro, (dim, orden, opcion) in FILTROS_OPCIONES.items():
+        presentes = [f for f in fuentes if dim in indices[f].columnas]
+        if isinstance(orden, list):
+            filtros[filtro] = {
+                'orden': 'global', 'opciones': orden,
+                'fuentes': {f: list(range(len(orden))) for f in presentes},
+            }
+            continue
+        por_fuente = {f: indices[f].valores(dim) for f in presentes}
+        valores = list(dict.fromkeys(v for f in presentes for v in por_fuente[f]))
+        if orden == 'global':
+            valores = sorted(valores)
+        posicion = {v: i for i, v in enumerate(valores)}
+        filtros[filtro] = {
+            'orden': orden,
+            'opciones': [opcion(v) for v in valores],
+            'fuentes': {f: [posicion[v] for v in por_fuente[f]] for f in presentes},
+        }
+    return {'filtros': filtros}
+
+def contar_valores(serie):
+    """value_counts sin las categorías del diccionario compartido que no aparecen"""
+    conteos = serie.value_counts()
+    return conteos[conteos > 0]
 
 def crear_kpi_card(titulo, valor, icono, color="primary"):
     """Crea una tarjeta de KPI"""
@@ -113,6 +745,40 @@ def crear_kpi_card(titulo, valor, icono, color="primary"):
         ])
     ], className="shadow-sm mb-4")
 
+def aviso_sin_datos(nombre):
+    """Tarjeta que reemplaza una sección cuya fuente no se pudo cargar"""
+    return dbc.Alert([
+        html.I(className="fas fa-exclamation-triangle me-2"),
+        f"Sin datos de '{nombre}': el archivo no está disponible; el resto del tablero sigue funcionando"
+    ], color="warning", className="mb-4")
+
+def figura_error():
+    """Figura vacía con un aviso, para el gráfico cuyo constructor falló"""
+    fig = go.Figure()
+    fig.add_annotation(text="No se pudo generar este gráfico", showarrow=False,
+                       font=dict(size=14, color='#dc3545'))
+    fig.update_layout(template='plotly_white', xaxis=dict(visible=False), yaxis=dict(visible=False))
+    return fig
+
+def salidas_aisladas(callback, constructores, componentes=()):
+    """Ejecuta cada constructor por separado: si uno falla, solo su salida muestra el error
+
+    componentes son las posiciones cuya salida es un componente (children) y
+    no una figura. El error se registra en el log y en las métricas.
+    """
+    salidas = SalidaParcial()
+    for i, construir in enumerate(constructores):
+        try:
+            salidas.append(construir())
+        except Exception as e:
+            print(f"Error en {callback} (salida {i}): {e}")
+            traceback.print_exc()
+            metricas.contar_error(callback)
+            salidas.errores += 1
+            salidas.append(dbc.Alert("No se pudo generar esta tabla", color="danger")
+                           if i in componentes else figura_error())
+    return salidas
+
 def calcular_kpis_principales(df):
     """Calcula KPIs principales del dataset"""
     total = len(df)
@@ -121,11 +787,13 @@ def calcular_kpis_principales(df):
         'total_desertores': f"{total:,}",
         'edad_promedio': f"{df['edad'].mean():.1f} años" if 'edad' in df.columns else "N/A",
         'genero_mayor': df['genero'].mode()[0] if 'genero' in df.columns else "N/A",
-        'facultad_critica': df['nombre_facultad'].value_counts().index[0][:30] + "..." if 'nombre_facultad' in df.columns else "N/A"
+        'facultad_critica': contar_valores(df['nombre_facultad']).index[0][:30] + "..." if 'nombre_facultad' in df.columns else "N/A"
     }
 
     return kpis_dict
 
+perfil.hito('funciones_auxiliares')
+
 # =====================================================================
 # LAYOUT PRINCIPAL
 # =====================================================================
@@ -201,14 +869,27 @@ dataset_selector = dbc.Card([
 ], className="mb-3")
 
 # Layout principal
-app.layout = html.Div([
-    header,
-    dbc.Container([
-        dataset_selector,
-        tabs,
-        html.Div(id="tab-content")
-    ], fluid=True)
-])
+def servir_layout():
+    """Layout principal con el manifiesto de opciones de los filtros de los datos vigentes
+
+    Se sirve en cada carga de la página; fuera de una petición (validación
+    de Dash al asignarlo) no carga datos.
+    """
+    manifiesto = None
+    if has_request_context() and datos is not None:
+        manifiesto = datos['opciones']
+    return html.Div([
+        header,
+        dbc.Container([
+            dataset_selector,
+            tabs,
+            html.Div(id="tab-content")
+        ], fluid=True),
+        dcc.Store(id='manifiesto-filtros', data=manifiesto)
+    ])
+
+app.layout = servir_layout
+perfil.hito('layout')
 
 # =====================================================================
 # TAB: OVERVIEW
@@ -220,16 +901,20 @@ def crear_tab_overview():
     if datos is None:
         return html.Div("Error cargando datos")
 
-    df = datos['academica']
-    kpis_dict = calcular_kpis_principales(df)
-
-    # KPIs principales
-    kpis_row = dbc.Row([
-        dbc.Col(crear_kpi_card("Total Desertores", kpis_dict['total_desertores'], "fa-users", "danger"), md=3),
-        dbc.Col(crear_kpi_card("Edad Promedio", kpis_dict['edad_promedio'], "fa-birthday-cake", "info"), md=3),
-        dbc.Col(crear_kpi_card("Género Predominante", kpis_dict['genero_mayor'], "fa-venus-mars", "warning"), md=3),
-        dbc.Col(crear_kpi_card("Facultad Crítica", kpis_dict['facultad_critica'], "fa-university", "success"), md=3),
-    ])
+    # Sin la fuente académica solo se degradan sus KPIs; los gráficos usan las demás fuentes
+    df = datos.get('academica')
+    if df is None:
+        kpis_row = aviso_sin_datos('academica')
+    else:
+        kpis_dict = calcular_kpis_principales(df)
+
+        # KPIs principales
+        kpis_row = dbc.Row([
+            dbc.Col(crear_kpi_card("Total Desertores", kpis_dict['total_desertores'], "fa-users", "danger"), md=3),
+            dbc.Col(crear_kpi_card("Edad Promedio", kpis_dict['edad_promedio'], "fa-birthday-cake", "info"), md=3),
+            dbc.Col(crear_kpi_card("Género Predominante", kpis_dict['genero_mayor'], "fa-venus-mars", "warning"), md=3),
+            dbc.Col(crear_kpi_card("Facultad Crítica", kpis_dict['facultad_critica'], "fa-university", "success"), md=3),
+        ])
 
     # Gráficos principales - 3 columnas
     graficos_row1 = dbc.Row([
@@ -474,8 +1159,15 @@ def crear_tab_metricas():
     if datos is None:
         return html.Div("Error cargando datos")
 
-    df = datos['academica']
-    kpis_data = datos['kpis']
+    # Una fuente que falta deja su sección como aviso y el resto de la pestaña sigue
+    df = datos.get('academica')
+    kpis_data = datos.get('kpis')
+    avisos = [
+        aviso_sin_datos(nombre)
+        for nombre, tabla in (('academica', df), ('kpis', kpis_data)) if tabla is None or tabla.empty
+    ]
+    df = pd.DataFrame() if df is None else df
+    kpis_data = pd.DataFrame() if kpis_data is None else kpis_data
 
     # Calcular métricas de calidad de datos
     total_registros = len(df)
@@ -498,6 +1190,7 @@ def crear_tab_metricas():
 
     return html.Div([
         html.H2("Métricas, KPIs y Calidad de Datos", className="mb-4"),
+        *avisos,
 
         # Sección 1: KPIs del Diseño BI
         dbc.Row([
@@ -747,11 +1440,11 @@ def actualizar_info_datasets(datasets_seleccionados):
     if not datasets_seleccionados:
         return html.Span("⚠️ Seleccione al menos un dataset", className="text-warning")
 
-    df = combinar_datasets(datasets_seleccionados)
-    if df is None:
+    cubo = cubo_datasets(datasets_seleccionados)
+    if cubo is None:
         return html.Span("❌ Error cargando datasets", className="text-danger")
 
-    total = len(df)
+    total = cubo.total()
     datasets_nombres = []
     if 'academica' in datasets_seleccionados:
         datasets_nombres.append("Académica")
@@ -783,23 +1476,14 @@ def render_tab_content(active_tab):
         return crear_tab_predictor()
     return html.Div("Seleccione una pestaña")
 
-# Callbacks para gráficos de Overview
-@app.callback(
-    Output('graph-temporal-overview', 'figure'),
-    [Input('tabs', 'active_tab'),
-     Input('dataset-selector', 'value')]
-)
-def update_temporal_graph(tab, datasets_seleccionados):
-    if datos is None or tab != 'tab-overview':
-        return {}
-
-    df = combinar_datasets(datasets_seleccionados)
-    if df is None:
-        return {}
-    if 'periodo_año' not in df.columns:
+# Gráficos de Overview (construidos por actualizar_tab_overview)
+def crear_grafico_temporal(cubo):
+    """Evolución del número de desertores por año"""
+    import plotly.express as px
+    if cubo is None or 'periodo_año' not in cubo.columnas:
         return {}
 
-    temporal = df.groupby('periodo_año').size().reset_index(name='count')
+    temporal = cubo.contar('periodo_año').reset_index(name='count')
 
     fig = px.line(
         temporal,
@@ -814,22 +1498,12 @@ def update_temporal_graph(tab, datasets_seleccionados):
 
     return fig
 
-@app.callback(
-    Output('graph-genero-overview', 'figure'),
-    [Input('tabs', 'active_tab'),
-     Input('dataset-selector', 'value')]
-)
-def update_genero_graph(tab, datasets_seleccionados):
-    if datos is None or tab != 'tab-overview':
-        return {}
-
-    df = combinar_datasets(datasets_seleccionados)
-    if df is None:
-        return {}
-    if 'genero' not in df.columns:
+def crear_grafico_genero(cubo):
+    """Distribución por género"""
+    if cubo is None or 'genero' not in cubo.columnas:
         return {}
 
-    genero_counts = df['genero'].value_counts()
+    genero_counts = ordenar_conteos(cubo.contar('genero'))
 
     fig = go.Figure(data=[go.Pie(
         labels=genero_counts.index,
@@ -841,22 +1515,12 @@ def update_genero_graph(tab, datasets_seleccionados):
 
     return fig
 
-@app.callback(
-    Output('graph-facultades-overview', 'figure'),
-    [Input('tabs', 'active_tab'),
-     Input('dataset-selector', 'value')]
-)
-def update_facultades_graph(tab, datasets_seleccionados):
-    if datos is None or tab != 'tab-overview':
+def crear_grafico_facultades(cubo):
+    """Top 10 facultades con más desertores"""
+    if cubo is None or 'nombre_facultad' not in cubo.columnas:
         return {}
 
-    df = combinar_datasets(datasets_seleccionados)
-    if df is None:
-        return {}
-    if 'nombre_facultad' not in df.columns:
-        return {}
-
-    top10 = df['nombre_facultad'].value_counts().head(10)
+    top10 = ordenar_conteos(cubo.contar('nombre_facultad')).head(10)
 
     fig = go.Figure(data=[go.Bar(
         y=[str(x)[:40] + '...' if len(str(x)) > 40 else str(x) for x in top10.index],
@@ -873,22 +1537,13 @@ def update_facultades_graph(tab, datasets_seleccionados):
 
     return fig
 
-@app.callback(
-    Output('graph-modalidad-overview', 'figure'),
-    [Input('tabs', 'active_tab'),
-     Input('dataset-selector', 'value')]
-)
-def update_modalidad_graph(tab, datasets_seleccionados):
-    if datos is None or tab != 'tab-overview':
-        return {}
-
-    df = combinar_datasets(datasets_seleccionados)
-    if df is None:
-        return {}
-    if 'modalidad' not in df.columns:
+def crear_grafico_modalidad(cubo):
+    """Desertores por modalidad"""
+    import plotly.express as px
+    if cubo is None or 'modalidad' not in cubo.columnas:
         return {}
 
-    modalidad_counts = df['modalidad'].value_counts()
+    modalidad_counts = ordenar_conteos(cubo.contar('modalidad'))
 
     fig = px.bar(
         x=modalidad_counts.index,
@@ -905,20 +1560,12 @@ def update_modalidad_graph(tab, datasets_seleccionados):
 
     return fig
 
-@app.callback(
-    Output('graph-dataset-overview', 'figure'),
-    [Input('tabs', 'active_tab'),
-     Input('dataset-selector', 'value')]
-)
-def update_dataset_graph(tab, datasets_seleccionados):
-    if datos is None or tab != 'tab-overview' or not datasets_seleccionados:
-        return {}
-
-    df = combinar_datasets(datasets_seleccionados)
-    if df is None or 'dataset_origen' not in df.columns:
+def crear_grafico_dataset(cubo):
+    """Distribución de registros por dataset"""
+    if cubo is None or 'dataset_origen' not in cubo.columnas:
         return {}
 
-    dataset_counts = df['dataset_origen'].value_counts()
+    dataset_counts = ordenar_conteos(cubo.contar('dataset_origen'))
 
     fig = go.Figure(data=[go.Pie(
         labels=dataset_counts.index,
@@ -930,25 +1577,14 @@ def update_dataset_graph(tab, datasets_seleccionados):
 
     return fig
 
-@app.callback(
-    Output('graph-estrato-overview', 'figure'),
-    [Input('tabs', 'active_tab'),
-     Input('dataset-selector', 'value')]
-)
-def update_estrato_overview_graph(tab, datasets_seleccionados):
-    if datos is None or tab != 'tab-overview':
+def crear_grafico_estrato_overview(cubo):
+    """Desertores por estrato socioeconómico"""
+    import plotly.express as px
+    if cubo is None or 'estrato_num' not in cubo.columnas:
         return {}
 
-    df = combinar_datasets(datasets_seleccionados)
-    if df is None or 'estrato' not in df.columns:
-        return {}
-
-    # Filtrar solo valores numéricos
-    df_temp = df.copy()
-    df_temp['estrato_num'] = pd.to_numeric(df_temp['estrato'], errors='coerce')
-    df_temp = df_temp[df_temp['estrato_num'].notna()]
-
-    estrato_counts = df_temp['estrato_num'].value_counts().sort_index()
+    # Solo valores numéricos (estrato_num es nulo para 'SIN INFORMACION')
+    estrato_counts = cubo.contar('estrato_num')
 
     fig = px.bar(
         x=[f'Estrato {int(e)}' for e in estrato_counts.index],
@@ -961,21 +1597,42 @@ def update_estrato_overview_graph(tab, datasets_seleccionados):
 
     return fig
 
-# =====================================================================
-# CALLBACKS PARA TAB MÉTRICAS & KPIs
-# =====================================================================
-
+# Callback único del tab Overview: un solo cubo para los seis gráficos
 @app.callback(
-    Output('graph-completitud-metricas', 'figure'),
+    [
+        Output('graph-temporal-overview', 'figure'),
+        Output('graph-genero-overview', 'figure'),
+        Output('graph-facultades-overview', 'figure'),
+        Output('graph-modalidad-overview', 'figure'),
+        Output('graph-dataset-overview', 'figure'),
+        Output('graph-estrato-overview', 'figure')
+    ],
     [Input('tabs', 'active_tab'),
      Input('dataset-selector', 'value')]
 )
-def actualizar_grafico_completitud(tab, datasets_seleccionados):
-    """Actualiza el gráfico de completitud de datos"""
-    if datos is None or tab != 'tab-metricas':
-        return {}
+@cache_figuras.memorizar('tab-overview', conjuntos=(ENTRADA_DATASETS,))
+def actualizar_tab_overview(tab, datasets_seleccionados):
+    """Actualiza todos los gráficos del tab Overview"""
+    if datos is None or tab != 'tab-overview':
+        return [{}] * 6
 
-    df = combinar_datasets(datasets_seleccionados)
+    cubo = ContextoTab(datasets_seleccionados).cubo
+
+    return salidas_aisladas('actualizar_tab_overview', [
+        lambda: crear_grafico_temporal(cubo),
+        lambda: crear_grafico_genero(cubo),
+        lambda: crear_grafico_facultades(cubo),
+        lambda: crear_grafico_modalidad(cubo),
+        lambda: crear_grafico_dataset(cubo),
+        lambda: crear_grafico_estrato_overview(cubo)
+    ])
+
+# =====================================================================
+# CALLBACKS PARA TAB MÉTRICAS & KPIs
+# =====================================================================
+
+def crear_grafico_completitud(df):
+    """Gauge de completitud promedio de las columnas"""
     if df is None:
         return {}
 
@@ -1021,17 +1678,8 @@ def actualizar_grafico_completitud(tab, datasets_seleccionados):
 
     return fig
 
-@app.callback(
-    Output('stats-edad-table', 'children'),
-    [Input('tabs', 'active_tab'),
-     Input('dataset-selector', 'value')]
-)
-def actualizar_stats_edad(tab, datasets_seleccionados):
-    """Actualiza la tabla de estadísticas de edad"""
-    if datos is None or tab != 'tab-metricas':
-        return html.Div()
-
-    df = combinar_datasets(datasets_seleccionados)
+def crear_stats_edad(df):
+    """Tabla de estadísticas de edad"""
     if df is None:
         return html.Div()
 
@@ -1058,43 +1706,34 @@ def actualizar_stats_edad(tab, datasets_seleccionados):
         responsive=True
     )
 
-@app.callback(
-    Output('stats-variables-table', 'children'),
-    [Input('tabs', 'active_tab'),
-     Input('dataset-selector', 'value')]
-)
-def actualizar_stats_variables(tab, datasets_seleccionados):
-    """Actualiza la tabla de distribución por variables"""
-    if datos is None or tab != 'tab-metricas':
-        return html.Div()
-
-    df = combinar_datasets(datasets_seleccionados)
-    if df is None:
+def crear_stats_variables(cubo):
+    """Tabla de distribución por variables"""
+    if cubo is None:
         return html.Div()
 
     table_rows = []
 
     # Género
-    if 'genero' in df.columns:
-        genero_counts = df['genero'].value_counts()
+    if 'genero' in cubo.columnas:
+        genero_counts = ordenar_conteos(cubo.contar('genero'))
         genero_str = ", ".join([f"{k}: {v:,}" for k, v in genero_counts.items()])
         table_rows.append(html.Tr([html.Td(html.Strong("Género")), html.Td(genero_str)]))
 
     # Modalidad
-    if 'modalidad' in df.columns:
-        modalidad_counts = df['modalidad'].value_counts()
+    if 'modalidad' in cubo.columnas:
+        modalidad_counts = ordenar_conteos(cubo.contar('modalidad'))
         modalidad_str = ", ".join([f"{k}: {v:,}" for k, v in modalidad_counts.items()])
         table_rows.append(html.Tr([html.Td(html.Strong("Modalidad")), html.Td(modalidad_str)]))
 
     # Jornada
-    if 'jornada' in df.columns:
-        jornada_counts = df['jornada'].value_counts().head(3)
+    if 'jornada' in cubo.columnas:
+        jornada_counts = ordenar_conteos(cubo.contar('jornada')).head(3)
         jornada_str = ", ".join([f"{k}: {v:,}" for k, v in jornada_counts.items()])
         table_rows.append(html.Tr([html.Td(html.Strong("Jornada (Top 3)")), html.Td(jornada_str)]))
 
     # Estrato
-    if 'estrato' in df.columns:
-        estrato_counts = df['estrato'].value_counts().head(3)
+    if 'estrato' in cubo.columnas:
+        estrato_counts = ordenar_conteos(cubo.contar('estrato')).head(3)
         estrato_str = ", ".join([f"{k}: {v:,}" for k, v in estrato_counts.items()])
         table_rows.append(html.Tr([html.Td(html.Strong("Estrato (Top 3)")), html.Td(estrato_str)]))
 
@@ -1106,24 +1745,15 @@ def actualizar_stats_variables(tab, datasets_seleccionados):
         responsive=True
     )
 
-@app.callback(
-    Output('table-top-facultades', 'children'),
-    [Input('tabs', 'active_tab'),
-     Input('dataset-selector', 'value')]
-)
-def actualizar_tabla_facultades(tab, datasets_seleccionados):
-    """Actualiza la tabla de top facultades"""
-    if datos is None or tab != 'tab-metricas':
+def crear_tabla_facultades(cubo):
+    """Tabla de top facultades"""
+    if cubo is None:
         return html.Div()
 
-    df = combinar_datasets(datasets_seleccionados)
-    if df is None:
-        return html.Div()
-
-    if 'nombre_facultad' not in df.columns:
+    if 'nombre_facultad' not in cubo.columnas:
         return html.Div("No hay datos de facultades disponibles")
 
-    top_facultades = df['nombre_facultad'].value_counts().head(10).reset_index()
+    top_facultades = ordenar_conteos(cubo.contar('nombre_facultad')).head(10).reset_index()
     top_facultades.columns = ['Facultad', 'Cantidad']
 
     # Crear tabla
@@ -1155,25 +1785,16 @@ def actualizar_tabla_facultades(tab, datasets_seleccionados):
         size='sm'
     )
 
-@app.callback(
-    Output('graph-modalidad-jornada-metricas', 'figure'),
-    [Input('tabs', 'active_tab'),
-     Input('dataset-selector', 'value')]
-)
-def actualizar_grafico_modalidad_jornada(tab, datasets_seleccionados):
-    """Actualiza el gráfico de modalidad vs jornada"""
-    if datos is None or tab != 'tab-metricas':
-        return {}
-
-    df = combinar_datasets(datasets_seleccionados)
-    if df is None:
+def crear_grafico_modalidad_jornada(cubo):
+    """Gráfico de modalidad vs jornada"""
+    if cubo is None:
         return {}
 
-    if 'modalidad' not in df.columns or 'jornada' not in df.columns:
+    if 'modalidad' not in cubo.columnas or 'jornada' not in cubo.columnas:
         return {}
 
     # Crear tabla cruzada
-    cross_tab = pd.crosstab(df['modalidad'], df['jornada'])
+    cross_tab = cubo.contar(['modalidad', 'jornada']).unstack(fill_value=0)
 
     fig = go.Figure()
 
@@ -1197,84 +1818,59 @@ def actualizar_grafico_modalidad_jornada(tab, datasets_seleccionados):
 
     return fig
 
-# =====================================================================
-# CALLBACKS PARA TAB DEMOGRÁFICO
-# =====================================================================
-
-# Callback para poblar los filtros demográficos
+# Callback único del tab Métricas: combinado y cubo resueltos una sola vez
 @app.callback(
     [
-        Output('filter-genero', 'options'),
-        Output('filter-edad', 'options'),
-        Output('filter-estrato', 'options')
+        Output('graph-completitud-metricas', 'figure'),
+        Output('stats-edad-table', 'children'),
+        Output('stats-variables-table', 'children'),
+        Output('table-top-facultades', 'children'),
+        Output('graph-modalidad-jornada-metricas', 'figure')
     ],
     [Input('tabs', 'active_tab'),
      Input('dataset-selector', 'value')]
 )
-def actualizar_filtros_demografico(tab, datasets_seleccionados):
-    """Actualiza las opciones de los filtros demográficos"""
-    if datos is None or tab != 'tab-demografico':
-        default_options = [{'label': 'Todos', 'value': 'all'}]
-        return default_options, default_options, default_options
+@cache_figuras.memorizar('tab-metricas', conjuntos=(ENTRADA_DATASETS,))
+def actualizar_tab_metricas(tab, datasets_seleccionados):
+    """Actualiza todos los gráficos y tablas del tab Métricas"""
+    if datos is None or tab != 'tab-metricas':
+        return [{}, html.Div(), html.Div(), html.Div(), {}]
 
-    df = combinar_datasets(datasets_seleccionados)
-    if df is None:
-        default_options = [{'label': 'Todos', 'value': 'all'}]
-        return default_options, default_options, default_options
-
-    # Opciones de género
-    genero_opts = [{'label': 'Todos', 'value': 'all'}]
-    if 'genero' in df.columns:
-        genero_opts.extend([
-            {'label': g, 'value': g} for g in df['genero'].dropna().unique()
-        ])
+    contexto = ContextoTab(datasets_seleccionados)
 
-    # Opciones de edad (por rangos)
-    edad_opts = [{'label': 'Todos', 'value': 'all'}]
-    if 'edad' in df.columns:
-        edad_opts.extend([
-            {'label': '16-20 años', 'value': '16-20'},
-            {'label': '21-25 años', 'value': '21-25'},
-            {'label': '26-30 años', 'value': '26-30'},
-            {'label': '31+ años', 'value': '31+'}
-        ])
+    return salidas_aisladas('actualizar_tab_metricas', [
+        lambda: crear_grafico_completitud(contexto.df),
+        lambda: crear_stats_edad(contexto.df),
+        lambda: crear_stats_variables(contexto.cubo),
+        lambda: crear_tabla_facultades(contexto.cubo),
+        lambda: crear_grafico_modalidad_jornada(contexto.cubo)
+    ], componentes=(1, 2, 3))
 
-    # Opciones de estrato
-    estrato_opts = [{'label': 'Todos', 'value': 'all'}]
-    if 'estrato' in df.columns:
-        # Filtrar solo valores numéricos válidos
-        estratos = df['estrato'].dropna().unique()
-        estratos_numericos = []
-        for e in estratos:
-            try:
-                estratos_numericos.append(int(float(e)))
-            except (ValueError, TypeError):
-                pass  # Ignorar valores no numéricos como 'SIN INFORMACION'
-
-        estratos_numericos = sorted(set(estratos_numericos))
-        estrato_opts.extend([
-            {'label': f'Estrato {e}', 'value': str(e)} for e in estratos_numericos
-        ])
-
-    return genero_opts, edad_opts, estrato_opts
+# =====================================================================
+# CALLBACKS PARA TAB DEMOGRÁFICO
+# =====================================================================
 
-# Callback para nuevo gráfico de género en demográfico
-@app.callback(
-    Output('graph-genero-demografico', 'figure'),
+# Callback para poblar los filtros demográficos
+# Opciones de los filtros: se derivan en el navegador del manifiesto (assets/filtros.js)
+app.clientside_callback(
+    ClientsideFunction(namespace='filtros', function_name='demografico'),
+    [
+        Output('filter-genero', 'options'),
+        Output('filter-edad', 'options'),
+        Output('filter-estrato', 'options')
+    ],
     [Input('tabs', 'active_tab'),
-     Input('dataset-selector', 'value'),
-     Input('filter-edad', 'value'),
-     Input('filter-estrato', 'value')]
+     Input('dataset-selector', 'value')],
+    State('manifiesto-filtros', 'data')
 )
-def actualizar_grafico_genero_demografico(tab, datasets_seleccionados, edad_rango, estrato):
-    if datos is None or tab != 'tab-demografico':
-        return {}
 
-    df = combinar_datasets(datasets_seleccionados)
-    if df is None or 'genero' not in df.columns:
+# Gráfico de género en demográfico
+def crear_grafico_genero_demografico(cubo):
+    """Distribución por género de los desertores"""
+    if cubo is None or 'genero' not in cubo.columnas:
         return {}
 
-    genero_counts = df['genero'].value_counts()
+    genero_counts = ordenar_conteos(cubo.contar('genero'))
 
     fig = go.Figure(data=[go.Pie(
         labels=genero_counts.index,
@@ -1286,51 +1882,29 @@ def actualizar_grafico_genero_demografico(tab, datasets_seleccionados, edad_rang
 
     return fig
 
-# Callback para gráfico de distribución de edad
-@app.callback(
-    Output('graph-edad-dist', 'figure'),
-    [
-        Input('tabs', 'active_tab'),
-        Input('dataset-selector', 'value'),
-        Input('filter-genero', 'value'),
-        Input('filter-estrato', 'value')
-    ]
-)
-def actualizar_grafico_edad(tab, datasets_seleccionados, genero, estrato):
-    """Actualiza el gráfico de distribución de edad"""
-    if datos is None or tab != 'tab-demografico':
-        return {}
-
-    df = combinar_datasets(datasets_seleccionados)
-    if df is None:
-        return {}
-
-    df = df.copy()
+# Gráfico de distribución de edad
+def crear_grafico_edad(df):
+    """Histograma de edad de los registros ya filtrados por género y estrato
 
-    if 'edad' not in df.columns:
+    Se envían los conteos por intervalo (calculados aquí con los mismos
+    intervalos que usaría plotly para nbins=30), no cada registro.
+    """
+    if df is None or 'edad' not in df.columns:
         return {}
 
-    # Aplicar filtros
-    if genero != 'all' and 'genero' in df.columns:
-        df = df[df['genero'] == genero]
-
-    if estrato != 'all' and 'estrato' in df.columns:
-        # Convertir estrato a numérico y filtrar
-        try:
-            estrato_val = int(estrato)
-            df = df[pd.to_numeric(df['estrato'], errors='coerce') == estrato_val]
-        except (ValueError, TypeError):
-            pass  # Si no se puede convertir, no filtrar
-
-    # Crear histograma
-    fig = px.histogram(
-        df,
-        x='edad',
-        nbins=30,
-        title="",
-        labels={'edad': 'Edad', 'count': 'Frecuencia'},
-        color_discrete_sequence=['#3498db']
-    )
+    histograma = intervalos(df['edad'], nbins=30)
+    if histograma is None:
+        traza = go.Histogram(x=[], marker_color='#3498db')
+    else:
+        traza = go.Histogram(
+            x=histograma.centros,
+            y=histograma.conteos,
+            histfunc='sum',
+            xbins=dict(start=histograma.inicio, end=histograma.fin, size=histograma.ancho),
+            marker_color='#3498db',
+            hovertemplate='Edad=%{x}<br>Frecuencia=%{y}<extra></extra>'
+        )
+    fig = go.Figure(data=[traza])
 
     fig.update_layout(
         template='plotly_white',
@@ -1341,50 +1915,22 @@ def actualizar_grafico_edad(tab, datasets_seleccionados, genero, estrato):
 
     return fig
 
-# Callback para gráfico de estratos
-@app.callback(
-    Output('graph-estrato-dist', 'figure'),
-    [
-        Input('tabs', 'active_tab'),
-        Input('dataset-selector', 'value'),
-        Input('filter-genero', 'value'),
-        Input('filter-edad', 'value')
-    ]
-)
-def actualizar_grafico_estrato(tab, datasets_seleccionados, genero, edad_rango):
-    """Actualiza el gráfico de deserción por estrato"""
-    if datos is None or tab != 'tab-demografico':
-        return {}
-
-    df = combinar_datasets(datasets_seleccionados)
-    if df is None:
-        return {}
-
-    df = df.copy()
-
-    if 'estrato' not in df.columns:
+# Gráfico de estratos
+def crear_grafico_estrato(cubo, genero, edad_rango):
+    """Deserción por estrato filtrada por género y rango de edad"""
+    import plotly.express as px
+    if cubo is None or 'estrato_num' not in cubo.columnas:
         return {}
 
     # Aplicar filtros
-    if genero != 'all' and 'genero' in df.columns:
-        df = df[df['genero'] == genero]
-
-    if edad_rango != 'all' and 'edad' in df.columns:
-        if edad_rango == '16-20':
-            df = df[(df['edad'] >= 16) & (df['edad'] <= 20)]
-        elif edad_rango == '21-25':
-            df = df[(df['edad'] >= 21) & (df['edad'] <= 25)]
-        elif edad_rango == '26-30':
-            df = df[(df['edad'] >= 26) & (df['edad'] <= 30)]
-        elif edad_rango == '31+':
-            df = df[df['edad'] >= 31]
+    filtros = filtros_cubo(
+        cubo,
+        genero=genero,
+        rango_edad=edad_rango if edad_rango in RANGOS_EDAD else None
+    )
 
     # Contar por estrato (solo valores numéricos)
-    df_estrato = df.copy()
-    df_estrato['estrato_num'] = pd.to_numeric(df_estrato['estrato'], errors='coerce')
-    df_estrato = df_estrato[df_estrato['estrato_num'].notna()]
-
-    estrato_counts = df_estrato['estrato_num'].value_counts().sort_index()
+    estrato_counts = cubo.contar('estrato_num', **filtros)
 
     fig = px.bar(
         x=[f'Estrato {int(e)}' for e in estrato_counts.index],
@@ -1404,151 +1950,123 @@ def actualizar_grafico_estrato(tab, datasets_seleccionados, genero, edad_rango):
 
     return fig
 
-# Callback para gráfico edad vs modalidad
+# Colores del box plot por modalidad (como px.box con color_discrete_map)
+COLORES_MODALIDAD = {
+    'PRESENCIAL': '#2ecc71',
+    'VIRTUAL': '#e74c3c',
+    'DISTANCIA': '#3498db'
+}
+SECUENCIA_COLORES = qualitative.Plotly
+
+# Gráfico edad vs modalidad
+def crear_grafico_edad_modalidad(df):
+    """Box plot de edad por modalidad de los registros ya filtrados por género y estrato
+
+    Cada caja llega con sus cuartiles y bigotes calculados aquí y una
+    muestra acotada de atípicos, no con cada registro.
+    """
+    if df is None or 'edad' not in df.columns or 'modalidad' not in df.columns:
+        return {}
+
+    # Colores como px.box: los de la tabla y, para otras modalidades, la secuencia por defecto
+    colores = dict(COLORES_MODALIDAD)
+    fig = go.Figure()
+    for caja in cajas(df['edad'], df['modalidad']):
+        if caja.nombre not in colores:
+            colores[caja.nombre] = SECUENCIA_COLORES[len(colores) % len(SECUENCIA_COLORES)]
+        fig.add_trace(go.Box(
+            name=caja.nombre,
+            x=[caja.nombre],
+            q1=[caja.q1],
+            median=[caja.mediana],
+            q3=[caja.q3],
+            lowerfence=[caja.bigote_inferior],
+            upperfence=[caja.bigote_superior],
+            # Los atípicos muestreados como puntos de la caja, sobre su eje
+            y=[caja.atipicos],
+            boxpoints='all',
+            jitter=0,
+            pointpos=0,
+            marker_color=colores[caja.nombre],
+            legendgroup=caja.nombre,
+            offsetgroup=caja.nombre,
+            alignmentgroup='True',
+            hovertemplate='Modalidad=%{x}<br>Edad=%{y}<extra></extra>'
+        ))
+
+    fig.update_layout(
+        template='plotly_white',
+        showlegend=False,
+        boxmode='group',
+        xaxis_title='Modalidad',
+        yaxis_title='Edad'
+    )
+
+    return fig
+
+# Callback único del tab Demográfico: selección y filtros resueltos una sola vez
 @app.callback(
-    Output('graph-edad-modalidad', 'figure'),
+    [
+        Output('graph-genero-demografico', 'figure'),
+        Output('graph-edad-dist', 'figure'),
+        Output('graph-estrato-dist', 'figure'),
+        Output('graph-edad-modalidad', 'figure')
+    ],
     [
         Input('tabs', 'active_tab'),
         Input('dataset-selector', 'value'),
         Input('filter-genero', 'value'),
+        Input('filter-edad', 'value'),
         Input('filter-estrato', 'value')
     ]
 )
-def actualizar_grafico_edad_modalidad(tab, datasets_seleccionados, genero, estrato):
-    """Actualiza el gráfico de edad vs modalidad"""
+@cache_figuras.memorizar('tab-demografico', conjuntos=(ENTRADA_DATASETS,))
+def actualizar_tab_demografico(tab, datasets_seleccionados, genero, edad_rango, estrato):
+    """Actualiza todos los gráficos del tab Demográfico"""
     if datos is None or tab != 'tab-demografico':
-        return {}
-
-    df = combinar_datasets(datasets_seleccionados)
-    if df is None:
-        return {}
-
-    df = df.copy()
-
-    if 'edad' not in df.columns or 'modalidad' not in df.columns:
-        return {}
-
-    # Aplicar filtros
-    if genero != 'all' and 'genero' in df.columns:
-        df = df[df['genero'] == genero]
+        return [{}] * 4
 
-    if estrato != 'all' and 'estrato' in df.columns:
-        # Convertir estrato a numérico y filtrar
-        try:
-            estrato_val = int(estrato)
-            df = df[pd.to_numeric(df['estrato'], errors='coerce') == estrato_val]
-        except (ValueError, TypeError):
-            pass  # Si no se puede convertir, no filtrar
-
-    # Crear box plot
-    fig = px.box(
-        df,
-        x='modalidad',
-        y='edad',
-        title="",
-        labels={'modalidad': 'Modalidad', 'edad': 'Edad'},
-        color='modalidad',
-        color_discrete_map={
-            'PRESENCIAL': '#2ecc71',
-            'VIRTUAL': '#e74c3c',
-            'DISTANCIA': '#3498db'
-        }
-    )
+    contexto = ContextoTab(datasets_seleccionados)
 
-    fig.update_layout(
-        template='plotly_white',
-        showlegend=False,
-        xaxis_title='Modalidad',
-        yaxis_title='Edad'
-    )
+    # Registros filtrados por género y estrato, compartidos por los gráficos de edad
+    filtros = dict(genero=genero, estrato_num=valor_estrato(estrato))
 
-    return fig
+    return salidas_aisladas('actualizar_tab_demografico', [
+        lambda: crear_grafico_genero_demografico(contexto.cubo),
+        lambda: crear_grafico_edad(contexto.filtrar(**filtros)),
+        lambda: crear_grafico_estrato(contexto.cubo, genero, edad_rango),
+        lambda: crear_grafico_edad_modalidad(contexto.filtrar(**filtros))
+    ])
 
 # =====================================================================
 # CALLBACKS PARA TAB ACADÉMICO
 # =====================================================================
 
 # Callback para poblar los filtros académicos
-@app.callback(
+# Opciones de los filtros: se derivan en el navegador del manifiesto (assets/filtros.js)
+app.clientside_callback(
+    ClientsideFunction(namespace='filtros', function_name='academico'),
     [
         Output('filter-facultad', 'options'),
         Output('filter-modalidad', 'options'),
         Output('filter-jornada', 'options')
     ],
     [Input('tabs', 'active_tab'),
-     Input('dataset-selector', 'value')]
-)
-def actualizar_filtros_academico(tab, datasets_seleccionados):
-    """Actualiza las opciones de los filtros académicos"""
-    if datos is None or tab != 'tab-academico':
-        default_options = [{'label': 'Todas', 'value': 'all'}]
-        return default_options, default_options, default_options
-
-    df = combinar_datasets(datasets_seleccionados)
-    if df is None:
-        default_options = [{'label': 'Todas', 'value': 'all'}]
-        return default_options, default_options, default_options
-
-    # Opciones de facultad
-    facultad_opts = [{'label': 'Todas', 'value': 'all'}]
-    if 'nombre_facultad' in df.columns:
-        facultades = df['nombre_facultad'].dropna().unique()
-        facultad_opts.extend([
-            {'label': str(f)[:50] + '...' if len(str(f)) > 50 else str(f), 'value': f}
-            for f in sorted(facultades)
-        ])
-
-    # Opciones de modalidad
-    modalidad_opts = [{'label': 'Todas', 'value': 'all'}]
-    if 'modalidad' in df.columns:
-        modalidades = df['modalidad'].dropna().unique()
-        modalidad_opts.extend([
-            {'label': m, 'value': m} for m in sorted(modalidades)
-        ])
-
-    # Opciones de jornada
-    jornada_opts = [{'label': 'Todas', 'value': 'all'}]
-    if 'jornada' in df.columns:
-        jornadas = df['jornada'].dropna().unique()
-        jornada_opts.extend([
-            {'label': j, 'value': j} for j in sorted(jornadas)
-        ])
-
-    return facultad_opts, modalidad_opts, jornada_opts
-
-# Callback para gráfico de deserción por facultad
-@app.callback(
-    Output('graph-facultad-analisis', 'figure'),
-    [
-        Input('tabs', 'active_tab'),
-        Input('dataset-selector', 'value'),
-        Input('filter-modalidad', 'value'),
-        Input('filter-jornada', 'value')
-    ]
+     Input('dataset-selector', 'value')],
+    State('manifiesto-filtros', 'data')
 )
-def actualizar_grafico_facultad(tab, datasets_seleccionados, modalidad, jornada):
-    """Actualiza el gráfico de deserción por facultad"""
-    if datos is None or tab != 'tab-academico':
-        return {}
-
-    df = combinar_datasets(datasets_seleccionados)
-    if df is None:
-        return {}
 
-    df = df.copy()
-
-    if 'nombre_facultad' not in df.columns:
+# Gráfico de deserción por facultad
+def crear_grafico_facultad(cubo, modalidad, jornada):
+    """Top 10 facultades filtradas por modalidad y jornada"""
+    if cubo is None or 'nombre_facultad' not in cubo.columnas:
         return {}
 
     # Aplicar filtros
-    if modalidad != 'all' and 'modalidad' in df.columns:
-        df = df[df['modalidad'] == modalidad]
-
-    if jornada != 'all' and 'jornada' in df.columns:
-        df = df[df['jornada'] == jornada]
+    filtros = filtros_cubo(cubo, modalidad=modalidad, jornada=jornada)
 
     # Top 10 facultades
-    top_facultades = df['nombre_facultad'].value_counts().head(10)
+    top_facultades = ordenar_conteos(cubo.contar('nombre_facultad', **filtros)).head(10)
 
     fig = go.Figure(data=[go.Bar(
         y=[str(x)[:50] + '...' if len(str(x)) > 50 else str(x) for x in top_facultades.index],
@@ -1569,39 +2087,17 @@ def actualizar_grafico_facultad(tab, datasets_seleccionados, modalidad, jornada)
 
     return fig
 
-# Callback para gráfico pie de jornada
-@app.callback(
-    Output('graph-jornada-pie', 'figure'),
-    [
-        Input('tabs', 'active_tab'),
-        Input('dataset-selector', 'value'),
-        Input('filter-facultad', 'value'),
-        Input('filter-modalidad', 'value')
-    ]
-)
-def actualizar_grafico_jornada(tab, datasets_seleccionados, facultad, modalidad):
-    """Actualiza el gráfico de distribución por jornada"""
-    if datos is None or tab != 'tab-academico':
-        return {}
-
-    df = combinar_datasets(datasets_seleccionados)
-    if df is None:
-        return {}
-
-    df = df.copy()
-
-    if 'jornada' not in df.columns:
+# Gráfico pie de jornada
+def crear_grafico_jornada(cubo, facultad, modalidad):
+    """Distribución por jornada filtrada por facultad y modalidad"""
+    if cubo is None or 'jornada' not in cubo.columnas:
         return {}
 
     # Aplicar filtros
-    if facultad != 'all' and 'nombre_facultad' in df.columns:
-        df = df[df['nombre_facultad'] == facultad]
-
-    if modalidad != 'all' and 'modalidad' in df.columns:
-        df = df[df['modalidad'] == modalidad]
+    filtros = filtros_cubo(cubo, nombre_facultad=facultad, modalidad=modalidad)
 
     # Contar por jornada
-    jornada_counts = df['jornada'].value_counts()
+    jornada_counts = ordenar_conteos(cubo.contar('jornada', **filtros))
 
     fig = go.Figure(data=[go.Pie(
         labels=jornada_counts.index,
@@ -1614,43 +2110,22 @@ def actualizar_grafico_jornada(tab, datasets_seleccionados, facultad, modalidad)
 
     return fig
 
-# Callback para gráfico género por facultad
-@app.callback(
-    Output('graph-genero-facultad', 'figure'),
-    [
-        Input('tabs', 'active_tab'),
-        Input('dataset-selector', 'value'),
-        Input('filter-modalidad', 'value'),
-        Input('filter-jornada', 'value')
-    ]
-)
-def actualizar_grafico_genero_facultad(tab, datasets_seleccionados, modalidad, jornada):
-    """Actualiza el gráfico de género por facultad (Top 5)"""
-    if datos is None or tab != 'tab-academico':
-        return {}
-
-    df = combinar_datasets(datasets_seleccionados)
-    if df is None:
-        return {}
-
-    df = df.copy()
-
-    if 'nombre_facultad' not in df.columns or 'genero' not in df.columns:
+# Gráfico género por facultad
+def crear_grafico_genero_facultad(cubo, modalidad, jornada):
+    """Género por facultad (Top 5) filtrado por modalidad y jornada"""
+    if cubo is None or 'nombre_facultad' not in cubo.columnas or 'genero' not in cubo.columnas:
         return {}
 
     # Aplicar filtros
-    if modalidad != 'all' and 'modalidad' in df.columns:
-        df = df[df['modalidad'] == modalidad]
-
-    if jornada != 'all' and 'jornada' in df.columns:
-        df = df[df['jornada'] == jornada]
+    filtros = filtros_cubo(cubo, modalidad=modalidad, jornada=jornada)
 
     # Top 5 facultades
-    top5_facultades = df['nombre_facultad'].value_counts().head(5).index
-    df_top5 = df[df['nombre_facultad'].isin(top5_facultades)]
+    top5_facultades = ordenar_conteos(cubo.contar('nombre_facultad', **filtros)).head(5).index
 
     # Contar por facultad y género
-    cross_tab = pd.crosstab(df_top5['nombre_facultad'], df_top5['genero'])
+    cross_tab = cubo.contar(
+        ['nombre_facultad', 'genero'], nombre_facultad=top5_facultades, **filtros
+    ).unstack(fill_value=0)
 
     fig = go.Figure()
 
@@ -1674,30 +2149,16 @@ def actualizar_grafico_genero_facultad(tab, datasets_seleccionados, modalidad, j
 
     return fig
 
-# Callback para gráfico de modalidades en académico
-@app.callback(
-    Output('graph-modalidad-academico', 'figure'),
-    [Input('tabs', 'active_tab'),
-     Input('dataset-selector', 'value'),
-     Input('filter-facultad', 'value'),
-     Input('filter-jornada', 'value')]
-)
-def actualizar_grafico_modalidad_academico(tab, datasets_seleccionados, facultad, jornada):
-    if datos is None or tab != 'tab-academico':
-        return {}
-
-    df = combinar_datasets(datasets_seleccionados)
-    if df is None or 'modalidad' not in df.columns:
+# Gráfico de modalidades en académico
+def crear_grafico_modalidad_academico(cubo, facultad, jornada):
+    """Distribución por modalidad filtrada por facultad y jornada"""
+    if cubo is None or 'modalidad' not in cubo.columnas:
         return {}
 
     # Aplicar filtros
-    if facultad != 'all' and 'nombre_facultad' in df.columns:
-        df = df[df['nombre_facultad'] == facultad]
-
-    if jornada != 'all' and 'jornada' in df.columns:
-        df = df[df['jornada'] == jornada]
+    filtros = filtros_cubo(cubo, nombre_facultad=facultad, jornada=jornada)
 
-    modalidad_counts = df['modalidad'].value_counts()
+    modalidad_counts = ordenar_conteos(cubo.contar('modalidad', **filtros))
 
     fig = go.Figure(data=[go.Pie(
         labels=modalidad_counts.index,
@@ -1708,24 +2169,14 @@ def actualizar_grafico_modalidad_academico(tab, datasets_seleccionados, facultad
 
     return fig
 
-# Callback para gráfico de dataset en académico
-@app.callback(
-    Output('graph-dataset-academico', 'figure'),
-    [Input('tabs', 'active_tab'),
-     Input('dataset-selector', 'value'),
-     Input('filter-facultad', 'value'),
-     Input('filter-modalidad', 'value'),
-     Input('filter-jornada', 'value')]
-)
-def actualizar_grafico_dataset_academico(tab, datasets_seleccionados, facultad, modalidad, jornada):
-    if datos is None or tab != 'tab-academico':
+# Gráfico de dataset en académico
+def crear_grafico_dataset_academico(cubo):
+    """Registros por dataset de origen"""
+    import plotly.express as px
+    if cubo is None or 'dataset_origen' not in cubo.columnas:
         return {}
 
-    df = combinar_datasets(datasets_seleccionados)
-    if df is None or 'dataset_origen' not in df.columns:
-        return {}
-
-    dataset_counts = df['dataset_origen'].value_counts()
+    dataset_counts = ordenar_conteos(cubo.contar('dataset_origen'))
 
     fig = px.bar(
         x=dataset_counts.index,
@@ -1737,10 +2188,51 @@ def actualizar_grafico_dataset_academico(tab, datasets_seleccionados, facultad,
 
     return fig
 
+# Callback único del tab Académico: un solo cubo para los cinco gráficos
+@app.callback(
+    [
+        Output('graph-facultad-analisis', 'figure'),
+        Output('graph-jornada-pie', 'figure'),
+        Output('graph-genero-facultad', 'figure'),
+        Output('graph-modalidad-academico', 'figure'),
+        Output('graph-dataset-academico', 'figure')
+    ],
+    [
+        Input('tabs', 'active_tab'),
+        Input('dataset-selector', 'value'),
+        Input('filter-facultad', 'value'),
+        Input('filter-modalidad', 'value'),
+        Input('filter-jornada', 'value')
+    ]
+)
+@cache_figuras.memorizar('tab-academico', conjuntos=(ENTRADA_DATASETS,))
+def actualizar_tab_academico(tab, datasets_seleccionados, facultad, modalidad, jornada):
+    """Actualiza todos los gráficos del tab Académico"""
+    if datos is None or tab != 'tab-academico':
+        return [{}] * 5
+
+    cubo = ContextoTab(datasets_seleccionados).cubo
+
+    return salidas_aisladas('actualizar_tab_academico', [
+        lambda: crear_grafico_facultad(cubo, modalidad, jornada),
+        lambda: crear_grafico_jornada(cubo, facultad, modalidad),
+        lambda: crear_grafico_genero_facultad(cubo, modalidad, jornada),
+        lambda: crear_grafico_modalidad_academico(cubo, facultad, jornada),
+        lambda: crear_grafico_dataset_academico(cubo)
+    ])
+
 # =====================================================================
 # CALLBACK PARA PREDICCIÓN
 # =====================================================================
 
+# Color e icono de cada nivel de riesgo
+ESTILOS_NIVEL = {
+    'BAJO': ('success', 'fa-check-circle'),
+    'MEDIO': ('warning', 'fa-exclamation-triangle'),
+    'ALTO': ('danger', 'fa-exclamation-circle'),
+    'CRÍTICO': ('danger', 'fa-times-circle'),
+}
+
 # Callback para predicción
 @app.callback(
     Output('prediccion-resultado', 'children'),
@@ -1757,38 +2249,19 @@ def realizar_prediccion(n_clicks, edad, genero, estrato, modalidad, jornada):
     if n_clicks is None or n_clicks == 0:
         return dbc.Alert("Haga clic en 'Predecir Riesgo' para obtener el resultado", color="secondary")
 
-    # Calcular score simple (sin modelo real por ahora)
-    score = 0
-    if estrato <= 2:
-        score += 30
-    if modalidad in ['VIRTUAL', 'DISTANCIA']:
-        score += 25
-    if edad < 18 or edad > 30:
-        score += 20
-    if jornada == 'NOCTURNA':
-        score += 15
-    if genero == 'M':
-        score += 5
-
-    probabilidad = min(score, 100) / 100
-
-    # Determinar nivel
-    if probabilidad < 0.3:
-        nivel = "BAJO"
-        color = "success"
-        icono = "fa-check-circle"
-    elif probabilidad < 0.5:
-        nivel = "MEDIO"
-        color = "warning"
-        icono = "fa-exclamation-triangle"
-    elif probabilidad < 0.7:
-        nivel = "ALTO"
-        color = "danger"
-        icono = "fa-exclamation-circle"
-    else:
-        nivel = "CRÍTICO"
-        color = "danger"
-        icono = "fa-times-circle"
+    # Mismo código que la puntuación por lotes: un estudiante es un DataFrame de una fila
+    predictor = predictor_vigente()
+    resultado = predictor.predecir({
+        'edad': edad,
+        'genero': genero,
+        'estrato_num': estrato,
+        'modalidad': modalidad,
+        'jornada': jornada
+    }).iloc[0]
+
+    probabilidad = float(resultado['probabilidad'])
+    nivel = resultado['nivel_riesgo']
+    color, icono = ESTILOS_NIVEL[nivel]
 
     return dbc.Card([
         dbc.CardHeader([
@@ -1799,6 +2272,10 @@ def realizar_prediccion(n_clicks, edad, genero, estrato, modalidad, jornada):
             html.Div([
                 html.H1(f"{probabilidad*100:.1f}%", className=f"text-{color}"),
                 html.H4(f"Riesgo {nivel}", className="mb-4"),
+                html.P(
+                    "Modelo entrenado" if predictor.usa_modelo else "Score heurístico (modelo no entrenado)",
+                    className="text-muted small"
+                ),
 
                 dbc.Progress(
                     value=probabilidad*100,
@@ -1846,10 +2323,68 @@ def realizar_prediccion(n_clicks, edad, genero, estrato, modalidad, jornada):
         ])
     ], className="shadow")
 
+# =====================================================================
+# API: PREDICCIÓN POR LOTES Y ESTADO DEL SERVIDOR
+# =====================================================================
+
+def predictor_vigente():
+    """Predictor de la instantánea actual (heurístico si no hay datos)"""
+    instantanea = datos
+    if instantanea is None or instantanea.get('predictor') is None:
+        return PredictorDesercion()
+    return instantanea['predictor']
+
+# POST /api/prediccion: solicitudes concurrentes agrupadas en micro-lotes
+lotes_prediccion = registrar_api(
+    app.server,
+    predictor_vigente,
+    max_lote=int(os.environ.get('DASHBOARD_LOTE_MAX', 256)),
+    max_espera_ms=float(os.environ.get('DASHBOARD_LOTE_ESPERA_MS', 5))
+)
+
+@app.server.route('/api/listo')
+def api_listo():
+    """Readiness: 200 cuando los datos del Overview están cargados, 503 mientras no"""
+    instantanea = datos
+    if instantanea is None:
+        return jsonify({'estado': 'sin_datos'}), 503
+    procesados = instantanea.valores_grupo('procesados')
+    if procesados is None:
+        return jsonify({'estado': 'cargando', 'pid': os.getpid()}), 503
+
+    modelo = instantanea.valores_grupo('modelo')
+    return jsonify({
+        'estado': 'listo',
+        'pid': os.getpid(),
+        'version': instantanea.get('version'),
+        'generacion': instantanea.get('generacion'),
+        'cargados': instantanea.grupos_cargados(),
+        'registros': {nombre: len(procesados[nombre]) for nombre in ORIGENES if nombre in procesados},
+        'modelo_entrenado': modelo['predictor'].usa_modelo if modelo is not None else None
+    })
+
+# Métricas por callback en /metrics (DASHBOARD_METRICAS=1): el tiempo en la
+# capa de datos cuenta como cálculo, el resto del callback como figuras
+metricas = crear_metricas()
+metricas.instrumentar_calculo(
+    sys.modules[__name__], 'combinar_datasets', 'cubo_datasets', 'indice_datasets', 'filtrar_registros', 'contar_valores'
+)
+metricas.instrumentar_calculo(CuboConteos, 'total', 'contar')
+metricas.instrumentar_calculo(IndiceBitmap, 'seleccionar', 'contar', 'filas', 'valores')
+metricas.indicador('cache_figuras', cache_figuras.estadisticas, contadores=('aciertos', 'fallos'))
+metricas.indicador('lotes_prediccion', lotes_prediccion.estadisticas,
+                   contadores=('lotes', 'solicitudes', 'filas'))
+metricas.instrumentar_app(app, tamaño=cache_figuras.tamaño_respuesta)
+
+# Perfil de arranque: tabs, callbacks y API registrados; se mide la primera petición
+perfil.hito('callbacks')
+perfil.instrumentar_servidor(app.server)
+
 # =====================================================================
 # EJECUTAR APLICACIÓN
 # =====================================================================
 
+# Producción (varios workers con los datos compartidos): gunicorn -c gunicorn.conf.py wsgi:server
 if __name__ == '__main__':
     print("="*70)
     print("DASHBOARD DE DESERCIÓN EDUCATIVA")
@@ -1859,4 +2394,10 @@ if __name__ == '__main__':
     print("\nPresione Ctrl+C para detener el servidor\n")
     print("="*70)
 
+    # Con debug, el proceso que vigila el código no sirve peticiones: solo se
+    # precarga y se recarga en el servidor
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        iniciar_precarga()
+        iniciar_recarga()
+
     app.run(debug=True, host='127.0.0.1', port=8050)
@@ -0,0 +1,63 @@
+/*
+ * Opciones de los filtros de los tabs Demográfico y Académico
+ *
+ * El servidor envía una vez, con el layout, el manifiesto de valores de
+ * cada filtro por fuente (manifiesto_opciones en app.py). Las opciones de
+ * cualquier combinación de `dataset-selector` se derivan aquí, sin
+ * peticiones al servidor, con el mismo orden que el índice combinado.
+ */
+
+(function () {
+    var TODOS_DEMOGRAFICO = [{label: 'Todos', value: 'all'}];
+    var TODAS_ACADEMICO = [{label: 'Todas', value: 'all'}];
+
+    function opcionesFiltro(filtro, fuentes, todos) {
+        if (!filtro) {
+            return todos;
+        }
+        // Posiciones en la lista global, en el orden de concatenación de las fuentes
+        var vistas = {};
+        var posiciones = [];
+        fuentes.forEach(function (fuente) {
+            (filtro.fuentes[fuente] || []).forEach(function (posicion) {
+                if (!vistas[posicion]) {
+                    vistas[posicion] = true;
+                    posiciones.push(posicion);
+                }
+            });
+        });
+        if (!posiciones.length) {
+            return todos;
+        }
+        if (filtro.orden === 'global') {
+            posiciones.sort(function (a, b) { return a - b; });
+        }
+        return todos.concat(posiciones.map(function (posicion) { return filtro.opciones[posicion]; }));
+    }
+
+    function opcionesTab(tab, tabObjetivo, seleccion, manifiesto, ids, todos) {
+        if (tab !== tabObjetivo || !manifiesto) {
+            return ids.map(function () { return todos; });
+        }
+        // Misma normalización que AlmacenCombinados: sin duplicados y ordenada
+        var fuentes = (seleccion || []).filter(function (fuente, i, lista) {
+            return lista.indexOf(fuente) === i;
+        }).sort();
+        return ids.map(function (id) {
+            return opcionesFiltro(manifiesto.filtros[id], fuentes, todos);
+        });
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        filtros: {
+            demografico: function (tab, seleccion, manifiesto) {
+                return opcionesTab(tab, 'tab-demografico', seleccion, manifiesto,
+                    ['filter-genero', 'filter-edad', 'filter-estrato'], TODOS_DEMOGRAFICO);
+            },
+            academico: function (tab, seleccion, manifiesto) {
+                return opcionesTab(tab, 'tab-academico', seleccion, manifiesto,
+                    ['filter-facultad', 'filter-modalidad', 'filter-jornada'], TODAS_ACADEMICO);
+            }
+        }
+    });
+})();
@@ -0,0 +1,156 @@
+"""
+Índices bitmap para los filtros del dashboard
+
+Por cada atributo filtrable (género, estrato, rango de edad, facultad,
+modalidad y jornada) guarda un bitset empaquetado (un bit por registro)
+para cada valor. Las combinaciones de filtros se resuelven con AND/OR
+sobre bytes y los conteos con popcount, sin comparar columnas de texto
+registro por registro.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from cubo import calcular_rango_edad
+
+DIMENSIONES_FILTRO = [
+    'genero',
+    'estrato_num',
+    'rango_edad',
+    'nombre_facultad',
+    'modalidad',
+    'jornada',
+]
+
+# Número de bits encendidos de cada byte
+POPCOUNT = np.array([bin(b).count('1') for b in range(256)], dtype=np.uint8)
+
+
+def _clave(valor):
+    """Normaliza el valor de un bitmap (los enteros nulables llegan como numpy)"""
+    if isinstance(valor, (np.integer, np.floating)):
+        return int(valor)
+    return valor
+
+
+class IndiceBitmap:
+    """Bitsets empaquetados por valor de cada dimensión de filtro"""
+
+    def __init__(self, n_filas, bitmaps):
+        self.n_filas = n_filas
+        # {dimensión: {valor: np.ndarray uint8 empaquetado}}
+        self.bitmaps = bitmaps
+        self.columnas = frozenset(bitmaps)
+
+    @classmethod
+    def desde_dataset(cls, df):
+        """Construye los bitmaps de un dataset"""
+        bitmaps = {}
+        for dim in DIMENSIONES_FILTRO:
+            if dim == 'rango_edad':
+                if 'edad' not in df.columns:
+                    continue
+                serie = calcular_rango_edad(df['edad'])
+            elif dim in df.columns:
+                serie = df[dim]
+            else:
+                continue
+
+            # Un factorize por columna; cada bitmap sale de comparar códigos enteros
+            codigos, valores = pd.factorize(serie, sort=False)
+            bitmaps[dim] = {
+                _clave(valor): np.packbits(codigos == i)
+                for i, valor in enumerate(valores)
+            }
+        return cls(len(df), bitmaps)
+
+    @classmethod
+    def combinar(cls, indices):
+        """Une los índices de varios datasets en el orden en que se concatenan sus registros"""
+        indices = list(indices)
+        if not indices:
+            return None
+        if len(indices) == 1:
+            return indices[0]
+
+        n_filas = sum(ind.n_filas for ind in indices)
+        bitmaps = {}
+        for dim in DIMENSIONES_FILTRO:
+            presentes = [ind for ind in indices if dim in ind.columnas]
+            if not presentes:
+                continue
+            valores = list(dict.fromkeys(v for ind in presentes for v in ind.bitmaps[dim]))
+            bitmaps[dim] = {}
+            for valor in valores:
+                partes = [
+                    np.unpackbits(ind.bitmaps.get(dim, {}).get(valor, ind.vacio()), count=ind.n_filas)
+                    for ind in indices
+                ]
+                bitmaps[dim][valor] = np.packbits(np.concatenate(partes))
+        return cls(n_filas, bitmaps)
+
+    def tablas(self):
+        """Tablas del índice para publicarlo en segmentos: los bitmaps concatenados y su dimensión y valor"""
+        claves = [(dim, valor) for dim, por_valor in self.bitmaps.items() for valor in por_valor]
+        bits = [self.bitmaps[dim][valor] for dim, valor in claves]
+        return {
+            'bits': pd.DataFrame({'bits': np.concatenate(bits) if bits else self.vacio()[:0]}),
+            'claves': pd.DataFrame({
+                'dimension': [dim for dim, _ in claves],
+                'valor': [json.dumps(valor) for _, valor in claves],
+            }),
+        }
+
+    @classmethod
+    def desde_tablas(cls, n_filas, tablas):
+        """Índice a partir de sus tablas; cada bitmap es una vista de la columna de bits (sin copiar)"""
+        bits = tablas['bits']['bits'].to_numpy()
+        tamaño = (n_filas + 7) // 8
+        bitmaps = {}
+        for i, (dim, valor) in enumerate(zip(tablas['claves']['dimension'], tablas['claves']['valor'])):
+            bitmaps.setdefault(dim, {})[json.loads(valor)] = bits[i * tamaño:(i + 1) * tamaño]
+        return cls(n_filas, bitmaps)
+
+    def vacio(self):
+        """Bitset sin registros"""
+        return np.zeros((self.n_filas + 7) // 8, dtype=np.uint8)
+
+    def todos(self):
+        """Bitset con todos los registros (los bits de relleno quedan en cero)"""
+        return np.packbits(np.ones(self.n_filas, dtype=bool))
+
+    def seleccionar(self, **filtros):
+        """AND entre dimensiones y OR entre los valores (lista) de una dimensión; None no filtra"""
+        bits = self.todos()
+        for dim, valor in filtros.items():
+            if valor is None:
+                continue
+            valores = valor if isinstance(valor, (list, tuple, set, frozenset, pd.Index)) else [valor]
+            por_valor = self.bitmaps.get(dim, {})
+            union = self.vacio()
+            for v in valores:
+                if _clave(v) in por_valor:
+                    np.bitwise_or(union, por_valor[_clave(v)], out=union)
+            np.bitwise_and(bits, union, out=bits)
+        return bits
+
+    def contar(self, bits):
+        """Número de registros de un bitset"""
+        return int(POPCOUNT[bits].sum(dtype=np.int64))
+
+    def filas(self, bits):
+        """Máscara booleana por registro para indexar el dataset"""
+        return np.unpackbits(bits, count=self.n_filas).astype(bool)
+
+    def valores(self, dim):
+        """Valores de una dimensión en orden de primera aparición (como Series.unique)"""
+        primeros = []
+        for valor, bits in self.bitmaps.get(dim, {}).items():
+            no_nulos = np.flatnonzero(bits)
+            if len(no_nulos):
+                byte = no_nulos[0]
+                # El bit más significativo es el primer registro del byte
+                primeros.append((int(byte) * 8 + 8 - int(bits[byte]).bit_length(), valor))
+        return [valor for _, valor in sorted(primeros, key=lambda p: p[0])]
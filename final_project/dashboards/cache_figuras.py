@@ -0,0 +1,302 @@
+"""
+Caché de figuras del dashboard
+
+Guarda el JSON de la salida de los callbacks que producen figuras,
+serializado con la ruta rápida de serializacion.py. La clave combina el
+nombre del callback, sus entradas normalizadas y la versión de los datos:
+dos usuarios con el mismo tab, selección de datasets y filtros reciben la
+misma figura sin recalcularla.
+
+Dentro de una petición a /_dash-update-component el callback no retorna
+las figuras sino una marca por salida; al terminar la petición las marcas
+se reemplazan por el JSON guardado, así que ni un acierto ni un fallo
+vuelven a decodificar y codificar la figura. Fuera de una petición
+(benchmarks, pruebas) se retorna la salida decodificada.
+
+Hay dos almacenes con límite de memoria y desalojo LRU: uno en el
+proceso y otro en disco local, compartido por varios workers.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import re
+import secrets
+import tempfile
+import threading
+from collections import OrderedDict
+
+from flask import g, has_request_context, request
+
+from serializacion import serializar_salida
+
+EXTENSION = '.json'
+# Cambia si cambia el formato de las entradas: las guardadas en disco con otro formato no se leen
+FORMATO = 3
+RUTA_CALLBACKS = '/_dash-update-component'
+# Marcas que el callback retorna en lugar de las figuras, reemplazadas al final de la petición
+PREFIJO_MARCA = 'cache-figuras:'
+PATRON_MARCA = re.compile(rb'"' + PREFIJO_MARCA.encode() + rb'[0-9a-f]+:\d+"')
+MULTIPLE, UNICA = 'multiple', 'unica'
+
+
+def _normalizar(valor):
+    """Forma estable de una entrada: los dicts no dependen del orden de sus claves; las listas conservan su orden"""
+    if isinstance(valor, (list, tuple)):
+        return [_normalizar(v) for v in valor]
+    if isinstance(valor, dict):
+        return {str(k): _normalizar(v) for k, v in sorted(valor.items())}
+    return valor
+
+
+def _conjunto(valor):
+    """Entrada cuyo orden y duplicados no importan (la selección de datasets)"""
+    if isinstance(valor, (list, tuple, set, frozenset)) and all(isinstance(v, (str, int, float)) for v in valor):
+        return sorted(set(valor), key=repr)
+    return _normalizar(valor)
+
+
+class SalidaParcial(list):
+    """Salidas de un callback de varios gráficos donde alguno falló: se envían pero no se guardan"""
+
+    def __init__(self, salidas=(), errores=0):
+        super().__init__(salidas)
+        self.errores = errores
+
+
+def serializar_entrada(resultado):
+    """Entrada del almacén: tipo de salida y el JSON de cada salida, uno por línea
+
+    El JSON compacto no tiene saltos de línea, así que cada salida se puede
+    insertar tal cual en la respuesta.
+    """
+    if isinstance(resultado, (list, tuple)):
+        return '\n'.join([MULTIPLE] + [serializar_salida(valor) for valor in resultado])
+    return UNICA + '\n' + serializar_salida(resultado)
+
+
+def clave_figura(nombre, argumentos, version, conjuntos=()):
+    """Clave del callback, sus entradas normalizadas y la versión de los datos
+
+    conjuntos son las posiciones de las entradas que se comparan sin orden ni
+    duplicados; el resto se comparan tal cual, en su posición.
+    """
+    entradas = [_conjunto(v) if i in conjuntos else _normalizar(v) for i, v in enumerate(argumentos)]
+    texto = json.dumps([FORMATO, nombre, entradas, version], sort_keys=True, default=str)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+class AlmacenMemoria:
+    """JSON de figuras en el proceso, con límite en bytes y desalojo LRU"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+
+    def leer(self, clave):
+        with self._lock:
+            texto = self._entradas.get(clave)
+            if texto is not None:
+                self._entradas.move_to_end(clave)
+            return texto
+
+    def escribir(self, clave, texto):
+        tamaño = len(texto)
+        if tamaño > self.max_bytes:
+            return
+        with self._lock:
+            anterior = self._entradas.pop(clave, None)
+            if anterior is not None:
+                self.bytes -= len(anterior)
+            self._entradas[clave] = texto
+            self.bytes += tamaño
+            while self.bytes > self.max_bytes:
+                _, desalojado = self._entradas.popitem(last=False)
+                self.bytes -= len(desalojado)
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._entradas)
+
+
+class AlmacenDisco:
+    """JSON de figuras en un directorio local compartido por los workers
+
+    Cada entrada es un archivo escrito de forma atómica; la fecha de acceso
+    se actualiza en cada lectura y, al superar el límite, se borran los
+    archivos usados hace más tiempo.
+    """
+
+    def __init__(self, directorio, max_bytes):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        os.makedirs(directorio, exist_ok=True)
+        self._lock = threading.Lock()
+        self._bytes_escritos = 0
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave + EXTENSION)
+
+    def leer(self, clave):
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, 'r', encoding='utf-8') as archivo:
+                texto = archivo.read()
+            os.utime(ruta)
+            return texto
+        except OSError:
+            return None
+
+    def escribir(self, clave, texto):
+        if len(texto) > self.max_bytes:
+            return
+        descriptor, ruta_tmp = tempfile.mkstemp(dir=self.directorio, suffix='.tmp')
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as archivo:
+            archivo.write(texto)
+        os.replace(ruta_tmp, self._ruta(clave))
+
+        # Revisar el tamaño del directorio cada cierto volumen escrito, no en cada escritura
+        with self._lock:
+            self._bytes_escritos += len(texto)
+            if self._bytes_escritos < self.max_bytes // 10:
+                return
+            self._bytes_escritos = 0
+        self._desalojar()
+
+    def _desalojar(self):
+        """Borra los archivos menos usados hasta quedar bajo el límite"""
+        archivos = []
+        for nombre in os.listdir(self.directorio):
+            if not nombre.endswith(EXTENSION):
+                continue
+            try:
+                info = os.stat(os.path.join(self.directorio, nombre))
+            except OSError:
+                continue
+            archivos.append((info.st_mtime, info.st_size, nombre))
+
+        total = sum(tamaño for _, tamaño, _ in archivos)
+        for _, tamaño, nombre in sorted(archivos):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directorio, nombre))
+                total -= tamaño
+            except OSError:
+                pass
+
+    def limpiar(self):
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith(EXTENSION):
+                try:
+                    os.remove(os.path.join(self.directorio, nombre))
+                except OSError:
+                    pass
+
+    def __len__(self):
+        return sum(1 for nombre in os.listdir(self.directorio) if nombre.endswith(EXTENSION))
+
+
+class CacheFiguras:
+    """Memoriza la salida serializada de los callbacks de figuras"""
+
+    def __init__(self, almacen, obtener_version):
+        self.almacen = almacen
+        # Función que retorna, a partir de las entradas del callback, la versión de los datos que usa
+        self.obtener_version = obtener_version
+        self.aciertos = 0
+        self.fallos = 0
+        self._lock = threading.Lock()
+
+    def memorizar(self, nombre, conjuntos=()):
+        """Decorador: ejecuta el callback solo si su salida no está en caché
+
+        conjuntos: posiciones de las entradas cuyo orden no importa (ver clave_figura).
+        """
+        def decorador(funcion):
+            @functools.wraps(funcion)
+            def envoltura(*args):
+                clave = clave_figura(nombre, args, self.obtener_version(*args), conjuntos)
+                texto = self.almacen.leer(clave)
+                if texto is not None:
+                    self._contar(acierto=True)
+                else:
+                    self._contar(acierto=False)
+                    resultado = funcion(*args)
+                    texto = serializar_entrada(resultado)
+                    # Un gráfico fallido se reintenta en la siguiente petición en lugar de quedar en caché
+                    if not getattr(resultado, 'errores', 0):
+                        self.almacen.escribir(clave, texto)
+                # Acierto y fallo retornan lo mismo, así que ambas rutas son idénticas
+                return self._salida(texto)
+            return envoltura
+        return decorador
+
+    def _salida(self, texto):
+        """Marcas a reemplazar en la respuesta o, fuera de una petición de callback, la salida decodificada"""
+        tipo, *partes = texto.split('\n')
+        if has_request_context() and request.path.endswith(RUTA_CALLBACKS):
+            pendientes = g.setdefault('figuras_en_cache', {})
+            lote = secrets.token_hex(8)
+            salidas = []
+            for i, parte in enumerate(partes):
+                marca = f"{PREFIJO_MARCA}{lote}:{i}"
+                pendientes[marca] = parte
+                salidas.append(marca)
+        else:
+            salidas = [json.loads(parte) for parte in partes]
+        return salidas if tipo == MULTIPLE else salidas[0]
+
+    def montar(self, server):
+        """Reemplaza, al final de cada petición, las marcas por el JSON guardado"""
+        @server.after_request
+        def insertar_figuras(respuesta):
+            pendientes = g.pop('figuras_en_cache', None)
+            if not pendientes or respuesta.direct_passthrough:
+                return respuesta
+            cuerpo = PATRON_MARCA.sub(
+                lambda m: pendientes[m.group()[1:-1].decode()].encode('utf-8'), respuesta.get_data()
+            )
+            respuesta.set_data(cuerpo)
+            return respuesta
+
+    def tamaño_respuesta(self, respuesta):
+        """Tamaño de la respuesta de un callback una vez reemplazadas sus marcas"""
+        pendientes = g.get('figuras_en_cache', {}) if has_request_context() else {}
+        return len(respuesta) + sum(len(parte) - len(marca) - 2 for marca, parte in pendientes.items())
+
+    def _contar(self, acierto):
+        with self._lock:
+            if acierto:
+                self.aciertos += 1
+            else:
+                self.fallos += 1
+
+    def estadisticas(self):
+        """Aciertos, fallos y tamaño del almacén"""
+        consultas = self.aciertos + self.fallos
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+            'entradas': len(self.almacen),
+            'almacen': type(self.almacen).__name__,
+        }
+
+    def limpiar(self):
+        self.almacen.limpiar()
+
+
+def crear_cache(obtener_version, directorio=None, max_mb=256):
+    """Caché en disco si se indica un directorio; si no, en memoria del proceso"""
+    max_bytes = int(max_mb * 1024 * 1024)
+    if directorio:
+        return CacheFiguras(AlmacenDisco(directorio, max_bytes), obtener_version)
+    return CacheFiguras(AlmacenMemoria(max_bytes), obtener_version)
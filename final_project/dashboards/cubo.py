@@ -0,0 +1,130 @@
+"""
+Cubo de conteos para los gráficos del dashboard
+
+Materializa, por dataset, el número de registros de cada combinación
+observada de las dimensiones que usan los gráficos (origen, año, género,
+modalidad, jornada, facultad, estrato y rango de edad). Los callbacks
+responden filtrando y sumando el cubo, cuyo tamaño depende del número de
+combinaciones y no del número de registros.
+"""
+
+import numpy as np
+import pandas as pd
+
+DIMENSIONES = [
+    'dataset_origen',
+    'periodo_año',
+    'genero',
+    'modalidad',
+    'jornada',
+    'nombre_facultad',
+    'estrato',
+    'estrato_num',
+    'rango_edad',
+]
+
+# Rangos del filtro de edad del tab Demográfico
+RANGOS_EDAD = ['16-20', '21-25', '26-30', '31+']
+TIPO_RANGO_EDAD = pd.CategoricalDtype(RANGOS_EDAD, ordered=True)
+
+
+def calcular_rango_edad(edad):
+    """Asigna a cada edad su rango del filtro (nulo si es menor de 16)"""
+    edad = pd.to_numeric(edad, errors='coerce').astype('float64')
+    rangos = pd.cut(edad, bins=[15, 20, 25, 30, np.inf], labels=RANGOS_EDAD)
+    return rangos.astype(TIPO_RANGO_EDAD)
+
+
+class CuboConteos:
+    """Conteos materializados por combinación de dimensiones"""
+
+    def __init__(self, conteos, columnas):
+        self.conteos = conteos
+        # Dimensiones presentes en los datos de origen (las demás son nulas)
+        self.columnas = frozenset(columnas)
+
+    @classmethod
+    def desde_dataset(cls, df, origen, tipo_origen):
+        """Construye el cubo de un dataset etiquetado con su origen"""
+        columnas = {'dataset_origen'}
+        tabla = pd.DataFrame(index=df.index)
+        tabla['dataset_origen'] = pd.Series(origen, index=df.index, dtype=tipo_origen)
+
+        for dim in DIMENSIONES[1:]:
+            if dim == 'rango_edad':
+                if 'edad' in df.columns:
+                    tabla[dim] = calcular_rango_edad(df['edad'])
+                    columnas.add(dim)
+                else:
+                    tabla[dim] = pd.Series(index=df.index, dtype=TIPO_RANGO_EDAD)
+            elif dim in df.columns:
+                tabla[dim] = df[dim]
+                columnas.add(dim)
+            else:
+                tabla[dim] = pd.Series(index=df.index, dtype='float64')
+
+        conteos = (
+            tabla.groupby(DIMENSIONES, observed=True, dropna=False)
+            .size()
+            .rename('conteo')
+            .reset_index()
+        )
+        return cls(conteos, columnas)
+
+    @classmethod
+    def combinar(cls, cubos):
+        """Une los cubos de varios datasets en uno solo"""
+        cubos = list(cubos)
+        if not cubos:
+            return None
+        if len(cubos) == 1:
+            return cubos[0]
+
+        # Las dimensiones ausentes de un cubo toman el tipo de los cubos que sí las tienen,
+        # para que la concatenación conserve las categorías compartidas
+        tipos = {}
+        for cubo in cubos:
+            for dim in cubo.columnas:
+                tipos.setdefault(dim, cubo.conteos[dim].dtype)
+        partes = [
+            c.conteos.astype({dim: tipo for dim, tipo in tipos.items() if dim not in c.columnas})
+            for c in cubos
+        ]
+
+        conteos = pd.concat(partes, ignore_index=True)
+        columnas = set().union(*(c.columnas for c in cubos))
+        return cls(conteos, columnas)
+
+    def tablas(self):
+        """Tablas del cubo para publicarlo en segmentos compartidos"""
+        return {
+            'conteos': self.conteos,
+            'columnas': pd.DataFrame({'dimension': sorted(self.columnas)}),
+        }
+
+    @classmethod
+    def desde_tablas(cls, tablas):
+        """Cubo a partir de sus tablas (p. ej. adjuntadas desde un segmento)"""
+        return cls(tablas['conteos'], tablas['columnas']['dimension'].astype(str))
+
+    def total(self, **filtros):
+        """Número de registros que cumplen los filtros"""
+        return int(self._filtrar(filtros)['conteo'].sum())
+
+    def contar(self, por, **filtros):
+        """Conteos agrupados por una o varias dimensiones (sin nulos), como value_counts/crosstab"""
+        tabla = self._filtrar(filtros)
+        return tabla.groupby(por, observed=True)['conteo'].sum()
+
+    def _filtrar(self, filtros):
+        """Filas del cubo que cumplen cada filtro (valor o lista de valores); None no filtra"""
+        tabla = self.conteos
+        for dim, valor in filtros.items():
+            if valor is None:
+                continue
+            if isinstance(valor, (list, tuple, set, frozenset, pd.Index)):
+                mascara = tabla[dim].isin(list(valor))
+            else:
+                mascara = tabla[dim] == valor
+            tabla = tabla[mascara.fillna(False).astype(bool)]
+        return tabla
@@ -0,0 +1,39 @@
+"""
+Configuración de gunicorn para el dashboard
+
+Los datos se cargan una vez en el maestro (preload_app) y los workers
+adjuntan las mismas columnas desde segmentos de memoria compartida. Cada
+worker atiende varias peticiones con hilos (gthread): los callbacks
+liberan el GIL en pandas y numpy, y las peticiones de la API de predicción se agrupan en micro-lotes.
+
+Tamaño recomendado:
+    workers: número de núcleos (DASHBOARD_WORKERS)
+    threads: 4 por worker (DASHBOARD_THREADS)
+"""
+
+import multiprocessing
+import os
+import tempfile
+
+bind = os.environ.get('DASHBOARD_BIND', '0.0.0.0:8050')
+workers = int(os.environ.get('DASHBOARD_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('DASHBOARD_THREADS', 4))
+worker_class = 'gthread'
+preload_app = True
+timeout = int(os.environ.get('DASHBOARD_TIMEOUT', 120))
+
+# Caché de figuras en disco compartida por todos los workers
+os.environ.setdefault('DASHBOARD_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'dashboard_desercion_cache'))
+
+# Columnas de los datasets en memoria compartida: una recarga la construye
+# un worker y los demás adjuntan las mismas páginas (ver src/data/segmentos.py)
+os.environ.setdefault('DASHBOARD_SEGMENTOS_DIR', os.path.join(
+    '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(), 'dashboard_desercion_segmentos'
+))
+
+
+def post_fork(server, worker):
+    """Los hilos no sobreviven al fork: cada worker inicia su propia precarga y recarga de datos"""
+    from app import iniciar_precarga, iniciar_recarga
+    iniciar_precarga()
+    iniciar_recarga()
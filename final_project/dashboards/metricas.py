@@ -0,0 +1,212 @@
+"""
+Métricas de los callbacks en formato Prometheus
+
+Con DASHBOARD_METRICAS=1, cada callback registrado en la app se envuelve
+para medir por callback:
+
+    duración total       tiempo de la petición del callback (incluye serializar la respuesta)
+    cálculo              tiempo en la capa de datos (selección, combinación, filtros y conteos)
+    figuras              el resto: construir figuras/componentes y serializarlos
+    bytes de respuesta   tamaño del JSON devuelto al navegador
+    entradas             cardinalidad de las entradas (elementos de las listas + escalares)
+
+y se exponen como histogramas en GET /metrics, junto con los indicadores
+que se registren (caché de figuras, micro-lotes de la API). Sin la
+variable no se envuelve nada: el costo es nulo.
+
+Con varios workers cada proceso tiene sus propias métricas (la etiqueta
+`pid` las distingue).
+"""
+
+import bisect
+import functools
+import os
+import threading
+import time
+
+from flask import Response
+
+RUTA = '/metrics'
+TIPO_CONTENIDO = 'text/plain; version=0.0.4; charset=utf-8'
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_BYTES = (1e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7)
+BUCKETS_ENTRADAS = (1, 2, 3, 5, 8, 13, 21, 34)
+
+HISTOGRAMAS = {
+    'duracion': ('dashboard_callback_duracion_segundos', "Duración total del callback", BUCKETS_SEGUNDOS),
+    'calculo': ('dashboard_callback_calculo_segundos', "Tiempo en la capa de datos (pandas, cubo, índices)", BUCKETS_SEGUNDOS),
+    'figuras': ('dashboard_callback_figuras_segundos', "Tiempo construyendo y serializando figuras", BUCKETS_SEGUNDOS),
+    'bytes': ('dashboard_callback_respuesta_bytes', "Tamaño de la respuesta serializada", BUCKETS_BYTES),
+    'entradas': ('dashboard_callback_entradas', "Cardinalidad de las entradas del callback", BUCKETS_ENTRADAS),
+}
+
+
+class Histograma:
+    """Histograma acumulado (conteos por bucket, suma y total)"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.conteos = [0] * (len(buckets) + 1)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.conteos[bisect.bisect_left(self.buckets, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+    def lineas(self, nombre, etiquetas):
+        acumulado = 0
+        for limite, conteo in zip(self.buckets + (float('inf'),), self.conteos):
+            acumulado += conteo
+            le = '+Inf' if limite == float('inf') else f"{limite:g}"
+            yield f'{nombre}_bucket{{{etiquetas},le="{le}"}} {acumulado}'
+        yield f'{nombre}_sum{{{etiquetas}}} {self.suma:.6f}'
+        yield f'{nombre}_count{{{etiquetas}}} {self.total}'
+
+
+def _cardinalidad(valores):
+    """Elementos de las entradas: una lista cuenta sus elementos, un escalar cuenta 1"""
+    return sum(len(v) if isinstance(v, (list, tuple)) else int(v is not None) for v in valores)
+
+
+class MetricasCallbacks:
+    """Histogramas por callback e indicadores adicionales"""
+
+    def __init__(self, activo=False):
+        self.activo = activo
+        self._histogramas = {}
+        self._errores = {}
+        self._indicadores = {}
+        self._lock = threading.Lock()
+        # Tiempo de cálculo acumulado por el callback en curso de cada hilo
+        self._local = threading.local()
+        self._tamaño = len
+
+    def instrumentar_app(self, app, tamaño=len):
+        """Envuelve cada callback registrado en la app (no-op si las métricas están desactivadas)
+
+        tamaño(respuesta) da los bytes que llegan al navegador, si la respuesta
+        del callback se completa después (caché de figuras).
+        """
+        if not self.activo:
+            return
+        self._tamaño = tamaño
+        for entrada in app.callback_map.values():
+            # Los callbacks clientside se ejecutan en el navegador
+            if 'callback' in entrada:
+                entrada['callback'] = self._envolver(entrada['callback'])
+        self._montar(app.server)
+
+    def instrumentar_calculo(self, objeto, *atributos):
+        """Cuenta como cálculo el tiempo en esas funciones (solo la llamada más externa)"""
+        if not self.activo:
+            return
+        for atributo in atributos:
+            setattr(objeto, atributo, self._medir_calculo(getattr(objeto, atributo)))
+
+    def indicador(self, nombre, obtener, contadores=()):
+        """Registra un grupo de indicadores: obtener() -> {clave: valor numérico}
+
+        Las claves en contadores solo crecen: se exportan como counter con
+        sufijo _total; el resto como gauge.
+        """
+        self._indicadores[nombre] = (obtener, frozenset(contadores))
+
+    def observar(self, callback, metrica, valor):
+        with self._lock:
+            clave = (callback, metrica)
+            if clave not in self._histogramas:
+                self._histogramas[clave] = Histograma(HISTOGRAMAS[metrica][2])
+            self._histogramas[clave].observar(valor)
+
+    def contar_error(self, callback):
+        """Cuenta una excepción del callback, también las que el callback captura y muestra como aviso"""
+        with self._lock:
+            self._errores[callback] = self._errores.get(callback, 0) + 1
+
+    def _envolver(self, funcion):
+        nombre = getattr(funcion, '__name__', 'callback')
+
+        @functools.wraps(funcion)
+        def medido(*args, **kwargs):
+            local = self._local
+            local.calculo, local.profundidad = 0.0, 0
+            inicio = time.perf_counter()
+            try:
+                respuesta = funcion(*args, **kwargs)
+            except Exception as e:
+                # PreventUpdate no es un error del callback
+                if type(e).__name__ != 'PreventUpdate':
+                    self.contar_error(nombre)
+                raise
+            duracion = time.perf_counter() - inicio
+
+            self.observar(nombre, 'duracion', duracion)
+            self.observar(nombre, 'calculo', local.calculo)
+            self.observar(nombre, 'figuras', max(duracion - local.calculo, 0.0))
+            if isinstance(respuesta, (str, bytes)):
+                self.observar(nombre, 'bytes', self._tamaño(respuesta))
+            self.observar(nombre, 'entradas', _cardinalidad(args))
+            return respuesta
+
+        return medido
+
+    def _medir_calculo(self, funcion):
+        local = self._local
+
+        @functools.wraps(funcion)
+        def medida(*args, **kwargs):
+            profundidad = getattr(local, 'profundidad', 0)
+            local.profundidad = profundidad + 1
+            inicio = time.perf_counter()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                local.profundidad = profundidad
+                if profundidad == 0:
+                    local.calculo = getattr(local, 'calculo', 0.0) + time.perf_counter() - inicio
+
+        return medida
+
+    def _montar(self, server):
+        @server.route(RUTA)
+        def metricas():
+            return Response(self.texto(), mimetype=TIPO_CONTENIDO)
+
+    def texto(self):
+        """Exposición en formato de texto de Prometheus"""
+        pid = os.getpid()
+        with self._lock:
+            histogramas = sorted(self._histogramas.items())
+            errores = sorted(self._errores.items())
+
+        lineas = []
+        for metrica, (nombre, ayuda, _) in HISTOGRAMAS.items():
+            lineas += [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} histogram"]
+            for (callback, tipo), histograma in histogramas:
+                if tipo == metrica:
+                    lineas += histograma.lineas(nombre, f'callback="{callback}",pid="{pid}"')
+
+        lineas += [
+            "# HELP dashboard_callback_errores_total Excepciones de cada callback",
+            "# TYPE dashboard_callback_errores_total counter",
+        ]
+        lineas += [f'dashboard_callback_errores_total{{callback="{c}",pid="{pid}"}} {n}' for c, n in errores]
+
+        for grupo, (obtener, contadores) in self._indicadores.items():
+            for clave, valor in obtener().items():
+                if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+                    continue
+                if clave in contadores:
+                    nombre, tipo = f"dashboard_{grupo}_{clave}_total", 'counter'
+                else:
+                    nombre, tipo = f"dashboard_{grupo}_{clave}", 'gauge'
+                lineas += [f"# TYPE {nombre} {tipo}", f'{nombre}{{pid="{pid}"}} {valor}']
+        return "\n".join(lineas) + "\n"
+
+
+def crear_metricas():
+    """Métricas activas si DASHBOARD_METRICAS vale 1"""
+    return MetricasCallbacks(activo=os.environ.get('DASHBOARD_METRICAS', '0') == '1')
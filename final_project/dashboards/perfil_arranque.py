@@ -0,0 +1,166 @@
+"""
+Perfil de arranque del dashboard
+
+Con DASHBOARD_PERFIL_ARRANQUE definido, registra una línea de tiempo del
+arranque en frío: grupos de importaciones, cada lectura de un archivo de
+datos, cada joblib.load, la construcción del layout y la primera petición
+de layout y de callback. Al terminar el primer callback escribe el
+reporte en JSON (en stdout si la variable vale `1`, si no en la ruta que
+indique). Sin la variable todas las operaciones son no-ops.
+
+Uso:
+    DASHBOARD_PERFIL_ARRANQUE=1 python3 app.py
+    DASHBOARD_PERFIL_ARRANQUE=/tmp/arranque.json gunicorn -c gunicorn.conf.py wsgi:server
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+
+RUTA_CALLBACK = '/_dash-update-component'
+RUTA_LAYOUT = '/_dash-layout'
+
+
+class _Fase:
+    """Intervalo abierto de la línea de tiempo; se cierra con terminar() o al salir del with"""
+
+    def __init__(self, perfil, nombre, detalle):
+        self.perfil = perfil
+        self.nombre = nombre
+        self.detalle = detalle
+        self.inicio = time.perf_counter()
+
+    def terminar(self):
+        self.perfil.registrar(self.nombre, self.inicio, time.perf_counter(), **self.detalle)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.terminar()
+        return False
+
+
+class _FaseInactiva:
+    def terminar(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class PerfilArranque:
+    """Línea de tiempo de las fases del arranque, relativa a la importación de este módulo"""
+
+    def __init__(self, destino=None):
+        self.destino = destino
+        self.activo = bool(destino)
+        self.origen = time.perf_counter()
+        self.fases = []
+        self._ultimo_hito = self.origen
+        self._primeras = set()
+        self._reportado = False
+        self._lock = threading.Lock()
+
+    def fase(self, nombre, **detalle):
+        """Intervalo con nombre: `with perfil.fase('lectura:academica'):` o `f = perfil.fase(...); f.terminar()`"""
+        if not self.activo:
+            return _FaseInactiva()
+        return _Fase(self, nombre, detalle)
+
+    def hito(self, nombre):
+        """Cierra una fase secuencial del hilo principal: el tiempo desde el hito anterior"""
+        if not self.activo:
+            return
+        fin = time.perf_counter()
+        self.registrar(nombre, self._ultimo_hito, fin)
+        self._ultimo_hito = fin
+
+    def registrar(self, nombre, inicio, fin, **detalle):
+        with self._lock:
+            self.fases.append({
+                'fase': nombre,
+                'inicio_ms': round((inicio - self.origen) * 1000, 2),
+                'duracion_ms': round((fin - inicio) * 1000, 2),
+                'hilo': threading.current_thread().name,
+                **detalle,
+            })
+
+    def medir(self, nombre, funcion):
+        """`funcion` con cada llamada registrada como fase (la misma función si el perfil está inactivo)"""
+        if not self.activo:
+            return funcion
+
+        @functools.wraps(funcion)
+        def medida(*args, **kwargs):
+            archivo = os.path.basename(str(args[0])) if args else None
+            with self.fase(nombre, **({'archivo': archivo} if archivo else {})):
+                return funcion(*args, **kwargs)
+
+        return medida
+
+    def instrumentar(self, modulo, atributo, nombre):
+        """Registra cada llamada a `modulo.atributo` como una fase (p. ej. cada joblib.load)"""
+        if self.activo:
+            setattr(modulo, atributo, self.medir(nombre, getattr(modulo, atributo)))
+
+    def instrumentar_servidor(self, server):
+        """Mide la primera petición de layout y de callback; al terminar el primer callback escribe el reporte"""
+        if not self.activo:
+            return
+        from flask import g, request
+
+        @server.before_request
+        def _inicio_peticion():
+            g.inicio_perfil = time.perf_counter()
+
+        @server.after_request
+        def _fin_peticion(respuesta):
+            nombre = {RUTA_LAYOUT: 'primer_layout', RUTA_CALLBACK: 'primer_callback'}.get(request.path)
+            if nombre is not None and self._primera(nombre):
+                self.registrar(nombre, g.inicio_perfil, time.perf_counter(), estado=respuesta.status_code)
+                if nombre == 'primer_callback':
+                    self.reportar()
+            return respuesta
+
+    def _primera(self, nombre):
+        with self._lock:
+            if nombre in self._primeras:
+                return False
+            self._primeras.add(nombre)
+            return True
+
+    def reporte(self):
+        """Línea de tiempo ordenada y totales del arranque"""
+        with self._lock:
+            fases = sorted(self.fases, key=lambda f: f['inicio_ms'])
+        primer_callback = next((f for f in fases if f['fase'] == 'primer_callback'), None)
+        return {
+            'pid': os.getpid(),
+            'fases': fases,
+            'hasta_primer_callback_ms': (
+                round(primer_callback['inicio_ms'] + primer_callback['duracion_ms'], 2)
+                if primer_callback else None
+            ),
+        }
+
+    def reportar(self):
+        """Escribe el reporte una sola vez (stdout si el destino es '1')"""
+        with self._lock:
+            if self._reportado:
+                return
+            self._reportado = True
+        contenido = json.dumps(self.reporte(), ensure_ascii=False)
+        if self.destino == '1':
+            print(f"PERFIL_ARRANQUE {contenido}", flush=True)
+            return
+        with open(self.destino, 'w', encoding='utf-8') as archivo:
+            archivo.write(contenido)
+
+
+perfil = PerfilArranque(os.environ.get('DASHBOARD_PERFIL_ARRANQUE'))
@@ -0,0 +1,65 @@
+"""
+Recarga de datos en caliente
+
+Un hilo en segundo plano consulta periódicamente la huella (fecha de
+modificación y tamaño) de los archivos de origen y, cuando alguno cambia
+y deja de cambiar, llama a la función de recarga con las claves de los
+archivos modificados. El dashboard no se reinicia ni pierde sus cachés.
+"""
+
+import threading
+import traceback
+
+
+class VigilanteArchivos:
+    """Hilo que detecta cambios en los archivos de origen"""
+
+    def __init__(self, obtener_firmas, al_cambiar, intervalo=30, firmas_iniciales=None):
+        # obtener_firmas() -> {clave: huella}; al_cambiar(claves_cambiadas)
+        self.obtener_firmas = obtener_firmas
+        self.al_cambiar = al_cambiar
+        self.intervalo = intervalo
+        self._firmas = firmas_iniciales if firmas_iniciales is not None else obtener_firmas()
+        self._pendientes = None
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def iniciar(self):
+        """Arranca el hilo (daemon: no impide cerrar el servidor)"""
+        if self._hilo is None or not self._hilo.is_alive():
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._ejecutar, name='recarga-datos', daemon=True)
+            self._hilo.start()
+        return self
+
+    def detener(self):
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout=self.intervalo + 1)
+
+    def revisar(self):
+        """Una consulta; retorna las claves recargadas (vacío si no hubo recarga)"""
+        firmas = self.obtener_firmas()
+        cambiadas = {clave for clave, firma in firmas.items() if firma != self._firmas.get(clave)}
+        if not cambiadas:
+            self._pendientes = None
+            return set()
+
+        # Un archivo que se está escribiendo cambia entre consultas: se espera a que se estabilice
+        if firmas != self._pendientes:
+            self._pendientes = firmas
+            return set()
+
+        try:
+            self.al_cambiar(cambiadas)
+        except Exception as e:
+            # Se conservan los datos anteriores; se reintenta cuando el archivo vuelva a cambiar
+            print(f"Error recargando datos: {e}")
+            traceback.print_exc()
+        self._firmas = firmas
+        self._pendientes = None
+        return cambiadas
+
+    def _ejecutar(self):
+        while not self._detener.wait(self.intervalo):
+            self.revisar()
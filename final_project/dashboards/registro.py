@@ -0,0 +1,99 @@
+"""
+Registro perezoso de datos
+
+Una instantánea de los datos del dashboard cuyas partes (grupos: datasets
+procesados, cada tabla de BI, modelo) se cargan en el primer acceso. Cada
+grupo tiene su propio lock: dos callbacks que piden el mismo grupo a la vez
+lo cargan una sola vez, y cargar un grupo no bloquea el acceso a los demás.
+Se usa como un diccionario de solo lectura (`datos['kpis']`,
+`datos.get('versiones')`).
+"""
+
+import threading
+import traceback
+from collections.abc import Mapping
+
+
+class RegistroDatos(Mapping):
+    """Instantánea de datos cuyas partes se cargan al primer acceso"""
+
+    def __init__(self, valores=None):
+        # Valores inmediatos (versión, generación) y valores de grupos ya cargados
+        self._valores = dict(valores or {})
+        # grupo -> (claves, cargar); cargar() -> {clave: valor}
+        self._grupos = {}
+        self._grupo_de = {}
+        self._cargados = {}
+        self._locks = {}
+
+    def registrar(self, grupo, claves, cargar):
+        """Declara un grupo de claves que se cargan juntas con `cargar()`"""
+        self._grupos[grupo] = (list(claves), cargar)
+        self._locks[grupo] = threading.Lock()
+        for clave in claves:
+            self._grupo_de[clave] = grupo
+
+    def heredar(self, otro, grupo):
+        """Reutiliza un grupo de otra instantánea: ya cargado si lo estaba, si no con el mismo cargador"""
+        claves, cargar = otro._grupos[grupo]
+        self.registrar(grupo, claves, cargar)
+        valores = otro.valores_grupo(grupo)
+        if valores is not None:
+            self._publicar(grupo, valores)
+
+    def cargado(self, grupo):
+        return grupo in self._cargados
+
+    def grupos_cargados(self):
+        return [grupo for grupo in self._grupos if grupo in self._cargados]
+
+    def valores_grupo(self, grupo):
+        """Valores de un grupo si ya se cargó (None si no), sin provocar la carga"""
+        return self._cargados.get(grupo)
+
+    def cargar(self, grupo):
+        """Carga un grupo una sola vez aunque lo pidan varios hilos a la vez"""
+        if grupo in self._cargados:
+            return self._cargados[grupo]
+        with self._locks[grupo]:
+            if grupo not in self._cargados:
+                _, cargar = self._grupos[grupo]
+                self._publicar(grupo, cargar())
+        return self._cargados[grupo]
+
+    def precargar(self, grupos=None):
+        """Carga los grupos indicados (todos por defecto); un error no detiene a los demás"""
+        for grupo in grupos if grupos is not None else list(self._grupos):
+            if grupo not in self._grupos:
+                continue
+            try:
+                self.cargar(grupo)
+            except Exception as e:
+                print(f"Error precargando {grupo}: {e}")
+                traceback.print_exc()
+
+    def _publicar(self, grupo, valores):
+        # Un grupo puede omitir claves (p. ej. una fuente cuyo archivo no existe)
+        self._valores.update(valores)
+        self._cargados[grupo] = dict(valores)
+
+    def __getitem__(self, clave):
+        if clave in self._valores:
+            return self._valores[clave]
+        grupo = self._grupo_de.get(clave)
+        if grupo is None or grupo in self._cargados:
+            raise KeyError(clave)
+        return self.cargar(grupo)[clave]
+
+    def __iter__(self):
+        # Claves disponibles sin cargar nada: las ya cargadas y las de grupos pendientes
+        vistas = set()
+        for clave in list(self._valores) + list(self._grupo_de):
+            grupo = self._grupo_de.get(clave)
+            if clave in vistas or (clave not in self._valores and grupo in self._cargados):
+                continue
+            vistas.add(clave)
+            yield clave
+
+    def __len__(self):
+        return sum(1 for _ in self)
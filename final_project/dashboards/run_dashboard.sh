@@ -3,6 +3,15 @@
 # Script para ejecutar el Dashboard de Deserción Educativa
 # Autor: Sistema de Análisis de Datos
 # Fecha: Noviembre 2025
+#
+# Uso:
+#   ./run_dashboard.sh               # servidor de desarrollo (debug)
+#   ./run_dashboard.sh --produccion  # gunicorn con varios workers
+
+MODO="desarrollo"
+if [ "$1" == "--produccion" ]; then
+    MODO="produccion"
+fi
 
 echo "======================================================================"
 echo "         DASHBOARD DE DESERCIÓN EDUCATIVA - ITM 2025-2"
@@ -68,6 +77,22 @@ if [ $? -ne 0 ]; then
 fi
 echo -e "${GREEN}✓ Dependencias instaladas${NC}"
 
+# Generar/actualizar el formato columnar (Arrow) para un arranque rápido
+echo ""
+echo "Actualizando datos columnares..."
+if (cd .. && python3 -m src.data.columnar > /dev/null 2>&1); then
+    echo -e "${GREEN}✓ Datos columnares al día${NC}"
+else
+    echo -e "${YELLOW}Advertencia: no se generó el formato columnar (¿pyarrow instalado?), se usarán los CSV${NC}"
+fi
+
+# Particiones por periodo (DASHBOARD_PERIODO lee solo las de su rango)
+if (cd .. && python3 -m src.data.particiones > /dev/null 2>&1); then
+    echo -e "${GREEN}✓ Particiones por periodo al día${NC}"
+else
+    echo -e "${YELLOW}Advertencia: no se generaron las particiones, se filtrarán los archivos completos${NC}"
+fi
+
 # Ejecutar la aplicación
 echo ""
 echo "======================================================================"
@@ -81,6 +106,15 @@ echo ""
 echo "======================================================================"
 echo ""
 
+# Modo producción: datos cargados una vez y compartidos entre los workers
+if [ "$MODO" == "produccion" ]; then
+    if ! python3 -c "import gunicorn" 2>/dev/null; then
+        echo -e "${YELLOW}Instalando gunicorn...${NC}"
+        pip install gunicorn
+    fi
+    exec gunicorn -c gunicorn.conf.py wsgi:server
+fi
+
 # Esperar 2 segundos y abrir el navegador
 sleep 2
 if command -v xdg-open > /dev/null; then
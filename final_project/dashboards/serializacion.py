@@ -0,0 +1,96 @@
+"""
+Serialización rápida de la salida de los callbacks de figuras
+
+`to_json_plotly` copia la figura entera (`deepcopy`, incluida la plantilla)
+antes de codificarla, y envía en cada figura la plantilla completa, con los
+valores por defecto de todos los tipos de traza de plotly. Aquí:
+
+    - se codifican directamente las propiedades ya validadas de la figura,
+      sin copiarlas;
+    - los arreglos numéricos van como typed arrays en base64
+      (`{"dtype": "i2", "bdata": ...}`), que plotly.js decodifica;
+    - la plantilla conserva solo los tipos de traza que usa la figura (el
+      resto no tiene efecto), así que el gráfico se ve igual;
+    - se codifica con orjson si está instalado.
+
+El resto de las salidas (componentes, diccionarios) usa `to_json_plotly`.
+Con plotly < 6 (sin typed arrays) las figuras también usan `to_json_plotly`.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+from _plotly_utils.utils import PlotlyJSONEncoder
+from plotly.basedatatypes import BaseFigure
+from plotly.io.json import to_json_plotly
+
+try:
+    from _plotly_utils.utils import is_skipped_key, to_typed_array_spec
+except ImportError:  # plotly < 6: sin typed arrays, las figuras usan to_json_plotly
+    to_typed_array_spec = None
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa el codificador de plotly
+    orjson = None
+
+_codificador = PlotlyJSONEncoder()
+
+
+def _tipar(valor):
+    """Copia de las propiedades con los arreglos numéricos como typed arrays"""
+    if isinstance(valor, dict):
+        return {k: v if is_skipped_key(k) else _tipar(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_tipar(v) for v in valor]
+    if isinstance(valor, (np.ndarray, pd.Series, pd.Index)):
+        return to_typed_array_spec(valor)
+    return valor
+
+
+def _plantilla_usada(layout, tipos):
+    """Layout con la plantilla reducida a los tipos de traza presentes"""
+    plantilla = layout.get('template')
+    if not plantilla or 'data' not in plantilla:
+        return layout
+    datos = {tipo: valor for tipo, valor in plantilla['data'].items() if tipo in tipos}
+    return {**layout, 'template': {**plantilla, 'data': datos}}
+
+
+def figura_json(figura):
+    """Diccionario de una figura listo para codificar (sin copiar sus propiedades)"""
+    # _data y _layout son las propiedades validadas de la figura: lo mismo que
+    # to_plotly_json() devuelve después de copiarlas (plotly 6 y 7)
+    try:
+        trazas, layout = figura._data, figura._layout
+    except AttributeError:
+        propiedades = figura.to_plotly_json()
+        trazas, layout = propiedades['data'], propiedades['layout']
+    tipos = {traza.get('type', 'scatter') for traza in trazas}
+    return {
+        'data': _tipar(trazas),
+        'layout': _tipar(_plantilla_usada(layout, tipos)),
+    }
+
+
+def _por_defecto(valor):
+    """Tipos que orjson no conoce (arreglos de objetos, escalares y fechas de pandas)"""
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    return _codificador.default(valor)
+
+
+def _codificar(valor):
+    if orjson is not None:
+        return orjson.dumps(valor, default=_por_defecto, option=orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+    return json.dumps(valor, cls=PlotlyJSONEncoder, separators=(',', ':'))
+
+
+def serializar_salida(resultado):
+    """JSON de la salida de un callback: figuras por la ruta rápida, lo demás con plotly"""
+    if isinstance(resultado, BaseFigure) and to_typed_array_spec is not None:
+        return _codificar(figura_json(resultado))
+    if isinstance(resultado, (list, tuple)):
+        return '[' + ','.join(serializar_salida(valor) for valor in resultado) + ']'
+    return to_json_plotly(resultado)
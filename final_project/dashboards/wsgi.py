@@ -0,0 +1,28 @@
+"""
+Punto de entrada WSGI para producción
+
+Con gunicorn y preload_app, este módulo se importa una sola vez en el
+proceso maestro: los datasets del Overview (DataFrames, cubos e índices)
+se cargan antes de crear los workers y quedan compartidos entre ellos.
+El resto (KPIs de BI y modelo) lo precarga cada worker en segundo plano
+o se carga en el primer acceso.
+
+Uso (desde dashboards/):
+    gunicorn -c gunicorn.conf.py wsgi:server
+"""
+
+import gc
+
+from app import app, datos
+
+server = app.server
+
+if datos is None:
+    print("Advertencia: el dashboard inicia sin datos; /api/listo responderá 503")
+else:
+    datos.precargar(['procesados'])
+
+# Los objetos ya cargados pasan a la generación permanente del GC: los
+# workers no los recorren y no escriben en sus páginas de memoria compartidas
+gc.collect()
+gc.freeze()
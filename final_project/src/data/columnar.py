@@ -0,0 +1,109 @@
+"""
+Almacenamiento columnar para el arranque del dashboard
+
+Convierte los CSV de data/processed y data/bi a archivos Arrow IPC
+(.arrow) sin compresión, que se leen con memory-map en lugar de
+parsear texto. El loader usa el archivo columnar cuando existe y está
+al día con su CSV; en caso contrario lee el CSV.
+
+Uso (desde final_project/):
+    python -m src.data.columnar
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow es opcional: sin él se lee siempre el CSV
+    pa = None
+    feather = None
+
+DIR_PROYECTO = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+DIRECTORIOS_FUENTE = [
+    os.path.join(DIR_PROYECTO, 'data', 'processed'),
+    os.path.join(DIR_PROYECTO, 'data', 'bi'),
+]
+EXTENSION = '.arrow'
+
+
+def ruta_columnar(ruta_csv):
+    """Ruta del archivo Arrow que acompaña a un CSV"""
+    return os.path.splitext(ruta_csv)[0] + EXTENSION
+
+
+def columnar_vigente(ruta_csv):
+    """Indica si existe un archivo Arrow al menos tan reciente como su CSV"""
+    ruta_arrow = ruta_columnar(ruta_csv)
+    if pa is None or not os.path.exists(ruta_arrow):
+        return False
+    if not os.path.exists(ruta_csv):
+        return True
+    return os.path.getmtime(ruta_arrow) >= os.path.getmtime(ruta_csv)
+
+
+def convertir_csv(ruta_csv):
+    """Convierte un CSV a Arrow IPC sin compresión (escritura atómica)"""
+    if pa is None:
+        raise ImportError("pyarrow es necesario para generar el formato columnar")
+
+    df = pd.read_csv(ruta_csv)
+    ruta_arrow = ruta_columnar(ruta_csv)
+    ruta_tmp = ruta_arrow + '.tmp'
+    # Sin compresión para que el memory-map no tenga que descomprimir
+    feather.write_feather(df, ruta_tmp, compression='uncompressed')
+    os.replace(ruta_tmp, ruta_arrow)
+    return ruta_arrow
+
+
+def leer_tabla(ruta_csv):
+    """Lee una tabla desde su archivo Arrow (memory-map) o, si no está, desde el CSV"""
+    if columnar_vigente(ruta_csv):
+        with pa.memory_map(ruta_columnar(ruta_csv), 'r') as fuente:
+            tabla = pa.ipc.open_file(fuente).read_all()
+        return tabla.to_pandas()
+    return pd.read_csv(ruta_csv)
+
+
+def firma_archivos(rutas):
+    """Huella (ruta, mtime, tamaño) de los archivos y de sus Arrow: cambia si alguno se reescribe"""
+    estados = []
+    for ruta in rutas:
+        for candidato in (ruta, ruta_columnar(ruta)):
+            try:
+                info = os.stat(candidato)
+                estados.append(f"{candidato}:{info.st_mtime_ns}:{info.st_size}")
+            except OSError:
+                estados.append(f"{candidato}:-")
+    return hashlib.sha1("|".join(estados).encode('utf-8')).hexdigest()[:16]
+
+
+def construir(directorios=None, forzar=False):
+    """Genera los archivos Arrow de todos los CSV de los directorios fuente"""
+    generados = []
+    for directorio in directorios or DIRECTORIOS_FUENTE:
+        for ruta_csv in sorted(glob.glob(os.path.join(directorio, '*.csv'))):
+            if not forzar and columnar_vigente(ruta_csv):
+                continue
+            generados.append(convertir_csv(ruta_csv))
+    return generados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convierte los CSV procesados y de BI a Arrow IPC")
+    parser.add_argument('--forzar', action='store_true', help="Regenera aunque el archivo esté al día")
+    args = parser.parse_args()
+
+    generados = construir(forzar=args.forzar)
+    for ruta in generados:
+        print(f"✓ {os.path.relpath(ruta, DIR_PROYECTO)}")
+    print(f"{len(generados)} archivo(s) columnar(es) generado(s)")
+
+
+if __name__ == '__main__':
+    main()
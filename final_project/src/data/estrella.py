@@ -0,0 +1,761 @@
+"""
+Modelo estrella de BI construido de forma incremental
+
+Reemplaza a las funciones `crear_dim_*` y `crear_fact_desercion` del
+notebook 03_BI_Design. Los registros académicos
+se agrupan en particiones por `periodo`; cada partición tiene una firma (el
+hash de sus filas, en orden) y sus fragmentos de hechos y de estudiantes ya
+calculados en `data/bi/_estrella/`. En cada ejecución solo se recalculan las
+particiones nuevas o cambiadas; las demás se reutilizan tal como están.
+
+Las claves sustitutas salen de búsquedas en mapas persistentes, no de la
+posición de la fila:
+
+    - `id_tiempo`: mapa periodo → id guardado en el manifiesto (los
+      periodos nuevos reciben el siguiente id);
+    - `id_hecho` / `id_estudiante`: mapa hash del registro → id guardado
+      con cada partición; un registro que sigue igual conserva su id y uno
+      nuevo recibe el siguiente;
+    - `id_programa` / `id_institucion`: hash de la clave natural (programa,
+      facultad, modalidad, jornada; institución, sede, ciudad) → id de la
+      dimensión publicada. Cada clave aparece una sola vez y las nuevas se
+      agregan al final, sin cambiar los ids existentes.
+
+`verificar_integridad` comprueba que cada clave foránea de fact_desercion
+exista en su dimensión y que las dimensiones no repitan ids ni claves.
+
+Los fragmentos se escriben con el nombre de su firma (nunca se
+sobrescriben), los CSV publicados se reemplazan de forma atómica y el
+manifiesto se escribe al final: una ejecución interrumpida deja el modelo
+anterior intacto y la siguiente rehace lo que falte. Publicar concatena
+los fragmentos sin parsearlos.
+
+El manifiesto guarda además, por archivo procesado, su huella y sus
+periodos: una fuente que no cambió no se vuelve a leer (sus periodos y sus
+programas e instituciones ya están publicados). Del archivo académico se
+guarda el hash de su contenido; si solo se le agregaron filas al final,
+se leen solo esas. Los programas e instituciones se resuelven solo con los
+registros de las particiones nuevas o cambiadas. Así agregar un semestre
+cuesta el cálculo de ese semestre, no el de toda la historia.
+
+Uso (desde final_project/):
+    python -m src.data.estrella
+    python -m src.data.estrella --forzar --verificar
+"""
+
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.data.columnar import firma_archivos
+
+DIR_PROYECTO = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+DIR_DATOS = os.path.join(DIR_PROYECTO, 'data')
+
+ARCHIVOS = {
+    'academica': os.path.join('processed', 'desercion_academica_clean.csv'),
+    'no_academica': os.path.join('processed', 'desercion_no_academica_clean.csv'),
+    'sena': os.path.join('processed', 'desercion_sena_clean.csv'),
+    'fact': os.path.join('bi', 'fact_desercion.csv'),
+    'dim_estudiante': os.path.join('bi', 'dim_estudiante.csv'),
+    'dim_tiempo': os.path.join('bi', 'dim_tiempo.csv'),
+    'dim_programa': os.path.join('bi', 'dim_programa.csv'),
+    'dim_institucion': os.path.join('bi', 'dim_institucion.csv'),
+    'kpis': os.path.join('bi', 'kpis_principales.csv'),
+}
+TABLAS_PUBLICADAS = ['fact', 'dim_estudiante', 'dim_tiempo', 'dim_programa', 'dim_institucion', 'kpis']
+# Fuentes cuyos periodos forman dim_tiempo, en el orden en que reciben ids
+FUENTES_TIEMPO = ['no_academica', 'academica', 'sena']
+DIR_ESTADO = os.path.join('bi', '_estrella')
+MANIFIESTO = 'manifiesto.json'
+VERSION_MANIFIESTO = 3
+
+COLUMNAS_HECHOS = [
+    'id_hecho', 'id_tiempo', 'id_estudiante', 'id_programa', 'id_institucion', 'es_desertor',
+    'tipo_desercion', 'cantidad_desertores', 'score_riesgo', 'nivel_riesgo',
+]
+COLUMNAS_ESTUDIANTE = [
+    'id_estudiante', 'tipo_iden_est', 'edad', 'grupo_edad', 'genero', 'estrato', 'estrato_num',
+    'grupo_estrato', 'origen_geografico', 'departamento', 'lugar_expedicion',
+]
+# Dimensiones deduplicadas por el hash de su clave natural
+DIMENSIONES = {
+    'dim_programa': {
+        'id': 'id_programa',
+        'natural': ['nombre_programa', 'nombre_facultad', 'modalidad', 'jornada'],
+        'columnas': ['id_programa', 'nombre_programa', 'nivel_academico', 'nombre_facultad', 'modalidad', 'jornada'],
+    },
+    'dim_institucion': {
+        'id': 'id_institucion',
+        'natural': ['nombre_institucion', 'nombre_sede', 'ciudad'],
+        'columnas': ['id_institucion', 'nombre_institucion', 'tipo_institucion', 'nombre_sede', 'ciudad', 'departamento'],
+    },
+}
+# Clave foránea de fact_desercion → dimensión a la que apunta
+REFERENCIAS = {
+    'id_tiempo': 'dim_tiempo',
+    'id_estudiante': 'dim_estudiante',
+    'id_programa': 'dim_programa',
+    'id_institucion': 'dim_institucion',
+}
+# Columnas de las fuentes procesadas de las que salen programas e instituciones
+COLUMNAS_DIMENSIONES = {
+    'nombre_programa', 'nivel_académico', 'nombre_facultad', 'modalidad', 'jornada', 'nombre_sede',
+    'nombre_programa_formacion', 'nivel_formacion', 'nombre_centro', 'modalidad_formacion', 'nombre_regional',
+}
+NIVELES_SCORE = ([0, 25, 50, 75, 100], ['BAJO', 'MEDIO', 'ALTO', 'CRITICO'])
+NIVELES_ALTO_RIESGO = ('ALTO', 'CRITICO')
+
+
+# ---------------------------------------------------------------------
+# Reglas de negocio
+# ---------------------------------------------------------------------
+
+def score_riesgo(registros):
+    """Score de riesgo 0-100 por registro (calcular_score_riesgo del notebook, vectorizado)"""
+    estrato = pd.to_numeric(registros['estrato_num'], errors='coerce')
+    edad = pd.to_numeric(registros['edad'], errors='coerce')
+    modalidad = registros['modalidad']
+    # str() de un nulo es 'nan': no contiene ninguna de las jornadas
+    jornada = registros['jornada'].fillna('nan').str.upper()
+
+    score = (
+        np.select([estrato.isin([1, 2]), estrato.isin([3, 4])], [30, 15], 0)
+        + np.select([modalidad.isin(['VIRTUAL', 'DISTANCIA']), modalidad == 'PRESENCIAL'], [25, 5], 0)
+        + np.select([(edad < 18) | (edad > 30), edad > 25], [20, 10], 0)
+        + np.select([jornada.str.contains('NOCTURNA', regex=False), jornada.str.contains('EXTENDIDA', regex=False)],
+                    [15, 10], 0)
+        + np.where(registros['genero'] == 'M', 5, 0)
+    )
+    return np.minimum(score, 100)
+
+
+def nivel_riesgo(score):
+    bins, etiquetas = NIVELES_SCORE
+    return pd.cut(score, bins=bins, labels=etiquetas, include_lowest=True)
+
+
+def dim_tiempo(ids):
+    """dim_tiempo a partir del mapa periodo → id_tiempo"""
+    tiempo = pd.DataFrame({'id_tiempo': list(ids.values()), 'periodo': list(ids.keys())})
+    tiempo['periodo_año'] = tiempo['periodo'].str.extract(r'(\d{4})', expand=False).astype(float)
+    tiempo['periodo_semestre'] = tiempo['periodo'].str.contains('PRIMER', case=False).map({True: 1, False: 2})
+    tiempo['periodo_completo'] = tiempo['periodo_año'].map(str) + '-S' + tiempo['periodo_semestre'].map(str)
+    tiempo = tiempo.sort_values('id_tiempo', kind='stable')
+    return tiempo.sort_values(['periodo_año', 'periodo_semestre'], kind='stable')
+
+
+# ---------------------------------------------------------------------
+# Dimensiones con clave natural
+# ---------------------------------------------------------------------
+
+def programas(registros, fuente):
+    """Fila de dim_programa de cada registro de una fuente (None si no tiene programas)"""
+    if fuente == 'sena':
+        if 'nombre_programa_formacion' not in registros.columns:
+            return None
+        return pd.DataFrame({
+            'nombre_programa': registros['nombre_programa_formacion'],
+            'nivel_academico': registros.get('nivel_formacion', 'TECNICO'),
+            'nombre_facultad': registros.get('nombre_centro', 'SENA'),
+            'modalidad': registros.get('modalidad_formacion', 'PRESENCIAL'),
+            'jornada': 'COMPLETA',
+        })
+    if not {'nombre_programa', 'nombre_facultad', 'modalidad', 'jornada'} <= set(registros.columns):
+        return None
+    return pd.DataFrame({
+        'nombre_programa': registros['nombre_programa'],
+        'nivel_academico': registros.get('nivel_académico', 'PREGRADO'),
+        'nombre_facultad': registros['nombre_facultad'],
+        'modalidad': registros['modalidad'],
+        'jornada': registros['jornada'],
+    })
+
+
+def instituciones(registros, fuente):
+    """Fila de dim_institucion de cada registro de una fuente (None si no tiene sede)"""
+    if fuente == 'sena':
+        if not {'nombre_regional', 'nombre_centro'} <= set(registros.columns):
+            return None
+        return pd.DataFrame({
+            'nombre_institucion': 'SENA',
+            'tipo_institucion': 'CENTRO_FORMACION',
+            'nombre_sede': registros['nombre_centro'],
+            'ciudad': registros['nombre_regional'],
+            'departamento': registros['nombre_regional'],
+        })
+    if 'nombre_sede' not in registros.columns:
+        return None
+    return pd.DataFrame({
+        'nombre_institucion': 'UPTC',
+        'tipo_institucion': 'UNIVERSIDAD',
+        'nombre_sede': registros['nombre_sede'],
+        'ciudad': registros['nombre_sede'],
+        'departamento': 'BOYACÁ',
+    })
+
+
+def hash_clave(filas, columnas):
+    """Hash de 64 bits de la clave natural de cada fila"""
+    return pd.util.hash_pandas_object(filas[columnas].fillna('').astype(str), index=False).to_numpy()
+
+
+class Dimension:
+    """Dimensión con una fila por clave natural; las claves nuevas reciben el siguiente id"""
+
+    def __init__(self, nombre, filas=None):
+        especificacion = DIMENSIONES[nombre]
+        self.nombre = nombre
+        self.id = especificacion['id']
+        self.natural = especificacion['natural']
+        self.columnas = especificacion['columnas']
+        self.filas = filas[self.columnas] if filas is not None else pd.DataFrame(columns=self.columnas)
+        self.publicadas = len(self.filas)
+
+        # Mapa hash de la clave → id (si el archivo repite una clave, vale la primera fila)
+        claves = pd.Index(hash_clave(self.filas, self.natural))
+        primeras = ~claves.duplicated()
+        self._claves = claves[primeras]
+        self._ids = self.filas[self.id].to_numpy(dtype=np.int64)[primeras]
+
+    @classmethod
+    def leer(cls, nombre, datos):
+        """Dimensión publicada en `datos` (vacía si no existe)"""
+        ruta = os.path.join(datos, ARCHIVOS[nombre])
+        if not os.path.exists(ruta):
+            return cls(nombre)
+        especificacion = DIMENSIONES[nombre]
+        texto = {columna: str for columna in especificacion['columnas'] if columna != especificacion['id']}
+        return cls(nombre, pd.read_csv(ruta, dtype=texto))
+
+    @property
+    def cambiada(self):
+        return len(self.filas) > self.publicadas
+
+    def resolver(self, candidatas):
+        """Id de cada fila candidata; las claves que no estaban se agregan a la dimensión"""
+        claves = hash_clave(candidatas, self.natural)
+        posiciones = self._claves.get_indexer(claves)
+        nuevas = posiciones < 0
+        if nuevas.any():
+            # Una fila por clave nueva, en orden de primera aparición
+            primeras = nuevas & ~pd.Series(claves).duplicated().to_numpy()
+            siguiente = int(self._ids.max()) + 1 if len(self._ids) else 1
+            agregadas = candidatas[primeras].assign(**{self.id: np.arange(siguiente, siguiente + primeras.sum())})
+            self.filas = pd.concat([self.filas, agregadas[self.columnas]], ignore_index=True)
+            self._claves = self._claves.append(pd.Index(claves[primeras]))
+            self._ids = np.concatenate([self._ids, agregadas[self.id].to_numpy(dtype=np.int64)])
+            posiciones = self._claves.get_indexer(claves)
+        return self._ids[posiciones]
+
+    def guardar(self, datos):
+        _reemplazar(os.path.join(datos, ARCHIVOS[self.nombre]), lambda t: self.filas.to_csv(t, index=False))
+        self.publicadas = len(self.filas)
+
+
+def leer_dimensiones(datos):
+    return {nombre: Dimension.leer(nombre, datos) for nombre in DIMENSIONES}
+
+
+def resolver_fuente(dimensiones, registros, fuente):
+    """Agrega a las dimensiones los programas e instituciones de unos registros"""
+    for nombre, candidatas in (('dim_programa', programas), ('dim_institucion', instituciones)):
+        filas = candidatas(registros, fuente)
+        if filas is not None:
+            dimensiones[nombre].resolver(filas.drop_duplicates())
+
+
+def resolver_archivo(dimensiones, ruta, fuente, bloque):
+    """Agrega a las dimensiones los programas e instituciones de un archivo procesado y retorna sus periodos
+
+    Los periodos van en orden de aparición; se lee el archivo una sola vez y
+    solo esas columnas.
+    """
+    if not os.path.exists(ruta):
+        return []
+    periodos = {}
+    for datos in _leer(ruta, bloque, usecols=lambda columna: columna in COLUMNAS_DIMENSIONES | {'periodo'}):
+        resolver_fuente(dimensiones, datos, fuente)
+        if 'periodo' in datos.columns:
+            periodos.update(dict.fromkeys(datos['periodo'].dropna().unique()))
+    return list(periodos)
+
+
+def ids_dimension(dimension, candidatas, filas):
+    """Clave foránea de cada registro (nula si la fuente no tiene las columnas de la dimensión)"""
+    if candidatas is None:
+        return pd.array([pd.NA] * filas, dtype='Int64')
+    return dimension.resolver(candidatas)
+
+
+# ---------------------------------------------------------------------
+# Particiones
+# ---------------------------------------------------------------------
+
+def _leer(ruta, bloque, desde=0, **kwargs):
+    """Bloques de un CSV procesado como texto (los valores se publican sin reformatear)
+
+    Con `desde` se leen solo las filas a partir de ese byte, que debe ser el
+    inicio de una línea (las columnas siguen siendo las del encabezado).
+    """
+    if not desde:
+        return pd.read_csv(ruta, dtype=str, chunksize=bloque, **kwargs)
+
+    def bloques():
+        if os.path.getsize(ruta) <= desde:
+            return
+        columnas = pd.read_csv(ruta, nrows=0).columns
+        with open(ruta, 'rb') as archivo:
+            archivo.seek(desde)
+            yield from pd.read_csv(archivo, dtype=str, chunksize=bloque, header=None, names=columnas, **kwargs)
+    return bloques()
+
+
+def _particiones(periodo):
+    """Clave de partición de cada fila y, por partición, sus posiciones en orden"""
+    codigos, valores = pd.factorize(periodo.fillna(''), sort=False)
+    orden = np.argsort(codigos, kind='stable')
+    cortes = np.searchsorted(codigos[orden], np.arange(1, len(valores)))
+    return zip(valores, np.split(orden, cortes))
+
+
+def hash_filas(registros):
+    """Hash de 64 bits del contenido de cada fila"""
+    return pd.util.hash_pandas_object(registros, index=False).to_numpy()
+
+
+def escanear(ruta, bloque, conocidas=(), dimensiones=None, desde=0):
+    """Firma y filas de cada partición, en orden de primera aparición (una lectura del archivo)
+
+    Las filas de las particiones que no están en `conocidas` se conservan:
+    son nuevas y se van a calcular de todos modos. Si se pasan `dimensiones`,
+    se les agregan los programas e instituciones de esas filas en el orden
+    del archivo (las de las particiones conocidas ya están publicadas).
+    """
+    firmas, filas, nuevas = {}, {}, {}
+    for datos in _leer(ruta, bloque, desde):
+        if dimensiones is not None:
+            resolver_fuente(dimensiones, datos[~datos['periodo'].fillna('').isin(conocidas)], 'academica')
+        hashes = hash_filas(datos)
+        for periodo, posiciones in _particiones(datos['periodo']):
+            if periodo not in firmas:
+                firmas[periodo] = hashlib.blake2b(digest_size=16)
+                filas[periodo] = 0
+            firmas[periodo].update(hashes[posiciones].tobytes())
+            filas[periodo] += len(posiciones)
+            if periodo not in conocidas:
+                nuevas.setdefault(periodo, []).append(datos.iloc[posiciones])
+    firmas = {periodo: firma.hexdigest() for periodo, firma in firmas.items()}
+    return firmas, filas, {periodo: pd.concat(bloques, ignore_index=True) for periodo, bloques in nuevas.items()}
+
+
+def leer_particiones(ruta, periodos, bloque):
+    """Filas de las particiones indicadas (el resto del archivo no se conserva)"""
+    partes = {periodo: [] for periodo in periodos}
+    for datos in _leer(ruta, bloque):
+        for periodo, posiciones in _particiones(datos['periodo']):
+            if periodo in partes:
+                partes[periodo].append(datos.iloc[posiciones])
+    return {periodo: pd.concat(bloques, ignore_index=True) for periodo, bloques in partes.items()}
+
+
+def claves_registros(registros):
+    """Clave natural de cada registro: su contenido y su número de repetición en la partición"""
+    hashes = hash_filas(registros)
+    repeticion = pd.Series(hashes).groupby(hashes).cumcount().to_numpy()
+    return pd.util.hash_pandas_object(pd.DataFrame({'h': hashes, 'n': repeticion}), index=False).to_numpy()
+
+
+def construir_particion(registros, ids_tiempo, dimensiones, anteriores, siguiente_id):
+    """Hechos y estudiantes de una partición; reutiliza el id de los registros ya conocidos"""
+    claves = claves_registros(registros)
+    ids = np.full(len(claves), -1, dtype=np.int64)
+    if anteriores is not None:
+        claves_previas, ids_previos = anteriores
+        encontrados = pd.Index(claves_previas).get_indexer(claves)
+        ids[encontrados >= 0] = ids_previos[encontrados[encontrados >= 0]]
+    nuevos = ids < 0
+    ids[nuevos] = np.arange(siguiente_id, siguiente_id + nuevos.sum())
+    siguiente_id += int(nuevos.sum())
+
+    estudiantes = registros.reindex(columns=COLUMNAS_ESTUDIANTE)
+    estudiantes['id_estudiante'] = ids
+    estudiantes['departamento'] = registros['origen_geografico'].str.split().str[0]
+
+    score = score_riesgo(registros)
+    hechos = pd.DataFrame({
+        'id_hecho': ids,
+        'id_tiempo': registros['periodo'].map(ids_tiempo).astype('Int64'),
+        'id_estudiante': ids,
+        'id_programa': ids_dimension(dimensiones['dim_programa'], programas(registros, 'academica'), len(ids)),
+        'id_institucion': ids_dimension(
+            dimensiones['dim_institucion'], instituciones(registros, 'academica'), len(ids)
+        ),
+        'es_desertor': 1,
+        'tipo_desercion': registros.get('tipo_desercion', 'ACADEMICA'),
+        'cantidad_desertores': 1,
+        'score_riesgo': score,
+        'nivel_riesgo': nivel_riesgo(score),
+    })
+    return hechos, estudiantes, claves, ids, resumen_hechos(hechos), siguiente_id
+
+
+def resumen_hechos(hechos):
+    """Totales de unos hechos con los que se calculan los KPIs"""
+    return {
+        'filas': len(hechos),
+        'desertores': int(hechos['cantidad_desertores'].sum()),
+        'suma_score': int(hechos['score_riesgo'].sum()),
+        'alto_riesgo': int(hechos['nivel_riesgo'].isin(NIVELES_ALTO_RIESGO).sum()),
+    }
+
+
+# ---------------------------------------------------------------------
+# Estado en disco
+# ---------------------------------------------------------------------
+
+def _reemplazar(ruta, escribir):
+    """Escribe en un temporal y lo pone en `ruta` con un reemplazo atómico"""
+    temporal = ruta + '.tmp'
+    try:
+        escribir(temporal)
+        os.replace(temporal, ruta)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+
+def _guardar_claves(ruta, claves, ids):
+    with open(ruta, 'wb') as archivo:
+        np.savez(archivo, claves=claves, ids=ids)
+
+
+def _guardar_json(ruta, valor):
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(valor, archivo, ensure_ascii=False, indent=1)
+
+
+def _fragmentos(dir_estado, firma):
+    base = os.path.join(dir_estado, firma)
+    return {tipo: f"{base}.{tipo}" for tipo in ('fact.csv', 'estudiante.csv', 'claves.npz')}
+
+
+def leer_manifiesto(datos):
+    """Manifiesto del último modelo construido (None si no hay o es de otra versión)"""
+    try:
+        with open(os.path.join(datos, DIR_ESTADO, MANIFIESTO), encoding='utf-8') as archivo:
+            manifiesto = json.load(archivo)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return manifiesto if manifiesto.get('version') == VERSION_MANIFIESTO else None
+
+
+def ids_tiempo_publicados(datos):
+    """Mapa periodo → id_tiempo de un dim_tiempo ya publicado (para conservar sus ids)"""
+    ruta = os.path.join(datos, ARCHIVOS['dim_tiempo'])
+    if not os.path.exists(ruta):
+        return {}
+    tiempo = pd.read_csv(ruta, dtype={'periodo': str}).dropna(subset=['periodo'])
+    return dict(zip(tiempo['periodo'], tiempo['id_tiempo'].astype(int)))
+
+
+def huella_contenido(ruta, prefijo=None):
+    """Hash del contenido de un archivo y el de sus primeros `prefijo` bytes
+
+    El segundo es None si no se pide, si el archivo es más corto o si esos
+    bytes no terminan en un salto de línea (no son filas completas).
+    """
+    total = hashlib.blake2b(digest_size=16)
+    inicial = None
+    with open(ruta, 'rb') as archivo:
+        if prefijo:
+            restante, ultimo = prefijo, b''
+            while restante and (bloque := archivo.read(min(restante, 1 << 20))):
+                total.update(bloque)
+                restante -= len(bloque)
+                ultimo = bloque[-1:]
+            if not restante and ultimo == b'\n':
+                inicial = total.hexdigest()
+        while bloque := archivo.read(1 << 20):
+            total.update(bloque)
+    return total.hexdigest(), inicial
+
+
+def _concatenar(ruta, columnas, fragmentos):
+    """CSV con encabezado y los fragmentos (sin encabezado) uno tras otro"""
+    def escribir(temporal):
+        with open(temporal, 'wb') as salida:
+            salida.write((','.join(columnas) + '\n').encode('utf-8'))
+            for fragmento in fragmentos:
+                with open(fragmento, 'rb') as entrada:
+                    while bloque := entrada.read(1 << 20):
+                        salida.write(bloque)
+    _reemplazar(ruta, escribir)
+
+
+def kpis(resumenes):
+    """kpis_principales a partir de los totales de cada partición"""
+    filas = sum(r['filas'] for r in resumenes)
+    alto_riesgo = sum(r['alto_riesgo'] for r in resumenes)
+    return pd.DataFrame({
+        'KPI': ['Total Desertores', 'Score Promedio Riesgo', '% Alto Riesgo', 'Estudiantes Alto Riesgo'],
+        'Valor': [
+            float(sum(r['desertores'] for r in resumenes)),
+            round(sum(r['suma_score'] for r in resumenes) / filas, 2) if filas else 0.0,
+            round(alto_riesgo / filas * 100, 2) if filas else 0.0,
+            float(alto_riesgo),
+        ],
+    })
+
+
+# ---------------------------------------------------------------------
+# Construcción
+# ---------------------------------------------------------------------
+
+def escanear_academica(ruta, bloque, previas, previo=None, dimensiones=None):
+    """Como `escanear`, pero si el archivo solo creció desde `previo` se leen solo las filas agregadas
+
+    Retorna además la huella del contenido (tamaño y hash) para el manifiesto.
+    Si las filas agregadas son de una partición conocida, esa partición
+    cambió y se escanea el archivo completo.
+    """
+    contenido, inicial = huella_contenido(ruta, previo['bytes'] if previo else None)
+    huella = {'bytes': os.path.getsize(ruta), 'contenido': contenido}
+    if previo and inicial == previo['contenido']:
+        firmas, filas, registros = escanear(ruta, bloque, list(previas), dimensiones, desde=previo['bytes'])
+        if not set(firmas) & set(previas):
+            firmas = {**{periodo: particion['firma'] for periodo, particion in previas.items()}, **firmas}
+            filas = {**{periodo: particion['filas'] for periodo, particion in previas.items()}, **filas}
+            return firmas, filas, registros, huella
+    return (*escanear(ruta, bloque, list(previas), dimensiones), huella)
+
+
+def construir_estrella(datos=DIR_DATOS, bloque=100_000, forzar=False):
+    """Actualiza data/bi recalculando solo las particiones nuevas o cambiadas"""
+    dir_estado = os.path.join(datos, DIR_ESTADO)
+    os.makedirs(dir_estado, exist_ok=True)
+    anterior = None if forzar else leer_manifiesto(datos)
+    previas = anterior['particiones'] if anterior else {}
+    fuentes_previas = anterior['fuentes'] if anterior else {}
+    publicadas = [os.path.join(datos, ARCHIVOS[tabla]) for tabla in TABLAS_PUBLICADAS]
+
+    # Sin archivos procesados reescritos no hace falta ni leerlos
+    rutas = {fuente: os.path.join(datos, ARCHIVOS[fuente]) for fuente in FUENTES_TIEMPO}
+    huellas = {fuente: firma_archivos([ruta]) for fuente, ruta in rutas.items()}
+    if (anterior and all(fuentes_previas[fuente]['firma'] == huellas[fuente] for fuente in FUENTES_TIEMPO)
+            and all(map(os.path.exists, publicadas))):
+        filas = sum(particion['filas'] for particion in previas.values())
+        return {'particiones': len(previas), 'filas': filas, 'cambiadas': [], 'eliminadas': []}
+
+    # dim_programa / dim_institucion: las claves publicadas conservan su id; si
+    # falta alguna que ya se había publicado, los fragmentos pueden apuntar a ids
+    # que ya no existen y se recalculan todos
+    dimensiones = leer_dimensiones(datos)
+    contadas = anterior.get('dimensiones', {}) if anterior else {}
+    dimensiones_perdidas = any(
+        len(dimension.filas) < contadas.get(nombre, 0) for nombre, dimension in dimensiones.items()
+    )
+
+    def sin_cambios(fuente):
+        # Sus periodos y sus programas e instituciones ya están en el modelo publicado
+        return not dimensiones_perdidas and fuentes_previas.get(fuente, {}).get('firma') == huellas[fuente]
+
+    def leer_fuente(fuente):
+        if sin_cambios(fuente):
+            return fuentes_previas[fuente]
+        return {'firma': huellas[fuente], 'periodos': resolver_archivo(dimensiones, rutas[fuente], fuente, bloque)}
+
+    # dim_tiempo: los periodos conocidos conservan su id y los nuevos reciben el
+    # siguiente, en el orden de FUENTES_TIEMPO
+    ids_tiempo = dict(anterior['tiempo']) if anterior else ids_tiempo_publicados(datos)
+
+    def agregar_periodos(periodos):
+        for periodo in periodos:
+            ids_tiempo.setdefault(periodo, max(ids_tiempo.values(), default=0) + 1)
+
+    fuentes = {'no_academica': leer_fuente('no_academica')}
+    agregar_periodos(fuentes['no_academica']['periodos'])
+
+    if sin_cambios('academica'):
+        fuentes['academica'] = fuentes_previas['academica']
+        firmas = {periodo: particion['firma'] for periodo, particion in previas.items()}
+        filas = {periodo: particion['filas'] for periodo, particion in previas.items()}
+        registros = {}
+    else:
+        previo = None if dimensiones_perdidas else fuentes_previas.get('academica')
+        firmas, filas, registros, huella = escanear_academica(
+            rutas['academica'], bloque, previas, previo, dimensiones
+        )
+        periodos = [periodo for periodo in firmas if periodo]
+        fuentes['academica'] = {'firma': huellas['academica'], 'periodos': periodos, **huella}
+    agregar_periodos(fuentes['academica']['periodos'])
+
+    fuentes['sena'] = leer_fuente('sena')
+    agregar_periodos(fuentes['sena']['periodos'])
+
+    cambiadas = [
+        periodo for periodo, firma in firmas.items()
+        if dimensiones_perdidas or periodo not in previas or previas[periodo]['firma'] != firma
+        or not all(map(os.path.exists, _fragmentos(dir_estado, firma).values()))
+    ]
+    eliminadas = [periodo for periodo in previas if periodo not in firmas]
+
+    siguiente_id = anterior['siguiente_id'] if anterior else 1
+    particiones = {}
+    # Las particiones ya conocidas que cambiaron se leen en una segunda pasada
+    releer = [periodo for periodo in cambiadas if periodo not in registros]
+    if releer:
+        registros.update(leer_particiones(rutas['academica'], releer, bloque))
+    for periodo in firmas:
+        if periodo not in registros:
+            particiones[periodo] = previas[periodo]
+            continue
+        previa = previas.get(periodo)
+        anteriores = None
+        if previa and os.path.exists(_fragmentos(dir_estado, previa['firma'])['claves.npz']):
+            with np.load(_fragmentos(dir_estado, previa['firma'])['claves.npz']) as guardadas:
+                anteriores = (guardadas['claves'], guardadas['ids'])
+
+        hechos, estudiantes, claves, ids, resumen, siguiente_id = construir_particion(
+            registros.pop(periodo), ids_tiempo, dimensiones, anteriores, siguiente_id
+        )
+        archivos = _fragmentos(dir_estado, firmas[periodo])
+        _reemplazar(archivos['fact.csv'], lambda t: hechos.to_csv(t, header=False, index=False))
+        _reemplazar(archivos['estudiante.csv'], lambda t: estudiantes.to_csv(t, header=False, index=False))
+        _reemplazar(archivos['claves.npz'], lambda t: _guardar_claves(t, claves, ids))
+        particiones[periodo] = {'firma': firmas[periodo], **resumen}
+
+    # Las dimensiones se publican antes que los hechos que apuntan a ellas
+    for nombre, dimension in dimensiones.items():
+        if dimension.cambiada or not os.path.exists(os.path.join(datos, ARCHIVOS[nombre])):
+            dimension.guardar(datos)
+
+    tiempo_cambiado = not anterior or ids_tiempo != anterior['tiempo']
+    orden_cambiado = list(previas) != list(firmas)
+    if cambiadas or eliminadas or tiempo_cambiado or orden_cambiado or not all(map(os.path.exists, publicadas)):
+        fragmentos = [_fragmentos(dir_estado, p['firma']) for p in particiones.values()]
+        _concatenar(os.path.join(datos, ARCHIVOS['fact']), COLUMNAS_HECHOS, [f['fact.csv'] for f in fragmentos])
+        _concatenar(os.path.join(datos, ARCHIVOS['dim_estudiante']), COLUMNAS_ESTUDIANTE,
+                    [f['estudiante.csv'] for f in fragmentos])
+        _reemplazar(os.path.join(datos, ARCHIVOS['dim_tiempo']),
+                    lambda t: dim_tiempo(ids_tiempo).to_csv(t, index=False))
+        _reemplazar(os.path.join(datos, ARCHIVOS['kpis']),
+                    lambda t: kpis(list(particiones.values())).to_csv(t, index=False))
+
+    manifiesto = {
+        'version': VERSION_MANIFIESTO,
+        'fuentes': fuentes,
+        'siguiente_id': siguiente_id,
+        'tiempo': ids_tiempo,
+        'dimensiones': {nombre: len(dimension.filas) for nombre, dimension in dimensiones.items()},
+        'particiones': particiones,
+    }
+    _reemplazar(os.path.join(dir_estado, MANIFIESTO), lambda t: _guardar_json(t, manifiesto))
+
+    # Fragmentos que ya no usa ninguna partición
+    vigentes = {
+        os.path.basename(ruta)
+        for particion in particiones.values() for ruta in _fragmentos(dir_estado, particion['firma']).values()
+    }
+    for nombre in os.listdir(dir_estado):
+        if nombre != MANIFIESTO and nombre not in vigentes:
+            os.remove(os.path.join(dir_estado, nombre))
+
+    return {'particiones': len(particiones), 'filas': sum(filas.values()), 'cambiadas': cambiadas, 'eliminadas': eliminadas}
+
+
+# ---------------------------------------------------------------------
+# Integridad referencial
+# ---------------------------------------------------------------------
+
+def _ids_dimension(ruta, columna, bloque):
+    return np.concatenate([
+        datos[columna].to_numpy(dtype=np.int64)
+        for datos in pd.read_csv(ruta, usecols=[columna], chunksize=bloque)
+    ] or [np.empty(0, dtype=np.int64)])
+
+
+def verificar_integridad(datos=DIR_DATOS, bloque=100_000):
+    """Problemas de integridad del modelo publicado (lista vacía si no hay ninguno)
+
+    Comprueba que las dimensiones no repitan ids ni claves naturales y que
+    cada clave foránea de fact_desercion exista en su dimensión. Los hechos
+    se leen por bloques y solo sus columnas de claves.
+    """
+    problemas = []
+    ids = {}
+    for columna, tabla in REFERENCIAS.items():
+        ruta = os.path.join(datos, ARCHIVOS[tabla])
+        if not os.path.exists(ruta):
+            problemas.append(f"{tabla}: no existe {ruta}")
+            continue
+        ids[columna] = np.sort(_ids_dimension(ruta, columna, bloque))
+        repetidos = int(np.count_nonzero(ids[columna][1:] == ids[columna][:-1]))
+        if repetidos:
+            problemas.append(f"{tabla}: {repetidos:,} ids repetidos en {columna}")
+
+    for nombre, especificacion in DIMENSIONES.items():
+        dimension = Dimension.leer(nombre, datos)
+        repetidas = int(pd.Index(hash_clave(dimension.filas, especificacion['natural'])).duplicated().sum())
+        if repetidas:
+            problemas.append(f"{nombre}: {repetidas:,} claves naturales repetidas")
+
+    ruta_hechos = os.path.join(datos, ARCHIVOS['fact'])
+    if not os.path.exists(ruta_hechos):
+        return problemas + [f"fact_desercion: no existe {ruta_hechos}"]
+    presentes = pd.read_csv(ruta_hechos, nrows=0).columns
+    faltantes = [columna for columna in REFERENCIAS if columna not in presentes]
+    problemas += [f"fact_desercion: falta la columna {columna}" for columna in faltantes]
+
+    columnas = [columna for columna in REFERENCIAS if columna in presentes and columna in ids]
+    huerfanas = dict.fromkeys(columnas, 0)
+    nulas = dict.fromkeys(columnas, 0)
+    for hechos in pd.read_csv(ruta_hechos, usecols=columnas, chunksize=bloque):
+        for columna in columnas:
+            valores = hechos[columna]
+            nulas[columna] += int(valores.isna().sum())
+            valores = valores.dropna().to_numpy(dtype=np.int64)
+            huerfanas[columna] += int(np.count_nonzero(~np.isin(valores, ids[columna])))
+    for columna in columnas:
+        if nulas[columna]:
+            problemas.append(f"fact_desercion: {nulas[columna]:,} filas sin {columna}")
+        if huerfanas[columna]:
+            problemas.append(
+                f"fact_desercion: {huerfanas[columna]:,} filas con {columna} inexistente en {REFERENCIAS[columna]}"
+            )
+    return problemas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Actualiza el modelo estrella de data/bi de forma incremental")
+    parser.add_argument('--datos', default=DIR_DATOS, help="Directorio de datos (lee processed/, escribe bi/)")
+    parser.add_argument('--bloque', type=int, default=100_000, help="Filas por bloque leído")
+    parser.add_argument('--forzar', action='store_true', help="Recalcular todas las particiones")
+    parser.add_argument('--verificar', action='store_true',
+                        help="Comprobar la integridad referencial del modelo publicado")
+    args = parser.parse_args()
+
+    resultado = construir_estrella(args.datos, args.bloque, args.forzar)
+    print(f"✓ {resultado['filas']:,} registros en {resultado['particiones']} particiones")
+    for periodo in resultado['cambiadas']:
+        print(f"  recalculada: {periodo or '(sin periodo)'}")
+    for periodo in resultado['eliminadas']:
+        print(f"  eliminada: {periodo or '(sin periodo)'}")
+    if not resultado['cambiadas'] and not resultado['eliminadas']:
+        print("  sin cambios")
+
+    if args.verificar:
+        problemas = verificar_integridad(args.datos, args.bloque)
+        for problema in problemas:
+            print(f"  ✗ {problema}")
+        if problemas:
+            raise SystemExit(1)
+        print("✓ Integridad referencial verificada")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,305 @@
+"""
+ETL de los datasets crudos de deserción (reemplaza al notebook 01_ETL)
+
+Lee cada archivo crudo por bloques con tipos explícitos (sin inferencia),
+aplica la limpieza del notebook como funciones vectorizadas sobre cada
+bloque y agrega el bloque limpio al CSV de data/processed. Ninguna
+transformación necesita más de un bloque, así que la memoria depende de
+`--bloque` y no del tamaño del archivo; lo único que crece con los datos
+es el conjunto de hashes (8 bytes por fila distinta) con el que se cuentan
+los duplicados del reporte de calidad.
+
+El resultado es el mismo con cualquier tamaño de bloque. Cada CSV se
+escribe en un archivo temporal y se reemplaza al final, de modo que el
+dashboard nunca lee un archivo a medio escribir.
+
+Uso (desde final_project/):
+    python -m src.data.etl
+    python -m src.data.etl --origen ../datasets --bloque 50000 --fuentes academica sena
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+DIR_PROYECTO = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+DIR_DATOS = os.path.join(DIR_PROYECTO, 'data')
+DIR_CRUDOS = os.path.normpath(os.path.join(DIR_PROYECTO, '..', 'datasets'))
+
+TEXTO = str
+# Los conteos se leen como texto y se convierten con errors='coerce', como en el notebook
+CONTEO = TEXTO
+
+# Fecha de corte para la edad y formatos de fecha de los archivos crudos
+FECHA_REFERENCIA = pd.Timestamp('2024-01-01')
+FORMATO_NACIMIENTO = '%Y %b %d %I:%M:%S %p'  # 1958 Sep 23 12:00:00 AM
+FORMATO_FICHA = '%d/%m/%Y'
+
+GRUPOS_EDAD = ([0, 20, 25, 30, 100], ['16-20', '21-25', '26-30', '31+'])
+GRUPOS_ESTRATO = ([0, 2, 4, 6], ['BAJO', 'MEDIO', 'ALTO'])
+NIVELES_RIESGO = ([10, 20, 30], ['BAJO', 'MEDIO', 'ALTO'], 'CRITICO')
+
+
+# ---------------------------------------------------------------------
+# Transformaciones por bloque
+# ---------------------------------------------------------------------
+
+def normalizar_columna(nombre):
+    """Nombre de columna en minúsculas y sin espacios"""
+    return nombre.lower().replace(' ', '_')
+
+
+def _texto(serie):
+    return serie.str.strip().str.upper()
+
+
+def _conteo(serie):
+    """Conteo entero con nulos (lo que no es número queda nulo)"""
+    return pd.to_numeric(serie, errors='coerce', dtype_backend='numpy_nullable')
+
+
+def _periodo(bloque):
+    """Año (primer número de 4 cifras) y semestre (1 si dice PRIMER) del periodo"""
+    periodo = bloque['periodo']
+    bloque['periodo_año'] = periodo.str.extract(r'(\d{4})', expand=False).astype(float)
+    primer = periodo.str.contains('PRIMER', case=False).fillna(False).astype(bool)
+    bloque['periodo_semestre'] = pd.Series(np.where(primer, 1, 2), index=bloque.index, dtype='Int8').mask(periodo.isna())
+
+
+def limpiar_no_academica(bloque):
+    """Deserción no académica UPTC"""
+    for columna in bloque.columns.drop('no_estudiantes'):
+        bloque[columna] = _texto(bloque[columna])
+    bloque['no_estudiantes'] = _conteo(bloque['no_estudiantes'])
+    _periodo(bloque)
+    bloque['institucion'] = 'UPTC'
+    bloque['tipo_desercion'] = 'NO_ACADEMICA'
+    return bloque
+
+
+def limpiar_academica(bloque):
+    """Deserción académica UPTC: edad, grupos de edad y estrato"""
+    for columna in bloque.columns.drop('fecha_nacimiento'):
+        bloque[columna] = _texto(bloque[columna])
+
+    bloque['fecha_nacimiento'] = pd.to_datetime(bloque['fecha_nacimiento'], format=FORMATO_NACIMIENTO, errors='coerce')
+    dias = (FECHA_REFERENCIA - bloque['fecha_nacimiento']).dt.days
+    bloque['edad'] = np.trunc(dias / 365.25).astype('Int16')
+    bins, etiquetas = GRUPOS_EDAD
+    bloque['grupo_edad'] = pd.cut(bloque['edad'], bins=bins, labels=etiquetas)
+
+    _periodo(bloque)
+    bloque['estrato_num'] = pd.to_numeric(bloque['estrato'], errors='coerce').astype(float)
+    bins, etiquetas = GRUPOS_ESTRATO
+    bloque['grupo_estrato'] = pd.cut(bloque['estrato_num'], bins=bins, labels=etiquetas, include_lowest=True)
+
+    bloque['institucion'] = 'UPTC'
+    bloque['tipo_desercion'] = 'ACADEMICA'
+    bloque['es_desertor'] = 1  # Todos son desertores en este dataset
+    return bloque
+
+
+def nivel_riesgo(tasa):
+    """Nivel de riesgo por tasa de deserción (%); SIN_DATOS si no hay tasa"""
+    tasa = np.asarray(tasa, dtype=float)
+    limites, niveles, mayor = NIVELES_RIESGO
+    condiciones = [np.isnan(tasa)] + [tasa < limite for limite in limites]
+    return np.select(condiciones, ['SIN_DATOS'] + niveles, default=mayor)
+
+
+def limpiar_sena(bloque):
+    """Deserción SENA: fechas de ficha, tasa de deserción y nivel de riesgo"""
+    for columna in COLUMNAS_TEXTO_SENA:
+        bloque[columna] = _texto(bloque[columna].str.replace('"', '', regex=False))
+    for columna in ('fecha_inicio_ficha', 'fecha_terminacion_ficha'):
+        bloque[columna] = pd.to_datetime(bloque[columna], format=FORMATO_FICHA, errors='coerce')
+    for columna in ('total_aprendices_matriculados', 'desertores_año_actual'):
+        bloque[columna] = _conteo(bloque[columna])
+
+    tasa = bloque['desertores_año_actual'] / bloque['total_aprendices_matriculados'] * 100
+    bloque['tasa_desercion'] = tasa.round(2).astype(float)
+    bloque['nivel_riesgo'] = nivel_riesgo(bloque['tasa_desercion'])
+    bloque['periodo_año'] = bloque['fecha_inicio_ficha'].dt.year.astype('Int16')
+    bloque['institucion'] = 'SENA'
+    return bloque
+
+
+# Columnas de texto de SENA (las numéricas del archivo crudo no se tocan)
+COLUMNAS_TEXTO_SENA = [
+    'nombre_regional', 'nombre_centro', 'fecha_inicio_ficha', 'fecha_terminacion_ficha',
+    'codigo_programa', 'nombre_programa_formacion', 'nivel_formacion', 'modalidad_formacion', 'periodo',
+]
+
+# Por fuente: archivo crudo, CSV procesado, tipos de lectura (por nombre
+# normalizado; las columnas no declaradas se leen como texto) y limpieza
+FUENTES = {
+    'no_academica': {
+        'titulo': 'Deserción No Académica UPTC',
+        'archivo': 'DESERCION_NO_ACADEMICA_UPTC_20251110.csv',
+        'destino': os.path.join('processed', 'desercion_no_academica_clean.csv'),
+        'tipos': {'no_estudiantes': CONTEO},
+        'limpiar': limpiar_no_academica,
+    },
+    'academica': {
+        'titulo': 'Deserción Académica UPTC',
+        'archivo': 'DESERCION_ACADEMICA_PREGRADO_Y_POSGRADO_20251110.csv',
+        'destino': os.path.join('processed', 'desercion_academica_clean.csv'),
+        'tipos': {},
+        'limpiar': limpiar_academica,
+    },
+    'sena': {
+        'titulo': 'Deserción SENA',
+        'archivo': 'DESERCION_DE_LA_FORMACIÓN_PROFESIONAL_INTEGRAL_20251110.csv',
+        'destino': os.path.join('processed', 'desercion_sena_clean.csv'),
+        'tipos': {
+            'codigo_regional': 'Int16',
+            'codigo_centro': 'Int16',
+            'identificador_unico_ficha': 'Int64',
+            'version_programa': 'Int16',
+            'total_aprendices_matriculados': CONTEO,
+            'desertores_año_actual': CONTEO,
+        },
+        'limpiar': limpiar_sena,
+    },
+}
+
+
+# ---------------------------------------------------------------------
+# Calidad de datos
+# ---------------------------------------------------------------------
+
+class CalidadDatos:
+    """Faltantes, duplicados, tipos y completitud de un dataset, acumulados por bloques"""
+
+    def __init__(self, titulo, duplicados=True):
+        self.titulo = titulo
+        self.filas = 0
+        self.faltantes = None
+        self.tipos = None
+        self.duplicados = 0 if duplicados else None
+        self._hashes = np.empty(0, dtype=np.uint64)
+
+    def agregar(self, bloque):
+        faltantes = bloque.isna().sum()
+        self.faltantes = faltantes if self.faltantes is None else self.faltantes.add(faltantes, fill_value=0)
+        self.tipos = bloque.dtypes.astype(str).value_counts()
+        self.filas += len(bloque)
+        if self.duplicados is not None:
+            self._contar_duplicados(pd.util.hash_pandas_object(bloque, index=False).to_numpy())
+
+    def _contar_duplicados(self, hashes):
+        """Filas cuyo hash ya apareció, en este bloque o en uno anterior"""
+        distintos = np.unique(hashes)
+        posiciones = np.searchsorted(self._hashes, distintos)
+        vistos = np.zeros(len(distintos), dtype=bool)
+        en_rango = posiciones < len(self._hashes)
+        vistos[en_rango] = self._hashes[posiciones[en_rango]] == distintos[en_rango]
+        nuevos = distintos[~vistos]
+        self.duplicados += len(hashes) - len(nuevos)
+        # Inserción en las posiciones ya calculadas: el arreglo sigue ordenado sin reordenarlo
+        self._hashes = np.insert(self._hashes, posiciones[~vistos], nuevos)
+
+    @property
+    def columnas(self):
+        return 0 if self.faltantes is None else len(self.faltantes)
+
+    @property
+    def completitud(self):
+        celdas = self.filas * self.columnas
+        return 100.0 if not celdas else (1 - self.faltantes.sum() / celdas) * 100
+
+    def tabla_faltantes(self):
+        """Columnas con faltantes, de más a menos (la tabla de analizar_calidad_datos)"""
+        tabla = pd.DataFrame({
+            'Columna': self.faltantes.index,
+            'Valores Faltantes': self.faltantes.to_numpy(dtype=np.int64),
+            'Porcentaje': self.faltantes.to_numpy(dtype=float) / max(self.filas, 1) * 100,
+        })
+        return tabla[tabla['Valores Faltantes'] > 0].sort_values('Valores Faltantes', ascending=False)
+
+    def imprimir(self):
+        print("=" * 70)
+        print(f"ANÁLISIS DE CALIDAD: {self.titulo}")
+        print("=" * 70)
+        print("\n1. VALORES FALTANTES:")
+        tabla = self.tabla_faltantes()
+        print(tabla.to_string(index=False) if len(tabla) else "✓ No hay valores faltantes")
+        if self.duplicados is not None:
+            print("\n2. DUPLICADOS:")
+            print(f"Total de filas duplicadas: {self.duplicados} ({self.duplicados / max(self.filas, 1) * 100:.2f}%)")
+        print("\n3. TIPOS DE DATOS:")
+        print(self.tipos.to_string())
+        print("\n4. RESUMEN DE CALIDAD:")
+        print(f"Completitud de datos: {self.completitud:.2f}%")
+        print(f"Total de registros: {self.filas:,}")
+        print(f"Total de columnas: {self.columnas}")
+        print("\n" + "=" * 70 + "\n")
+
+
+# ---------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------
+
+def leer_bloques(ruta, tipos, bloque):
+    """Bloques de un CSV crudo con los tipos declarados y columnas normalizadas"""
+    encabezado = pd.read_csv(ruta, nrows=0).columns
+    dtype = {columna: tipos.get(normalizar_columna(columna), TEXTO) for columna in encabezado}
+    for datos in pd.read_csv(ruta, dtype=dtype, chunksize=bloque):
+        yield datos.rename(columns=normalizar_columna)
+
+
+def procesar_fuente(nombre, origen=DIR_CRUDOS, destino=DIR_DATOS, bloque=100_000):
+    """Limpia una fuente bloque a bloque; devuelve la calidad del crudo y del resultado"""
+    fuente = FUENTES[nombre]
+    ruta = os.path.join(destino, fuente['destino'])
+    temporal = ruta + '.tmp'
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+
+    cruda = CalidadDatos(fuente['titulo'])
+    limpia = CalidadDatos(fuente['titulo'], duplicados=False)
+    try:
+        primero = True
+        for datos in leer_bloques(os.path.join(origen, fuente['archivo']), fuente['tipos'], bloque):
+            cruda.agregar(datos)
+            datos = fuente['limpiar'](datos)
+            limpia.agregar(datos)
+            datos.to_csv(temporal, mode='w' if primero else 'a', header=primero, index=False)
+            primero = False
+        if primero:
+            raise ValueError(f"{fuente['archivo']} no tiene filas")
+        os.replace(temporal, ruta)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+    return cruda, limpia
+
+
+def imprimir_limpieza(cruda, limpia):
+    """Antes y después de la limpieza (reporte_limpieza del notebook)"""
+    print(f"✓ {cruda.titulo}: {limpia.filas:,} registros, "
+          f"{cruda.columnas} → {limpia.columnas} columnas, "
+          f"completitud {cruda.completitud:.2f}% → {limpia.completitud:.2f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Limpia los datasets crudos de deserción y escribe data/processed")
+    parser.add_argument('--origen', default=DIR_CRUDOS, help="Directorio con los CSV crudos")
+    parser.add_argument('--destino', default=DIR_DATOS, help="Directorio de datos (se escribe processed/)")
+    parser.add_argument('--bloque', type=int, default=100_000, help="Filas por bloque leído")
+    parser.add_argument('--fuentes', nargs='+', choices=list(FUENTES), default=list(FUENTES),
+                        help="Fuentes a procesar")
+    parser.add_argument('--sin-reporte', action='store_true', help="No imprimir el análisis de calidad")
+    args = parser.parse_args()
+
+    resultados = [procesar_fuente(nombre, args.origen, args.destino, args.bloque) for nombre in args.fuentes]
+    if not args.sin_reporte:
+        for cruda, _ in resultados:
+            cruda.imprimir()
+    for cruda, limpia in resultados:
+        imprimir_limpieza(cruda, limpia)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,291 @@
+"""
+Almacenamiento particionado por periodo
+
+Guarda las tablas procesadas y fact_desercion en un archivo Arrow IPC por
+partición (`periodo_año`, `periodo_semestre`), con un manifiesto que
+registra, por partición, su número de filas y el mínimo y máximo de cada
+columna numérica. Una consulta por rango de años consulta el manifiesto,
+descarta las particiones que no se solapan con el rango y lee solo las
+demás (con memory-map) y las devuelve en el orden del archivo plano (cada
+partición guarda la posición original de sus filas). Las filas sin periodo
+van en su propia partición.
+
+fact_desercion no tiene columnas de periodo: cada hecho va a la partición
+del periodo de su `id_tiempo` en dim_tiempo.
+
+Cada construcción de una tabla se escribe en un directorio nuevo (con la
+huella de su origen) y el manifiesto se reemplaza al final, así que un
+lector nunca ve una tabla a medio escribir. Si la tabla particionada no
+está al día con su CSV, o pyarrow no está instalado, `leer_rango` lee el
+archivo plano y filtra las filas: el resultado es el mismo.
+
+Uso (desde final_project/):
+    python -m src.data.particiones
+    python -m src.data.particiones --forzar
+"""
+
+import argparse
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from src.data.columnar import firma_archivos, leer_tabla
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow es opcional: sin él se leen los archivos planos
+    pa = None
+    feather = None
+
+DIR_PROYECTO = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+DIR_DATOS = os.path.join(DIR_PROYECTO, 'data')
+
+ARCHIVOS = {
+    'academica': os.path.join('processed', 'desercion_academica_clean.csv'),
+    'no_academica': os.path.join('processed', 'desercion_no_academica_clean.csv'),
+    'sena': os.path.join('processed', 'desercion_sena_clean.csv'),
+    'fact': os.path.join('bi', 'fact_desercion.csv'),
+    'dim_tiempo': os.path.join('bi', 'dim_tiempo.csv'),
+}
+# Tablas que se particionan (dim_tiempo solo da el periodo de cada hecho)
+TABLAS = ['academica', 'no_academica', 'sena', 'fact']
+COLUMNAS_PARTICION = ['periodo_año', 'periodo_semestre']
+DIR_PARTICIONES = 'particiones'
+MANIFIESTO = 'manifiesto.json'
+VERSION_MANIFIESTO = 1
+# Posición de cada fila en el archivo plano (no se devuelve al leer)
+COLUMNA_FILA = '_fila'
+
+
+# ---------------------------------------------------------------------
+# Manifiesto
+# ---------------------------------------------------------------------
+
+def _rutas_origen(nombre, datos):
+    """Archivos de los que depende una tabla particionada"""
+    rutas = [os.path.join(datos, ARCHIVOS[nombre])]
+    if nombre == 'fact':
+        rutas.append(os.path.join(datos, ARCHIVOS['dim_tiempo']))
+    return rutas
+
+
+def leer_manifiesto(datos=DIR_DATOS):
+    """Manifiesto de las tablas particionadas (vacío si no hay o es de otra versión)"""
+    try:
+        with open(os.path.join(datos, DIR_PARTICIONES, MANIFIESTO), encoding='utf-8') as archivo:
+            manifiesto = json.load(archivo)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return manifiesto['tablas'] if manifiesto.get('version') == VERSION_MANIFIESTO else {}
+
+
+def _guardar_manifiesto(datos, tablas):
+    ruta = os.path.join(datos, DIR_PARTICIONES, MANIFIESTO)
+    temporal = ruta + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as archivo:
+        json.dump({'version': VERSION_MANIFIESTO, 'tablas': tablas}, archivo, ensure_ascii=False, indent=1)
+    os.replace(temporal, ruta)
+
+
+def tabla_vigente(entrada, nombre, datos=DIR_DATOS):
+    """Indica si la tabla particionada corresponde a los archivos de origen actuales"""
+    if pa is None or not entrada:
+        return False
+    if entrada['origen'] != firma_archivos(_rutas_origen(nombre, datos)):
+        return False
+    directorio = os.path.join(datos, DIR_PARTICIONES, nombre, entrada['origen'])
+    return all(os.path.exists(os.path.join(directorio, p['archivo'])) for p in entrada['particiones'])
+
+
+# ---------------------------------------------------------------------
+# Construcción
+# ---------------------------------------------------------------------
+
+def periodos_hechos(hechos, datos):
+    """Año y semestre de cada hecho según el periodo de su id_tiempo"""
+    tiempo = pd.read_csv(os.path.join(datos, ARCHIVOS['dim_tiempo'])).set_index('id_tiempo')
+    return pd.DataFrame({
+        columna: hechos['id_tiempo'].map(tiempo[columna]) for columna in COLUMNAS_PARTICION
+    })
+
+
+def _valor(valor):
+    """Escalar de numpy/pandas como valor de JSON (None si es nulo)"""
+    if pd.isna(valor):
+        return None
+    valor = valor.item() if isinstance(valor, np.generic) else valor
+    return int(valor) if isinstance(valor, float) and valor.is_integer() else valor
+
+
+def estadisticas(df):
+    """Mínimo y máximo de cada columna numérica (None si la columna es toda nula)"""
+    resultado = {}
+    for columna in df.columns:
+        serie = df[columna]
+        if not pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_bool_dtype(serie):
+            continue
+        resultado[columna] = [_valor(serie.min()), _valor(serie.max())]
+    return resultado
+
+
+def nombre_particion(año, semestre):
+    """Archivo de una partición, p. ej. 2024-S1.arrow (na para un valor nulo)"""
+    def texto(valor):
+        return 'na' if pd.isna(valor) else str(int(valor))
+    return f"{texto(año)}-S{texto(semestre)}.arrow"
+
+
+def particionar_tabla(nombre, datos=DIR_DATOS):
+    """Escribe las particiones de una tabla en un directorio nuevo y retorna su entrada del manifiesto"""
+    if pa is None:
+        raise ImportError("pyarrow es necesario para generar las tablas particionadas")
+
+    rutas = _rutas_origen(nombre, datos)
+    origen = firma_archivos(rutas)
+    df = leer_tabla(rutas[0])
+    periodos = periodos_hechos(df, datos) if nombre == 'fact' else df[COLUMNAS_PARTICION]
+
+    directorio = os.path.join(datos, DIR_PARTICIONES, nombre, origen)
+    shutil.rmtree(directorio, ignore_errors=True)
+    os.makedirs(directorio)
+
+    particiones = []
+    grupos = periodos.groupby(COLUMNAS_PARTICION, dropna=False, sort=True).indices
+    for (año, semestre), posiciones in grupos.items():
+        parte = df.iloc[posiciones].reset_index(drop=True)
+        archivo = nombre_particion(año, semestre)
+        # Sin compresión para que el memory-map no tenga que descomprimir
+        feather.write_feather(
+            parte.assign(**{COLUMNA_FILA: posiciones}), os.path.join(directorio, archivo), compression='uncompressed'
+        )
+        particiones.append({
+            'archivo': archivo,
+            'periodo_año': _valor(año),
+            'periodo_semestre': _valor(semestre),
+            'filas': len(parte),
+            'estadisticas': estadisticas(parte),
+        })
+    return {
+        'origen': origen,
+        'columnas': list(df.columns),
+        'filas': len(df),
+        'particiones': particiones,
+    }
+
+
+def construir(datos=DIR_DATOS, forzar=False):
+    """Particiona las tablas cuyo archivo de origen cambió; retorna las reescritas"""
+    os.makedirs(os.path.join(datos, DIR_PARTICIONES), exist_ok=True)
+    tablas = leer_manifiesto(datos)
+    reescritas = []
+    for nombre in TABLAS:
+        if not all(map(os.path.exists, _rutas_origen(nombre, datos))):
+            tablas.pop(nombre, None)
+            continue
+        if not forzar and tabla_vigente(tablas.get(nombre), nombre, datos):
+            continue
+        tablas[nombre] = particionar_tabla(nombre, datos)
+        reescritas.append(nombre)
+    _guardar_manifiesto(datos, tablas)
+
+    # Generaciones que ya no están en el manifiesto
+    for nombre in os.listdir(os.path.join(datos, DIR_PARTICIONES)):
+        directorio = os.path.join(datos, DIR_PARTICIONES, nombre)
+        if not os.path.isdir(directorio):
+            continue
+        vigente = tablas.get(nombre, {}).get('origen')
+        for generacion in os.listdir(directorio):
+            if generacion != vigente:
+                shutil.rmtree(os.path.join(directorio, generacion), ignore_errors=True)
+    return reescritas
+
+
+# ---------------------------------------------------------------------
+# Lectura con poda de particiones
+# ---------------------------------------------------------------------
+
+def podar(particiones, desde=None, hasta=None):
+    """Particiones cuyo rango de `periodo_año` se solapa con [desde, hasta]
+
+    Sin rango se conservan todas; con rango se descartan las que no tienen
+    periodo.
+    """
+    if desde is None and hasta is None:
+        return list(particiones)
+    seleccionadas = []
+    for particion in particiones:
+        minimo, maximo = particion['estadisticas'].get('periodo_año', [particion['periodo_año']] * 2)
+        if minimo is None:
+            continue
+        if (desde is None or maximo >= desde) and (hasta is None or minimo <= hasta):
+            seleccionadas.append(particion)
+    return seleccionadas
+
+
+def _leer_particiones(directorio, particiones):
+    """Filas de las particiones indicadas (memory-map), en el orden del archivo plano"""
+    tablas = []
+    for particion in particiones:
+        with pa.memory_map(os.path.join(directorio, particion['archivo']), 'r') as fuente:
+            tablas.append(pa.ipc.open_file(fuente).read_all())
+    tabla = pa.concat_tables(tablas)
+    orden = np.argsort(tabla[COLUMNA_FILA].to_numpy())
+    return tabla.drop_columns([COLUMNA_FILA]).take(orden).to_pandas()
+
+
+def _tabla_vacia(directorio, particion):
+    """Tabla sin filas con las columnas y tipos de una partición (solo se lee el esquema)"""
+    with pa.memory_map(os.path.join(directorio, particion['archivo']), 'r') as fuente:
+        esquema = pa.ipc.open_file(fuente).schema
+    return esquema.empty_table().drop_columns([COLUMNA_FILA]).to_pandas()
+
+
+def filtrar_rango(df, nombre, desde=None, hasta=None, datos=DIR_DATOS):
+    """Filas de una tabla plana con `periodo_año` en [desde, hasta]"""
+    if desde is None and hasta is None:
+        return df
+    año = periodos_hechos(df, datos)['periodo_año'] if nombre == 'fact' else df['periodo_año']
+    año = pd.to_numeric(año, errors='coerce')
+    dentro = año.notna()
+    if desde is not None:
+        dentro &= año >= desde
+    if hasta is not None:
+        dentro &= año <= hasta
+    return df[dentro.to_numpy()].reset_index(drop=True)
+
+
+def leer_rango(nombre, desde=None, hasta=None, datos=DIR_DATOS):
+    """Filas de una tabla con `periodo_año` en [desde, hasta] (sin rango, la tabla completa)
+
+    Con la tabla particionada al día solo se leen las particiones que se
+    solapan con el rango (cada una tiene un solo año, así que no hay que
+    filtrar sus filas); si no, se lee el archivo plano y se filtra.
+    """
+    entrada = leer_manifiesto(datos).get(nombre)
+    if (desde is not None or hasta is not None) and tabla_vigente(entrada, nombre, datos) and entrada['particiones']:
+        directorio = os.path.join(datos, DIR_PARTICIONES, nombre, entrada['origen'])
+        seleccionadas = podar(entrada['particiones'], desde, hasta)
+        if not seleccionadas:
+            return _tabla_vacia(directorio, entrada['particiones'][0])
+        return _leer_particiones(directorio, seleccionadas)
+    return filtrar_rango(leer_tabla(os.path.join(datos, ARCHIVOS[nombre])), nombre, desde, hasta, datos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Particiona las tablas procesadas y fact_desercion por periodo")
+    parser.add_argument('--datos', default=DIR_DATOS, help="Directorio de datos (lee processed/ y bi/)")
+    parser.add_argument('--forzar', action='store_true', help="Reescribe aunque la tabla esté al día")
+    args = parser.parse_args()
+
+    reescritas = construir(args.datos, args.forzar)
+    for nombre, entrada in leer_manifiesto(args.datos).items():
+        marca = '✓' if nombre in reescritas else '='
+        print(f"{marca} {nombre}: {entrada['filas']:,} filas en {len(entrada['particiones'])} particiones")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Esquema de los datasets procesados
+
+Declara, por dataset, el tipo compacto de cada columna: categóricas con
+un diccionario de categorías compartido entre fuentes (para que la
+concatenación conserve el tipo y los filtros trabajen sobre códigos
+enteros) y enteros pequeños con soporte de nulos para edades, periodos
+e indicadores.
+"""
+
+import hashlib
+import json
+
+import pandas as pd
+
+CATEGORIA = 'category'
+
+# Tipo de cada columna por dataset; las columnas no declaradas se dejan como vienen
+ESQUEMAS = {
+    'academica': {
+        'periodo': CATEGORIA,
+        'nombre_facultad': CATEGORIA,
+        'nombre_programa': CATEGORIA,
+        'jornada': CATEGORIA,
+        'modalidad': CATEGORIA,
+        'nombre_sede': CATEGORIA,
+        'tipo_iden_est': CATEGORIA,
+        'genero': CATEGORIA,
+        'estrato': CATEGORIA,
+        'nombre_estado': CATEGORIA,
+        'origen_geografico': CATEGORIA,
+        'lugar_expedicion': CATEGORIA,
+        'grupo_edad': CATEGORIA,
+        'grupo_estrato': CATEGORIA,
+        'institucion': CATEGORIA,
+        'tipo_desercion': CATEGORIA,
+        'edad': 'Int8',
+        'periodo_año': 'Int16',
+        'periodo_semestre': 'Int8',
+        'estrato_num': 'Int8',
+        'es_desertor': 'Int8',
+    },
+    'no_academica': {
+        'periodo': CATEGORIA,
+        'nombre_facultad': CATEGORIA,
+        'nombre_programa': CATEGORIA,
+        'nivel_académico': CATEGORIA,
+        'jornada': CATEGORIA,
+        'modalidad': CATEGORIA,
+        'institucion': CATEGORIA,
+        'tipo_desercion': CATEGORIA,
+        'no_estudiantes': 'Int32',
+        'periodo_año': 'Int16',
+        'periodo_semestre': 'Int8',
+    },
+    'sena': {
+        'nombre_regional': CATEGORIA,
+        'nombre_centro': CATEGORIA,
+        'codigo_programa': CATEGORIA,
+        'nombre_programa_formacion': CATEGORIA,
+        'nivel_formacion': CATEGORIA,
+        'modalidad_formacion': CATEGORIA,
+        'periodo': CATEGORIA,
+        'nivel_riesgo': CATEGORIA,
+        'institucion': CATEGORIA,
+        'genero': CATEGORIA,
+        'modalidad': CATEGORIA,
+        'jornada': CATEGORIA,
+        'nombre_facultad': CATEGORIA,
+        'estrato': CATEGORIA,
+        'total_aprendices_matriculados': 'Int32',
+        'desertores_año_actual': 'Int32',
+        'periodo_año': 'Int16',
+        'periodo_semestre': 'Int8',
+        'estrato_num': 'Int8',
+    },
+}
+
+# Etiqueta de cada fuente en la columna dataset_origen de los combinados
+ORIGENES = {
+    'academica': 'Académica',
+    'no_academica': 'No Académica UPTC',
+    'sena': 'SENA',
+}
+TIPO_ORIGEN = pd.CategoricalDtype(list(ORIGENES.values()))
+
+
+def construir_diccionarios(fuentes):
+    """Une las categorías de todas las fuentes en un CategoricalDtype por columna"""
+    valores = {}
+    for nombre, df in fuentes.items():
+        for col, tipo in ESQUEMAS.get(nombre, {}).items():
+            if tipo == CATEGORIA and col in df.columns:
+                serie = df[col]
+                unicos = serie.cat.categories if isinstance(serie.dtype, pd.CategoricalDtype) else serie.dropna().unique()
+                valores.setdefault(col, set()).update(str(v) for v in unicos)
+    return {col: pd.CategoricalDtype(sorted(v)) for col, v in valores.items()}
+
+
+def firma_diccionarios(diccionarios):
+    """Huella de las categorías de cada columna: si cambia, cambian los códigos de todas las fuentes"""
+    categorias = {col: [str(c) for c in tipo.categories] for col, tipo in sorted(diccionarios.items())}
+    return hashlib.sha1(json.dumps(categorias, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+
+def aplicar_esquema(df, nombre, diccionarios):
+    """Convierte un dataset a los tipos declarados y precalcula estrato_num"""
+    esquema = ESQUEMAS.get(nombre, {})
+    df = df.copy()
+
+    if 'estrato' in df.columns and 'estrato_num' not in df.columns:
+        df['estrato_num'] = pd.to_numeric(df['estrato'], errors='coerce')
+
+    for col, tipo in esquema.items():
+        if col not in df.columns:
+            continue
+        if tipo == CATEGORIA:
+            serie = df[col]
+            if pd.api.types.is_numeric_dtype(serie):
+                serie = serie.where(serie.isna(), serie.astype(str))
+            df[col] = serie.astype(diccionarios[col])
+        else:
+            # Los CSV traen enteros como float (2020.0): se redondean antes de reducir el tipo
+            df[col] = pd.to_numeric(df[col], errors='coerce').round().astype(tipo)
+
+    return df
+
+
+def aplicar_esquemas(fuentes):
+    """Aplica el esquema a todas las fuentes con diccionarios compartidos"""
+    diccionarios = construir_diccionarios(fuentes)
+    return {nombre: aplicar_esquema(df, nombre, diccionarios) for nombre, df in fuentes.items()}
+
+
+def alinear_columnas(dfs):
+    """Completa las columnas ausentes con nulos del mismo tipo para que pd.concat no las convierta a object"""
+    tipos = {}
+    for df in dfs:
+        for col, tipo in df.dtypes.items():
+            tipos.setdefault(col, tipo)
+
+    alineados = []
+    for df in dfs:
+        faltantes = [col for col in tipos if col not in df.columns]
+        if faltantes:
+            df = df.assign(**{col: pd.Series(index=df.index, dtype=tipos[col]) for col in faltantes})
+        alineados.append(df)
+    return alineados
@@ -0,0 +1,205 @@
+"""
+Segmentos de memoria compartida para los datasets
+
+Publica las columnas de un grupo de tablas como arreglos binarios en un
+directorio de generación (por defecto en /dev/shm) y las adjunta como
+DataFrames cuyas columnas son vistas memory-map de solo lectura. Todos
+los workers que adjuntan la misma generación comparten las mismas
+páginas físicas: la memoria por worker no crece con el tamaño de los
+datos, aunque el conteo de referencias o el GC de pandas toquen los
+objetos de Python.
+
+Cada columna se guarda según su tipo:
+    categórica          -> códigos enteros + categorías en el manifiesto
+    entero con nulos    -> valores + máscara
+    numérica / fecha    -> valores
+    texto (object)      -> se guarda como categórica
+
+Una generación se identifica por la huella de sus archivos de origen; al
+publicar una nueva se retiran las anteriores (los workers que aún las
+usan conservan su mapeo hasta soltarlo). Publicar y retirar toman un
+`flock` exclusivo sobre el directorio y comprobar y adjuntar uno
+compartido: un worker que publica no borra una generación que otro está
+adjuntando a medias.
+"""
+
+import contextlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # fcntl solo existe en POSIX: sin él no hay bloqueo entre procesos
+    fcntl = None
+
+MANIFIESTO = 'manifiesto.json'
+BLOQUEO = '.bloqueo'
+
+
+def _partes_columna(serie):
+    """Descripción de la columna y arreglos a guardar"""
+    dtype = serie.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return (
+            {'tipo': 'categoria', 'categorias': [_valor_json(c) for c in dtype.categories], 'ordenada': bool(dtype.ordered)},
+            {'codigos': serie.cat.codes.to_numpy()},
+        )
+    # Enteros, flotantes y booleanos con nulos (Int8, Int16, ...) guardan valores y máscara
+    if pd.api.types.is_extension_array_dtype(dtype) and hasattr(serie.array, '_data') and hasattr(serie.array, '_mask'):
+        return (
+            {'tipo': 'enmascarada', 'dtype': str(dtype)},
+            {'valores': serie.array._data, 'mascara': serie.array._mask},
+        )
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biufmM':
+        return {'tipo': 'numpy'}, {'valores': serie.to_numpy()}
+
+    # Texto u otros objetos: se guardan como categoría
+    return _partes_columna(serie.astype('category'))
+
+
+def _valor_json(valor):
+    return valor.item() if isinstance(valor, np.generic) else valor
+
+
+def _escribir_arreglo(ruta, arreglo):
+    arreglo = np.ascontiguousarray(arreglo)
+    with open(ruta, 'wb') as archivo:
+        archivo.write(arreglo.tobytes())
+    return {'dtype': arreglo.dtype.str, 'n': int(arreglo.shape[0])}
+
+
+def _mapear(ruta, descripcion):
+    """Vista de solo lectura del arreglo guardado (sin copiar)"""
+    dtype = np.dtype(descripcion['dtype'])
+    if descripcion['n'] == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(ruta, dtype=dtype, mode='r', shape=(descripcion['n'],)).view(np.ndarray)
+
+
+def _columna(meta, arreglos):
+    if meta['tipo'] == 'categoria':
+        tipo = pd.CategoricalDtype(meta['categorias'], ordered=meta['ordenada'])
+        return pd.Categorical.from_codes(arreglos['codigos'], dtype=tipo, validate=False)
+    if meta['tipo'] == 'enmascarada':
+        clase = pd.api.types.pandas_dtype(meta['dtype']).construct_array_type()
+        return clase(arreglos['valores'], arreglos['mascara'], copy=False)
+    return arreglos['valores']
+
+
+class AlmacenSegmentos:
+    """Generaciones de tablas compartidas en un directorio (tmpfs en /dev/shm)"""
+
+    def __init__(self, directorio, conservar=2):
+        self.directorio = directorio
+        # Generaciones que se conservan por grupo (la vigente y la anterior)
+        self.conservar = conservar
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta(self, generacion):
+        return os.path.join(self.directorio, generacion)
+
+    def existe(self, generacion):
+        return os.path.exists(os.path.join(self._ruta(generacion), MANIFIESTO))
+
+    @contextlib.contextmanager
+    def bloqueo(self, exclusivo=False):
+        """flock sobre el directorio: exclusivo para publicar y retirar, compartido para adjuntar"""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.directorio, BLOQUEO), 'a') as archivo:
+            fcntl.flock(archivo, fcntl.LOCK_EX if exclusivo else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(archivo, fcntl.LOCK_UN)
+
+    def publicar(self, generacion, tablas):
+        """Escribe las tablas en un directorio temporal y lo publica con un rename atómico
+
+        Las tablas se escriben sin el bloqueo; solo el rename lo toma.
+        """
+        if self.existe(generacion):
+            return
+        temporal = tempfile.mkdtemp(prefix=f".{generacion}-", dir=self.directorio)
+        manifiesto = {}
+        try:
+            for nombre, df in tablas.items():
+                columnas = []
+                for i, col in enumerate(df.columns):
+                    meta, partes = _partes_columna(df[col])
+                    meta['nombre'] = col
+                    meta['partes'] = {
+                        parte: _escribir_arreglo(os.path.join(temporal, f"{nombre}.{i}.{parte}"), arreglo)
+                        for parte, arreglo in partes.items()
+                    }
+                    columnas.append(meta)
+                manifiesto[nombre] = {'filas': len(df), 'columnas': columnas}
+
+            with open(os.path.join(temporal, MANIFIESTO), 'w', encoding='utf-8') as archivo:
+                json.dump(manifiesto, archivo, ensure_ascii=False)
+            with self.bloqueo(exclusivo=True):
+                os.rename(temporal, self._ruta(generacion))
+        except OSError:
+            # Otro worker publicó la misma generación primero
+            shutil.rmtree(temporal, ignore_errors=True)
+            if not self.existe(generacion):
+                raise
+
+    def adjuntar(self, generacion):
+        """DataFrames con columnas memory-map de la generación"""
+        ruta = self._ruta(generacion)
+        with open(os.path.join(ruta, MANIFIESTO), encoding='utf-8') as archivo:
+            manifiesto = json.load(archivo)
+
+        tablas = {}
+        for nombre, tabla in manifiesto.items():
+            datos = {}
+            for i, meta in enumerate(tabla['columnas']):
+                arreglos = {
+                    parte: _mapear(os.path.join(ruta, f"{nombre}.{i}.{parte}"), descripcion)
+                    for parte, descripcion in meta['partes'].items()
+                }
+                datos[meta['nombre']] = _columna(meta, arreglos)
+            tablas[nombre] = pd.DataFrame(datos, index=pd.RangeIndex(tabla['filas']), copy=False)
+        return tablas
+
+    def retirar(self, prefijo, vigente):
+        """Borra las generaciones antiguas de un grupo; los mapeos abiertos siguen siendo válidos
+
+        Espera a que ningún proceso esté adjuntando una generación.
+        """
+        with self.bloqueo(exclusivo=True):
+            generaciones = [
+                nombre for nombre in os.listdir(self.directorio)
+                if nombre.startswith(prefijo + '-') and nombre != vigente and self.existe(nombre)
+            ]
+            generaciones.sort(key=lambda g: os.path.getmtime(self._ruta(g)), reverse=True)
+            for generacion in generaciones[self.conservar - 1:]:
+                shutil.rmtree(self._ruta(generacion), ignore_errors=True)
+
+    def obtener(self, prefijo, firma, construir):
+        """Adjunta la generación de un grupo; si no existe la construye, la publica y retira las anteriores"""
+        generacion = f"{prefijo}-{firma}"
+        # Comprobar y adjuntar con el bloqueo compartido: nadie la retira en medio
+        with self.bloqueo():
+            if self.existe(generacion):
+                return self.adjuntar(generacion)
+        self.publicar(generacion, construir())
+        self.retirar(prefijo, generacion)
+        with self.bloqueo():
+            if self.existe(generacion):
+                return self.adjuntar(generacion)
+        # Otro proceso ya publicó dos generaciones más nuevas y retiró esta
+        return self.obtener(prefijo, firma, construir)
+
+
+def directorio_por_defecto():
+    """/dev/shm (memoria compartida) si existe; si no, el directorio temporal"""
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(base, 'dashboard_desercion_segmentos')
@@ -0,0 +1,315 @@
+"""
+Generador de datos sintéticos con el esquema de data/processed y data/bi
+
+Aprende de los archivos reales la distribución marginal de cada columna y
+las distribuciones condicionales por pares, organizadas en un árbol de
+Chow-Liu (cada columna depende de la columna con la que comparte más
+información mutua). Las columnas con muchos valores distintos (fechas,
+municipios, programas) solo pueden ser hojas del árbol, para no copiar
+filas reales.
+
+Los registros académicos se aprenden junto con sus filas de
+dim_estudiante y fact_desercion (están alineados fila a fila), de modo
+que los tres archivos generados son consistentes: cada registro
+sintético tiene su estudiante y su hecho con el mismo id. dim_tiempo se
+copia; dim_programa y dim_institucion parten de las de origen y agregan las
+claves naturales nuevas de los registros generados (ver src.data.estrella),
+y kpis_principales se recalcula.
+SENA solo se genera si su archivo procesado existe.
+
+Los archivos se escriben por bloques (memoria acotada) y cada columna usa
+su propio generador aleatorio derivado de la semilla: el resultado es el
+mismo para la misma semilla con cualquier tamaño de bloque.
+
+Uso (desde final_project/):
+    python -m src.data.sintetico --destino data_sintetica --escala 100
+    python -m src.data.sintetico --destino data_sintetica --filas-academica 2000000 --semilla 7
+"""
+
+import argparse
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from src.data.estrella import COLUMNAS_HECHOS, Dimension, instituciones, programas
+
+DIR_PROYECTO = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+DIR_DATOS = os.path.join(DIR_PROYECTO, 'data')
+
+ARCHIVOS = {
+    'academica': os.path.join('processed', 'desercion_academica_clean.csv'),
+    'no_academica': os.path.join('processed', 'desercion_no_academica_clean.csv'),
+    'sena': os.path.join('processed', 'desercion_sena_clean.csv'),
+    'dim_estudiante': os.path.join('bi', 'dim_estudiante.csv'),
+    'fact': os.path.join('bi', 'fact_desercion.csv'),
+    'dim_tiempo': os.path.join('bi', 'dim_tiempo.csv'),
+    'kpis': os.path.join('bi', 'kpis_principales.csv'),
+}
+# Dimensiones de referencia: se copian sin cambios
+DIMENSIONES_COPIADAS = ['dim_tiempo.csv']
+NIVELES_ALTO_RIESGO = ('ALTO', 'CRITICO', 'CRÍTICO')
+
+
+# ---------------------------------------------------------------------
+# Modelo de una tabla
+# ---------------------------------------------------------------------
+
+def informacion_mutua(a, b, ka, kb):
+    """Información mutua (nats) entre dos columnas codificadas"""
+    conjunta = np.bincount(a * kb + b, minlength=ka * kb).reshape(ka, kb) / len(a)
+    pa = conjunta.sum(axis=1, keepdims=True)
+    pb = conjunta.sum(axis=0, keepdims=True)
+    con_masa = conjunta > 0
+    return float((conjunta[con_masa] * np.log(conjunta[con_masa] / (pa @ pb)[con_masa])).sum())
+
+
+def _acumulada(conteos):
+    """Probabilidad acumulada por fila (la última columna exactamente 1)"""
+    acumulada = np.cumsum(conteos / conteos.sum(axis=-1, keepdims=True), axis=-1)
+    acumulada[..., -1] = 1.0
+    return acumulada
+
+
+class ModeloTabla:
+    """Distribuciones marginal y condicionales de las columnas de una tabla, en árbol de Chow-Liu"""
+
+    def __init__(self, columnas, valores, orden, padres, acumuladas):
+        self.columnas = columnas        # orden original de las columnas
+        self.valores = valores          # columna -> valores distintos (con nulos), en su tipo original
+        self.orden = orden              # orden de muestreo: cada padre antes que sus hijos
+        self.padres = padres            # columna -> columna padre (None en la raíz)
+        self.acumuladas = acumuladas    # columna -> acumulada marginal (K,) o condicional (P, K)
+        # Condicionales en un solo vector ordenado: la fila p ocupa (p, p + 1]
+        self._planos = {
+            col: (acumulada + np.arange(acumulada.shape[0])[:, None]).ravel()
+            for col, acumulada in acumuladas.items() if acumulada.ndim == 2
+        }
+
+    @classmethod
+    def aprender(cls, df):
+        """Ajusta el árbol y las distribuciones a las filas de `df`"""
+        n = len(df)
+        codigos, valores = {}, {}
+        for col in df.columns:
+            codigos[col], valores[col] = pd.factorize(df[col], use_na_sentinel=False)
+        k = {col: len(valores[col]) for col in df.columns}
+
+        # Solo las columnas de baja cardinalidad pueden ser padres
+        limite = max(np.sqrt(n), 2)
+        internas = [col for col in df.columns if k[col] <= limite]
+        hojas = [col for col in df.columns if k[col] > limite]
+
+        mi = {}
+        def peso(a, b):
+            if (a, b) not in mi:
+                mi[a, b] = mi[b, a] = informacion_mutua(codigos[a], codigos[b], k[a], k[b])
+            return mi[a, b]
+
+        # Árbol de expansión máximo (Prim) sobre las columnas internas
+        padres, orden = {}, []
+        if internas:
+            raiz = max(internas, key=lambda c: sum(peso(c, o) for o in internas if o != c))
+            padres[raiz] = None
+            orden.append(raiz)
+            pendientes = set(internas) - {raiz}
+            while pendientes:
+                padre, hijo = max(
+                    ((p, h) for p in orden for h in pendientes),
+                    key=lambda par: peso(*par)
+                )
+                padres[hijo] = padre
+                orden.append(hijo)
+                pendientes.remove(hijo)
+        for hoja in hojas:
+            padres[hoja] = max(internas, key=lambda p: peso(p, hoja)) if internas else None
+            orden.append(hoja)
+
+        acumuladas = {}
+        for col in orden:
+            padre = padres[col]
+            if padre is None:
+                acumuladas[col] = _acumulada(np.bincount(codigos[col], minlength=k[col]).astype(float))
+            else:
+                conteos = np.bincount(
+                    codigos[padre] * k[col] + codigos[col], minlength=k[padre] * k[col]
+                ).reshape(k[padre], k[col]).astype(float)
+                acumuladas[col] = _acumulada(conteos)
+
+        return cls(list(df.columns), valores, orden, padres, acumuladas)
+
+    def generadores(self, semilla):
+        """Un generador por columna (muestras independientes del tamaño de bloque)"""
+        if not isinstance(semilla, np.random.SeedSequence):
+            semilla = np.random.SeedSequence(semilla)
+        hijos = semilla.spawn(len(self.columnas))
+        return {col: np.random.default_rng(s) for col, s in zip(self.columnas, hijos)}
+
+    def muestrear(self, n, generadores):
+        """Bloque de `n` filas sintéticas"""
+        codigos = {}
+        for col in self.orden:
+            u = generadores[col].random(n)
+            acumulada = self.acumuladas[col]
+            padre = self.padres[col]
+            if padre is None:
+                codigos[col] = np.searchsorted(acumulada, u, side='right')
+            else:
+                p = codigos[padre]
+                codigos[col] = np.searchsorted(self._planos[col], p + u, side='right') - p * acumulada.shape[1]
+            codigos[col] = np.minimum(codigos[col], len(self.valores[col]) - 1)
+
+        return pd.DataFrame({col: self.valores[col].take(codigos[col]) for col in self.columnas})
+
+
+# ---------------------------------------------------------------------
+# Generación de los archivos
+# ---------------------------------------------------------------------
+
+class EscritorCSV:
+    """Escribe un CSV por bloques (encabezado solo en el primero)"""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.filas = 0
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        if os.path.exists(ruta):
+            os.remove(ruta)
+
+    def escribir(self, df):
+        df.to_csv(self.ruta, mode='a', header=self.filas == 0, index=False)
+        self.filas += len(df)
+
+
+def _bloques(total, bloque):
+    inicio = 0
+    while inicio < total:
+        yield inicio, min(bloque, total - inicio)
+        inicio += bloque
+
+
+def entrenamiento_academica(origen):
+    """Registros académicos con las columnas de su estudiante y su hecho (alineados fila a fila)"""
+    academica = pd.read_csv(os.path.join(origen, ARCHIVOS['academica']))
+    estudiante = pd.read_csv(os.path.join(origen, ARCHIVOS['dim_estudiante']))
+    hechos = pd.read_csv(os.path.join(origen, ARCHIVOS['fact']))
+    if not len(academica) == len(estudiante) == len(hechos):
+        raise ValueError("dim_estudiante y fact_desercion deben tener una fila por registro académico")
+
+    extra = [
+        df[[c for c in df.columns if c not in academica.columns and not c.startswith('id_')]]
+        for df in (estudiante, hechos)
+    ]
+    return pd.concat([academica, *extra], axis=1), list(academica.columns), list(estudiante.columns), list(hechos.columns)
+
+
+def generar_academica(origen, destino, filas, semilla, bloque):
+    """Registros académicos, dim_estudiante, fact_desercion y kpis_principales consistentes"""
+    entrenamiento, cols_academica, cols_estudiante, _ = entrenamiento_academica(origen)
+    modelo = ModeloTabla.aprender(entrenamiento)
+    generadores = modelo.generadores(semilla)
+    tiempo = pd.read_csv(os.path.join(origen, ARCHIVOS['dim_tiempo']))
+    id_tiempo = dict(zip(tiempo['periodo'], tiempo['id_tiempo']))
+    programa = Dimension.leer('dim_programa', origen)
+    institucion = Dimension.leer('dim_institucion', origen)
+
+    escritores = {
+        nombre: EscritorCSV(os.path.join(destino, ARCHIVOS[nombre]))
+        for nombre in ('academica', 'dim_estudiante', 'fact')
+    }
+    total_desertores = suma_score = alto_riesgo = 0.0
+    for inicio, n in _bloques(filas, bloque):
+        muestra = modelo.muestrear(n, generadores)
+        ids = np.arange(inicio + 1, inicio + n + 1)
+        muestra['id_estudiante'] = ids
+        muestra['id_hecho'] = ids
+        muestra['id_tiempo'] = muestra['periodo'].map(id_tiempo)
+        muestra['id_programa'] = programa.resolver(programas(muestra, 'academica'))
+        muestra['id_institucion'] = institucion.resolver(instituciones(muestra, 'academica'))
+
+        escritores['academica'].escribir(muestra[cols_academica])
+        escritores['dim_estudiante'].escribir(muestra[cols_estudiante])
+        escritores['fact'].escribir(muestra[COLUMNAS_HECHOS])
+
+        total_desertores += muestra['cantidad_desertores'].sum()
+        suma_score += muestra['score_riesgo'].sum()
+        alto_riesgo += muestra['nivel_riesgo'].isin(NIVELES_ALTO_RIESGO).sum()
+
+    kpis = pd.DataFrame({
+        'KPI': ['Total Desertores', 'Score Promedio Riesgo', '% Alto Riesgo', 'Estudiantes Alto Riesgo'],
+        'Valor': [
+            float(total_desertores),
+            round(suma_score / filas, 2) if filas else 0.0,
+            round(100 * alto_riesgo / filas, 2) if filas else 0.0,
+            float(alto_riesgo),
+        ],
+    })
+    kpis.to_csv(os.path.join(destino, ARCHIVOS['kpis']), index=False)
+    programa.guardar(destino)
+    institucion.guardar(destino)
+    return {nombre: escritor.filas for nombre, escritor in escritores.items()}
+
+
+def generar_tabla(origen, destino, nombre, filas, semilla, bloque):
+    """Una tabla independiente (no académica, SENA) aprendida de su archivo"""
+    modelo = ModeloTabla.aprender(pd.read_csv(os.path.join(origen, ARCHIVOS[nombre])))
+    generadores = modelo.generadores(semilla)
+    escritor = EscritorCSV(os.path.join(destino, ARCHIVOS[nombre]))
+    for _, n in _bloques(filas, bloque):
+        escritor.escribir(modelo.muestrear(n, generadores))
+    return {nombre: escritor.filas}
+
+
+def filas_origen(origen, nombre):
+    """Filas de un archivo de origen (sin cargarlo completo)"""
+    with open(os.path.join(origen, ARCHIVOS[nombre]), encoding='utf-8') as archivo:
+        return sum(1 for _ in archivo) - 1
+
+
+def generar_datos(destino, escala=10.0, filas=None, semilla=0, bloque=100_000, origen=DIR_DATOS):
+    """Genera processed/ y bi/ en `destino`; `filas` fija el tamaño de una tabla en lugar de la escala"""
+    filas = filas or {}
+    semillas = dict(zip(['academica', 'no_academica', 'sena'], np.random.SeedSequence(semilla).spawn(3)))
+
+    def tamano(nombre):
+        return filas.get(nombre) or int(round(filas_origen(origen, nombre) * escala))
+
+    generadas = generar_academica(origen, destino, tamano('academica'), semillas['academica'], bloque)
+    generadas.update(generar_tabla(
+        origen, destino, 'no_academica', tamano('no_academica'), semillas['no_academica'], bloque
+    ))
+    if os.path.exists(os.path.join(origen, ARCHIVOS['sena'])):
+        generadas.update(generar_tabla(origen, destino, 'sena', tamano('sena'), semillas['sena'], bloque))
+
+    for nombre in DIMENSIONES_COPIADAS:
+        ruta = os.path.join(origen, 'bi', nombre)
+        if os.path.exists(ruta):
+            shutil.copyfile(ruta, os.path.join(destino, 'bi', nombre))
+    return generadas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos con el esquema de data/processed y data/bi")
+    parser.add_argument('--destino', required=True, help="Directorio de salida (se crean processed/ y bi/)")
+    parser.add_argument('--escala', type=float, default=10.0, help="Multiplicador de las filas de cada tabla")
+    parser.add_argument('--filas-academica', type=int, help="Filas académicas (en lugar de la escala)")
+    parser.add_argument('--filas-no-academica', type=int, help="Filas no académicas (en lugar de la escala)")
+    parser.add_argument('--filas-sena', type=int, help="Filas SENA (en lugar de la escala)")
+    parser.add_argument('--semilla', type=int, default=0, help="Semilla: misma semilla, mismos archivos")
+    parser.add_argument('--bloque', type=int, default=100_000, help="Filas por bloque escrito")
+    parser.add_argument('--origen', default=DIR_DATOS, help="Directorio de datos reales del que se aprende")
+    args = parser.parse_args()
+
+    filas = {
+        'academica': args.filas_academica,
+        'no_academica': args.filas_no_academica,
+        'sena': args.filas_sena,
+    }
+    generadas = generar_datos(args.destino, args.escala, filas, args.semilla, args.bloque, args.origen)
+    for nombre, n in generadas.items():
+        print(f"✓ {ARCHIVOS[nombre]}: {n:,} filas")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+Predicción de riesgo de deserción
+
+Construye la matriz de features en el orden exacto de
+src/models/features.csv con operaciones vectorizadas sobre columnas,
+aplica el scaler y llama a predict_proba del modelo entrenado en
+notebooks/05_ML_Model.ipynb. Un estudiante (dict) o una cohorte completa
+(DataFrame) pasan por el mismo código: puntuar miles de registros es una
+sola llamada al modelo.
+
+Si el modelo no está entrenado se usa el score heurístico del dashboard,
+también vectorizado.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+DIR_MODELOS = os.path.dirname(os.path.abspath(__file__))
+ARCHIVO_MODELO = 'modelo_desercion.pkl'
+ARCHIVO_SCALER = 'scaler.pkl'
+ARCHIVO_FEATURES = 'features.csv'
+
+# Variables categóricas codificadas con one-hot (prefijo_valor) en el entrenamiento
+CATEGORICAS = ['genero', 'modalidad', 'jornada']
+MODALIDADES_DISTANCIA = ['VIRTUAL', 'DISTANCIA']
+
+# Umbrales de probabilidad de cada nivel de riesgo
+UMBRALES_NIVEL = [0.3, 0.5, 0.7]
+NIVELES = ['BAJO', 'MEDIO', 'ALTO', 'CRÍTICO']
+
+
+def leer_features(directorio=DIR_MODELOS):
+    """Columnas del modelo en el orden del entrenamiento"""
+    return pd.read_csv(os.path.join(directorio, ARCHIVO_FEATURES))['features'].tolist()
+
+
+def a_dataframe(estudiantes):
+    """Acepta un dict (un estudiante), una lista de dicts o un DataFrame"""
+    if isinstance(estudiantes, pd.DataFrame):
+        return estudiantes
+    if isinstance(estudiantes, dict):
+        return pd.DataFrame([estudiantes])
+    return pd.DataFrame(list(estudiantes))
+
+
+def clasificar_nivel(probabilidades):
+    """Nivel de riesgo de cada probabilidad"""
+    indices = np.searchsorted(UMBRALES_NIVEL, np.asarray(probabilidades, dtype=float), side='right')
+    return np.asarray(NIVELES, dtype=object)[indices]
+
+
+def _columna(df, *nombres):
+    """Primera columna existente entre los nombres dados (nulos si no hay ninguna)"""
+    for nombre in nombres:
+        if nombre in df.columns:
+            return df[nombre]
+    return pd.Series(np.nan, index=df.index)
+
+
+def score_heuristico(df):
+    """Score por reglas del dashboard (0-1), para cuando no hay modelo entrenado"""
+    edad = pd.to_numeric(_columna(df, 'edad'), errors='coerce')
+    estrato = pd.to_numeric(_columna(df, 'estrato_num', 'estrato'), errors='coerce')
+    score = (
+        30 * (estrato <= 2).astype(int)
+        + 25 * _columna(df, 'modalidad').isin(MODALIDADES_DISTANCIA).astype(int)
+        + 20 * ((edad < 18) | (edad > 30)).astype(int)
+        + 15 * (_columna(df, 'jornada') == 'NOCTURNA').astype(int)
+        + 5 * (_columna(df, 'genero') == 'M').astype(int)
+    )
+    return np.minimum(score.to_numpy(dtype=float), 100) / 100
+
+
+class PredictorDesercion:
+    """Modelo, scaler y orden de features de la predicción de riesgo"""
+
+    def __init__(self, modelo=None, scaler=None, features=None):
+        self.modelo = modelo
+        self.scaler = scaler
+        self.features = list(features or [])
+        # Valor neutro (media del entrenamiento) de las columnas numéricas que no llegan
+        medias = getattr(scaler, 'mean_', None)
+        self._medias = dict(zip(self.features, medias)) if medias is not None and len(medias) == len(self.features) else {}
+
+    @property
+    def usa_modelo(self):
+        return self.modelo is not None and bool(self.features)
+
+    def construir_features(self, estudiantes):
+        """Matriz de features (DataFrame) en el orden de features.csv"""
+        df = a_dataframe(estudiantes)
+        n = len(df)
+
+        def numerica(*nombres):
+            return pd.to_numeric(_columna(df, *nombres), errors='coerce').to_numpy(dtype=float)
+
+        # Texto normalizado de las categóricas, como en el ETL
+        texto = {
+            col: df[col].astype('string').str.strip().str.upper()
+            for col in CATEGORICAS if col in df.columns
+        }
+
+        edad = numerica('edad')
+        # El entrenamiento rellena el estrato faltante antes de derivar estrato_bajo
+        estrato = numerica('estrato_num', 'estrato')
+        estrato = np.where(np.isnan(estrato), self._medias.get('estrato_num', np.nan), estrato)
+        columnas = {
+            'edad': edad,
+            'estrato_num': estrato,
+            'periodo_año': numerica('periodo_año'),
+            'periodo_semestre': numerica('periodo_semestre'),
+            'edad_fuera_rango': ((edad < 18) | (edad > 30)).astype(float),
+            'estrato_bajo': (estrato <= 2).astype(float),
+        }
+        if 'modalidad' in texto:
+            columnas['es_virtual'] = texto['modalidad'].isin(MODALIDADES_DISTANCIA).to_numpy(dtype=float)
+
+        # One-hot: una comparación vectorizada por columna dummy
+        for feature in self.features:
+            prefijo, _, valor = feature.partition('_')
+            if feature not in columnas and prefijo in texto:
+                columnas[feature] = (texto[prefijo] == valor).fillna(False).to_numpy(dtype=float)
+
+        matriz = np.empty((n, len(self.features)), dtype=float)
+        for j, feature in enumerate(self.features):
+            valores = columnas.get(feature)
+            if valores is None:
+                valores = np.full(n, np.nan)
+            # Como en el entrenamiento, los nulos se rellenan; si hay scaler, con la media (valor escalado 0)
+            matriz[:, j] = np.where(np.isnan(valores), self._medias.get(feature, 0.0), valores)
+
+        return pd.DataFrame(matriz, columns=self.features, index=df.index)
+
+    def predecir_proba(self, estudiantes):
+        """Probabilidad de deserción de cada estudiante"""
+        df = a_dataframe(estudiantes)
+        if not self.usa_modelo:
+            return score_heuristico(df)
+
+        X = self.construir_features(df)
+        if self.scaler is not None:
+            X = self.scaler.transform(X)
+        return self.modelo.predict_proba(X)[:, 1]
+
+    def predecir(self, estudiantes):
+        """Probabilidad y nivel de riesgo, alineados con el índice de la entrada"""
+        df = a_dataframe(estudiantes)
+        probabilidad = self.predecir_proba(df)
+        return pd.DataFrame({
+            'probabilidad': probabilidad,
+            'nivel_riesgo': clasificar_nivel(probabilidad),
+        }, index=df.index)
+
+
+def cargar_pickle(ruta):
+    """Objeto serializado con joblib (se importa aquí: solo hace falta si hay modelo entrenado)"""
+    import joblib
+    return joblib.load(ruta)
+
+
+def cargar_predictor(directorio=DIR_MODELOS):
+    """Carga modelo, scaler y features; sin modelo entrenado retorna el predictor heurístico"""
+    ruta_modelo = os.path.join(directorio, ARCHIVO_MODELO)
+    ruta_features = os.path.join(directorio, ARCHIVO_FEATURES)
+    if not os.path.exists(ruta_modelo) or not os.path.exists(ruta_features):
+        return PredictorDesercion()
+
+    modelo = cargar_pickle(ruta_modelo)
+    ruta_scaler = os.path.join(directorio, ARCHIVO_SCALER)
+    scaler = cargar_pickle(ruta_scaler) if os.path.exists(ruta_scaler) else None
+    return PredictorDesercion(modelo, scaler, leer_features(directorio))
@@ -0,0 +1,40 @@
+"""
+Configuración común de las pruebas
+
+Las pruebas importan los módulos de src/ como paquete (desde final_project/)
+y los del dashboard por nombre, como lo hace app.py. Las que escriben datos
+trabajan sobre una copia de los CSV de data/ en un directorio temporal.
+
+Uso (desde final_project/):
+    python -m pytest -q tests
+"""
+
+import os
+import shutil
+import sys
+
+import pytest
+
+DIR_PROYECTO = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+DIR_DATOS = os.path.join(DIR_PROYECTO, 'data')
+
+for ruta in (DIR_PROYECTO, os.path.join(DIR_PROYECTO, 'dashboards')):
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+
+def copiar_datos(destino):
+    """Copia los CSV de data/processed y data/bi (sin los Arrow generados) en `destino`"""
+    for subdirectorio in ('processed', 'bi'):
+        os.makedirs(os.path.join(destino, subdirectorio))
+        origen = os.path.join(DIR_DATOS, subdirectorio)
+        for nombre in os.listdir(origen):
+            if nombre.endswith('.csv'):
+                shutil.copyfile(os.path.join(origen, nombre), os.path.join(destino, subdirectorio, nombre))
+    return str(destino)
+
+
+@pytest.fixture
+def datos(tmp_path):
+    """Copia de los datos que la prueba puede modificar"""
+    return copiar_datos(tmp_path / 'data')
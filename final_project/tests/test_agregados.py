@@ -0,0 +1,72 @@
+"""Histogramas y cajas calculados en el servidor (dashboards/agregados.py)"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agregados import cajas, intervalos
+
+
+@pytest.fixture
+def muestra():
+    generador = np.random.default_rng(11)
+    n = 5000
+    valores = np.concatenate([generador.normal(25, 6, n - 20), generador.normal(80, 5, 20)])
+    grupos = generador.choice(['PRESENCIAL', 'VIRTUAL', 'DISTANCIA'], n, p=[0.7, 0.25, 0.05])
+    valores[::97] = np.nan
+    return pd.Series(valores), pd.Series(grupos)
+
+
+def test_cajas_como_cuantiles_de_numpy(muestra):
+    valores, grupos = muestra
+
+    resultado = cajas(valores, grupos)
+
+    assert [caja.nombre for caja in resultado] == list(pd.unique(grupos))
+    for caja in resultado:
+        tramo = valores[(grupos == caja.nombre) & valores.notna()].to_numpy()
+        # La interpolación de plotly.js (posición p·n − 0.5) es el método 'hazen' de numpy
+        q1, mediana, q3 = np.quantile(tramo, [0.25, 0.5, 0.75], method='hazen')
+        assert caja.n == len(tramo)
+        assert (caja.q1, caja.mediana, caja.q3) == pytest.approx((q1, mediana, q3))
+
+        iqr = q3 - q1
+        assert caja.bigote_inferior == pytest.approx(tramo[tramo >= q1 - 1.5 * iqr].min())
+        assert caja.bigote_superior == pytest.approx(tramo[tramo <= q3 + 1.5 * iqr].max())
+        fuera = np.unique(tramo[(tramo < caja.bigote_inferior) | (tramo > caja.bigote_superior)])
+        assert caja.atipicos == pytest.approx(fuera.tolist())
+
+
+def test_cajas_acota_los_atipicos(muestra):
+    valores, grupos = muestra
+
+    for caja in cajas(valores, grupos, max_atipicos=5):
+        assert len(caja.atipicos) <= 5
+
+
+def test_intervalos_como_histograma_de_numpy(muestra):
+    valores, _ = muestra
+
+    resultado = intervalos(valores, nbins=30)
+
+    validos = valores.dropna().to_numpy()
+    bordes = resultado.inicio + resultado.ancho * np.arange(len(resultado.conteos) + 1)
+    conteos, _ = np.histogram(validos, bins=bordes)
+    assert resultado.conteos.sum() == len(validos)
+    assert resultado.conteos.tolist() == conteos.tolist()
+    assert resultado.inicio <= validos.min() and validos.max() < resultado.fin
+
+
+def test_intervalos_de_enteros_centrados(muestra):
+    edades = pd.Series(np.random.default_rng(5).integers(16, 60, 1000))
+
+    resultado = intervalos(edades, nbins=30)
+
+    # Con valores enteros los bordes quedan entre enteros (ningún valor sobre un borde)
+    assert (resultado.inicio % 1) == pytest.approx(0.5)
+    assert resultado.conteos.sum() == len(edades)
+
+
+def test_sin_valores_numericos():
+    assert intervalos(pd.Series(['a', None])) is None
+    assert cajas(pd.Series([np.nan, np.nan]), pd.Series(['x', 'y'])) == []
@@ -0,0 +1,91 @@
+"""Filtros con índices bitmap frente a máscaras de pandas (dashboards/bitmap.py)"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bitmap import IndiceBitmap
+from cubo import calcular_rango_edad
+
+FILTROS = [
+    {},
+    {'genero': 'F'},
+    {'estrato_num': [1, 2]},
+    {'rango_edad': '21-25', 'genero': 'M'},
+    {'nombre_facultad': ['INGENIERIA', 'SALUD'], 'jornada': 'DIURNA'},
+    {'modalidad': 'VIRTUAL', 'estrato_num': 3, 'rango_edad': ['16-20', '31+']},
+    {'genero': 'X'},
+    {'genero': None, 'modalidad': 'PRESENCIAL'},
+]
+
+
+def registros(n, semilla):
+    generador = np.random.default_rng(semilla)
+    estrato = pd.array(generador.integers(1, 7, n), dtype='Int8')
+    estrato[generador.random(n) < 0.1] = pd.NA
+    genero = pd.Series(generador.choice(['F', 'M'], n))
+    genero[generador.random(n) < 0.05] = None
+    return pd.DataFrame({
+        'genero': genero,
+        'estrato_num': estrato,
+        'edad': generador.integers(15, 50, n),
+        'nombre_facultad': generador.choice(['INGENIERIA', 'SALUD', 'DERECHO', 'EDUCACION'], n),
+        'modalidad': generador.choice(['PRESENCIAL', 'VIRTUAL'], n),
+        'jornada': generador.choice(['DIURNA', 'NOCTURNA'], n),
+    })
+
+
+def mascara(df, filtros):
+    """Misma selección con pandas: AND entre dimensiones, OR entre los valores de una lista"""
+    resultado = pd.Series(True, index=df.index)
+    columnas = df.assign(rango_edad=calcular_rango_edad(df['edad']))
+    for dim, valor in filtros.items():
+        if valor is None:
+            continue
+        valores = valor if isinstance(valor, list) else [valor]
+        resultado &= columnas[dim].isin(valores).fillna(False).astype(bool)
+    return resultado.to_numpy()
+
+
+@pytest.mark.parametrize('filtros', FILTROS)
+def test_seleccion_igual_a_mascara(filtros):
+    df = registros(1003, 1)
+    indice = IndiceBitmap.desde_dataset(df)
+
+    bits = indice.seleccionar(**filtros)
+
+    esperado = mascara(df, filtros)
+    assert (indice.filas(bits) == esperado).all()
+    assert indice.contar(bits) == esperado.sum()
+
+
+@pytest.mark.parametrize('filtros', FILTROS)
+def test_combinar_igual_a_concatenar(filtros):
+    partes = [registros(517, 2), registros(88, 3).drop(columns=['jornada']), registros(1, 4)]
+    combinado = IndiceBitmap.combinar(IndiceBitmap.desde_dataset(df) for df in partes)
+    df = pd.concat(partes, ignore_index=True)
+
+    bits = combinado.seleccionar(**filtros)
+
+    esperado = mascara(df, filtros)
+    assert combinado.n_filas == len(df)
+    assert (combinado.filas(bits) == esperado).all()
+    assert combinado.contar(bits) == esperado.sum()
+
+
+def test_valores_en_orden_de_aparicion():
+    df = registros(300, 5)
+    indice = IndiceBitmap.desde_dataset(df)
+
+    for dim in ('genero', 'nombre_facultad', 'estrato_num'):
+        assert indice.valores(dim) == [int(v) if dim == 'estrato_num' else v for v in df[dim].dropna().unique()]
+
+
+def test_tablas_ida_y_vuelta():
+    df = registros(1003, 6)
+    indice = IndiceBitmap.desde_dataset(df)
+
+    copia = IndiceBitmap.desde_tablas(len(df), indice.tablas())
+
+    for filtros in FILTROS:
+        assert (copia.seleccionar(**filtros) == indice.seleccionar(**filtros)).all()
@@ -0,0 +1,38 @@
+"""Claves de la caché de figuras (dashboards/cache_figuras.py)"""
+
+from cache_figuras import SalidaParcial, clave_figura, crear_cache
+
+VERSION = ('v1',)
+
+
+def test_seleccion_de_datasets_sin_orden_ni_duplicados():
+    a = clave_figura('tab', ['tab-overview', ['sena', 'academica']], VERSION, conjuntos=(1,))
+    b = clave_figura('tab', ['tab-overview', ['academica', 'sena', 'sena']], VERSION, conjuntos=(1,))
+    assert a == b
+
+
+def test_entradas_posicionales_conservan_su_orden():
+    # Dos filtros escalares intercambiados son entradas distintas
+    a = clave_figura('tab', ['tab-demografico', ['academica'], 'M', 'all', '1'], VERSION, conjuntos=(1,))
+    b = clave_figura('tab', ['tab-demografico', ['academica'], 'all', 'M', '1'], VERSION, conjuntos=(1,))
+    assert a != b
+
+
+def test_listas_fuera_de_la_seleccion_conservan_su_orden():
+    a = clave_figura('tab', ['tab-academico', ['academica'], ['A', 'B']], VERSION, conjuntos=(1,))
+    b = clave_figura('tab', ['tab-academico', ['academica'], ['B', 'A']], VERSION, conjuntos=(1,))
+    assert a != b
+
+
+def test_salida_parcial_no_se_guarda():
+    cache = crear_cache(lambda *args: VERSION)
+    llamadas = []
+
+    @cache.memorizar('tab', conjuntos=(1,))
+    def callback(tab, datasets):
+        llamadas.append(tab)
+        return SalidaParcial([{}, {}], errores=1) if tab == 'falla' else [{}, {}]
+
+    for tab in ('falla', 'falla', 'ok', 'ok'):
+        assert callback(tab, ['academica']) == [{}, {}]
+    assert llamadas == ['falla', 'falla', 'ok']
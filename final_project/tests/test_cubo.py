@@ -0,0 +1,109 @@
+"""Conteos del cubo frente a pandas sobre los registros (dashboards/cubo.py)"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cubo import CuboConteos, calcular_rango_edad
+
+TIPO_ORIGEN = pd.CategoricalDtype(['Académica', 'No académica'])
+
+# Valores de cada filtro de los gráficos; se prueban todas sus combinaciones
+VALORES_FILTRO = {
+    'genero': [None, 'F', 'M', 'X'],
+    'modalidad': [None, 'PRESENCIAL', ['VIRTUAL', 'DISTANCIA']],
+    'estrato_num': [None, 3, [1, 2]],
+    'rango_edad': [None, '16-20', ['26-30', '31+']],
+}
+COMBINACIONES = [dict(zip(VALORES_FILTRO, valores)) for valores in itertools.product(*VALORES_FILTRO.values())]
+AGRUPACIONES = ['genero', 'periodo_año', 'rango_edad', ['periodo_año', 'modalidad'], ['nombre_facultad', 'genero']]
+
+
+def registros(n, semilla, jornada=True):
+    generador = np.random.default_rng(semilla)
+    estrato = pd.array(generador.integers(1, 7, n), dtype='Int8')
+    estrato[generador.random(n) < 0.1] = pd.NA
+    genero = pd.Series(generador.choice(['F', 'M'], n))
+    genero[generador.random(n) < 0.05] = None
+    df = pd.DataFrame({
+        'periodo_año': generador.integers(2019, 2025, n),
+        'genero': genero,
+        'modalidad': pd.Categorical(generador.choice(['PRESENCIAL', 'VIRTUAL', 'DISTANCIA'], n)),
+        'nombre_facultad': generador.choice(['INGENIERIA', 'SALUD', 'DERECHO'], n),
+        'estrato_num': estrato,
+        'edad': generador.integers(14, 50, n),
+    })
+    if jornada:
+        df['jornada'] = generador.choice(['DIURNA', 'NOCTURNA'], n)
+    return df
+
+
+@pytest.fixture(scope='module')
+def fuentes():
+    return {'Académica': registros(4000, 1), 'No académica': registros(2500, 2, jornada=False)}
+
+
+@pytest.fixture(scope='module')
+def cubo(fuentes):
+    return CuboConteos.combinar(
+        CuboConteos.desde_dataset(df, origen, TIPO_ORIGEN) for origen, df in fuentes.items()
+    )
+
+
+@pytest.fixture(scope='module')
+def crudo(fuentes):
+    """Registros concatenados, con el origen y el rango de edad como columnas"""
+    partes = [df.assign(dataset_origen=origen) for origen, df in fuentes.items()]
+    df = pd.concat(partes, ignore_index=True)
+    df['rango_edad'] = calcular_rango_edad(df['edad'])
+    return df
+
+
+def filtrar(df, filtros):
+    """Misma selección con máscaras de pandas: valor, lista de valores o None (sin filtro)"""
+    mascara = pd.Series(True, index=df.index)
+    for dim, valor in filtros.items():
+        if valor is None:
+            continue
+        valores = valor if isinstance(valor, list) else [valor]
+        mascara &= df[dim].isin(valores).fillna(False).astype(bool)
+    return df[mascara]
+
+
+def como_dict(conteos):
+    """Conteos mayores que cero por valor (o tupla de valores), sin depender del tipo del índice"""
+    return {clave: int(valor) for clave, valor in conteos.items() if valor > 0}
+
+
+@pytest.mark.parametrize('filtros', COMBINACIONES, ids=repr)
+def test_total_como_mascara(cubo, crudo, filtros):
+    assert cubo.total(**filtros) == len(filtrar(crudo, filtros))
+
+
+@pytest.mark.parametrize('filtros', COMBINACIONES, ids=repr)
+def test_contar_como_value_counts_y_crosstab(cubo, crudo, filtros):
+    seleccion = filtrar(crudo, filtros)
+
+    for por in AGRUPACIONES:
+        if isinstance(por, list):
+            esperado = pd.crosstab(seleccion[por[0]], seleccion[por[1]]).stack()
+        else:
+            esperado = seleccion[por].value_counts()
+        assert como_dict(cubo.contar(por, **filtros)) == como_dict(esperado), por
+
+
+def test_dimension_ausente_solo_cuenta_su_dataset(cubo, fuentes):
+    # El dataset sin jornada no aparece al agrupar ni al filtrar por ella
+    assert cubo.contar('jornada').sum() == len(fuentes['Académica'])
+    assert cubo.total(jornada='DIURNA', dataset_origen='No académica') == 0
+    assert cubo.total(dataset_origen='No académica') == len(fuentes['No académica'])
+
+
+def test_tablas_conservan_los_conteos(cubo, crudo):
+    copia = CuboConteos.desde_tablas(cubo.tablas())
+
+    assert copia.columnas == cubo.columnas
+    for filtros in COMBINACIONES[:12]:
+        assert copia.total(**filtros) == len(filtrar(crudo, filtros))
@@ -0,0 +1,161 @@
+"""Reconstrucción incremental del modelo estrella (src/data/estrella.py)"""
+
+import os
+
+import pandas as pd
+
+from src.data import estrella
+from src.data.estrella import ARCHIVOS, construir_estrella, verificar_integridad
+
+BLOQUE = 500
+MODIFICADO = 'PRIMER SEMESTRE DE 2023'
+NUEVO = 'PRIMER SEMESTRE DE 2026'
+
+
+def leer(datos, tabla):
+    return pd.read_csv(os.path.join(datos, ARCHIVOS[tabla]), dtype={'periodo': str})
+
+
+def escribir_academica(datos, df):
+    df.to_csv(os.path.join(datos, ARCHIVOS['academica']), index=False)
+
+
+def hechos_por_periodo(datos):
+    """fact_desercion con el periodo de cada hecho (según dim_tiempo)"""
+    tiempo = leer(datos, 'dim_tiempo')
+    return leer(datos, 'fact').merge(tiempo[['id_tiempo', 'periodo']], on='id_tiempo', how='left')
+
+
+def test_construir_y_verificar(datos):
+    resultado = construir_estrella(datos, bloque=BLOQUE, forzar=True)
+
+    academica = leer(datos, 'academica')
+    assert resultado['filas'] == len(academica)
+    assert sorted(resultado['cambiadas']) == sorted(academica['periodo'].dropna().unique())
+    assert len(leer(datos, 'fact')) == len(leer(datos, 'dim_estudiante')) == len(academica)
+    assert verificar_integridad(datos, bloque=BLOQUE) == []
+
+
+def test_sin_cambios_no_recalcula(datos):
+    construir_estrella(datos, bloque=BLOQUE, forzar=True)
+    hechos = leer(datos, 'fact')
+
+    resultado = construir_estrella(datos, bloque=BLOQUE)
+
+    assert resultado['cambiadas'] == [] and resultado['eliminadas'] == []
+    pd.testing.assert_frame_equal(leer(datos, 'fact'), hechos)
+
+
+def test_cambio_de_una_particion(datos):
+    construir_estrella(datos, bloque=BLOQUE, forzar=True)
+    antes = hechos_por_periodo(datos)
+
+    academica = leer(datos, 'academica')
+    filas = academica.index[academica['periodo'] == MODIFICADO]
+    cambiadas = filas[:5]
+    academica.loc[cambiadas, 'edad'] = academica.loc[cambiadas, 'edad'] + 1
+    escribir_academica(datos, academica)
+
+    resultado = construir_estrella(datos, bloque=BLOQUE)
+    despues = hechos_por_periodo(datos)
+
+    assert resultado['cambiadas'] == [MODIFICADO]
+    # Las demás particiones no cambian, ni siquiera sus ids
+    otras_antes = antes[antes['periodo'] != MODIFICADO].reset_index(drop=True)
+    otras_despues = despues[despues['periodo'] != MODIFICADO].reset_index(drop=True)
+    pd.testing.assert_frame_equal(otras_despues, otras_antes)
+
+    # En la partición cambiada, los registros iguales conservan su id y los cambiados reciben uno nuevo
+    ids_antes = antes.loc[antes['periodo'] == MODIFICADO, 'id_hecho'].to_numpy()
+    ids_despues = despues.loc[despues['periodo'] == MODIFICADO, 'id_hecho'].to_numpy()
+    posiciones = filas.get_indexer(cambiadas)
+    iguales = [i for i in range(len(filas)) if i not in set(posiciones)]
+    assert (ids_despues[iguales] == ids_antes[iguales]).all()
+    assert (ids_despues[posiciones] > antes['id_hecho'].max()).all()
+    assert verificar_integridad(datos, bloque=BLOQUE) == []
+
+
+def test_semestre_nuevo(datos):
+    construir_estrella(datos, bloque=BLOQUE, forzar=True)
+    antes = hechos_por_periodo(datos)
+    tiempo_antes = leer(datos, 'dim_tiempo')
+
+    academica = leer(datos, 'academica')
+    semestre = academica[academica['periodo'] == 'PRIMER SEMESTRE DE 2025'].head(50)
+    semestre = semestre.assign(periodo=NUEVO, periodo_año=2026.0)
+    escribir_academica(datos, pd.concat([academica, semestre], ignore_index=True))
+
+    resultado = construir_estrella(datos, bloque=BLOQUE)
+    despues = hechos_por_periodo(datos)
+    tiempo_despues = leer(datos, 'dim_tiempo')
+
+    assert resultado['cambiadas'] == [NUEVO]
+    # Los periodos conocidos conservan su id_tiempo y el nuevo recibe el siguiente
+    conocidos = tiempo_despues.merge(tiempo_antes, on='periodo', suffixes=('', '_antes'))
+    assert (conocidos['id_tiempo'] == conocidos['id_tiempo_antes']).all()
+    assert tiempo_despues.loc[tiempo_despues['periodo'] == NUEVO, 'id_tiempo'].item() == tiempo_antes['id_tiempo'].max() + 1
+
+    pd.testing.assert_frame_equal(despues[despues['periodo'] != NUEVO].reset_index(drop=True), antes)
+    nuevos = despues[despues['periodo'] == NUEVO]
+    assert len(nuevos) == len(semestre)
+    assert nuevos['id_hecho'].min() > antes['id_hecho'].max()
+    assert verificar_integridad(datos, bloque=BLOQUE) == []
+
+
+def espiar_lecturas(monkeypatch):
+    """Archivo y byte inicial de cada lectura de un CSV procesado"""
+    lecturas = []
+    leer_original = estrella._leer
+
+    def leer_espiado(ruta, bloque, desde=0, **kwargs):
+        lecturas.append((os.path.basename(ruta), desde))
+        return leer_original(ruta, bloque, desde, **kwargs)
+
+    monkeypatch.setattr(estrella, '_leer', leer_espiado)
+    return lecturas
+
+
+def test_filas_agregadas_solo_lee_lo_nuevo(datos, monkeypatch):
+    construir_estrella(datos, bloque=BLOQUE, forzar=True)
+    ruta = os.path.join(datos, ARCHIVOS['academica'])
+    academica = pd.read_csv(ruta, dtype=str)
+    semestre = academica[academica['periodo'] == 'PRIMER SEMESTRE DE 2025'].head(50).assign(periodo=NUEVO)
+    semestre.to_csv(ruta, mode='a', header=False, index=False)
+    lecturas = espiar_lecturas(monkeypatch)
+
+    resultado = construir_estrella(datos, bloque=BLOQUE)
+
+    assert resultado['cambiadas'] == [NUEVO]
+    # Ni las otras fuentes ni las filas ya conocidas se vuelven a leer
+    assert [archivo for archivo, _ in lecturas] == [os.path.basename(ruta)]
+    assert all(desde > 0 for _, desde in lecturas)
+
+    incremental = {tabla: leer(datos, tabla) for tabla in estrella.TABLAS_PUBLICADAS}
+    monkeypatch.undo()
+    construir_estrella(datos, bloque=BLOQUE, forzar=True)
+    for tabla, df in incremental.items():
+        pd.testing.assert_frame_equal(df, leer(datos, tabla))
+
+
+def test_solo_se_lee_la_fuente_cambiada(datos, monkeypatch):
+    construir_estrella(datos, bloque=BLOQUE, forzar=True)
+    ruta = os.path.join(datos, ARCHIVOS['no_academica'])
+    pd.read_csv(ruta, dtype=str).iloc[:-1].to_csv(ruta, index=False)
+    lecturas = espiar_lecturas(monkeypatch)
+
+    resultado = construir_estrella(datos, bloque=BLOQUE)
+
+    assert resultado['cambiadas'] == []
+    assert {archivo for archivo, _ in lecturas} == {os.path.basename(ruta)}
+    assert verificar_integridad(datos, bloque=BLOQUE) == []
+
+
+def test_verificar_integridad_detecta_huerfanos(datos):
+    construir_estrella(datos, bloque=BLOQUE, forzar=True)
+    hechos = leer(datos, 'fact')
+    hechos.loc[:2, 'id_programa'] = hechos['id_programa'].max() + 1000
+    hechos.to_csv(os.path.join(datos, ARCHIVOS['fact']), index=False)
+
+    problemas = verificar_integridad(datos, bloque=BLOQUE)
+
+    assert any('id_programa inexistente' in problema for problema in problemas)
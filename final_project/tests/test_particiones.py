@@ -0,0 +1,82 @@
+"""Lectura por rango de años con poda de particiones (src/data/particiones.py)"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from src.data import particiones
+from src.data.columnar import leer_tabla
+from src.data.estrella import construir_estrella
+from src.data.particiones import ARCHIVOS, construir, filtrar_rango, leer_manifiesto, leer_rango, podar
+
+from conftest import copiar_datos
+
+RANGOS = [(2022, 2023), (None, 2021), (2024, None), (2023, 2023), (2030, None)]
+
+
+def plano(datos, nombre, desde, hasta):
+    """Resultado de la ruta sin particiones: el archivo plano filtrado"""
+    return filtrar_rango(leer_tabla(os.path.join(datos, ARCHIVOS[nombre])), nombre, desde, hasta, datos)
+
+
+def comparar(obtenido, esperado):
+    assert list(obtenido.columns) == list(esperado.columns)
+    pd.testing.assert_frame_equal(
+        obtenido.reset_index(drop=True), esperado.reset_index(drop=True), check_dtype=False, check_index_type=False
+    )
+
+
+def particionar(datos):
+    construir_estrella(datos, bloque=1000)
+    construir(datos)
+    return datos
+
+
+@pytest.fixture(scope='module')
+def particionados(tmp_path_factory):
+    """Datos con el modelo estrella y las particiones construidos (solo lectura)"""
+    return particionar(copiar_datos(tmp_path_factory.mktemp('particionados') / 'data'))
+
+
+@pytest.mark.parametrize('nombre', ['academica', 'no_academica', 'fact'])
+@pytest.mark.parametrize('desde,hasta', RANGOS)
+def test_igual_al_archivo_plano(particionados, monkeypatch, nombre, desde, hasta):
+    esperado = plano(particionados, nombre, desde, hasta)
+    # Con la tabla particionada al día no se lee el archivo plano
+    monkeypatch.setattr(particiones, 'leer_tabla', lambda ruta: pytest.fail(f"se leyó {ruta}"))
+
+    comparar(leer_rango(nombre, desde, hasta, datos=particionados), esperado)
+
+
+def test_poda_lee_solo_las_particiones_del_rango(particionados, monkeypatch):
+    leidas = []
+    original = particiones._leer_particiones
+    monkeypatch.setattr(
+        particiones, '_leer_particiones', lambda d, seleccion: leidas.extend(seleccion) or original(d, seleccion)
+    )
+
+    leer_rango('academica', 2022, 2023, datos=particionados)
+
+    todas = leer_manifiesto(particionados)['academica']['particiones']
+    assert {p['periodo_año'] for p in leidas} == {2022, 2023}
+    assert len(leidas) < len(todas)
+    assert podar(todas) == todas
+    assert all(p['periodo_año'] is not None for p in podar(todas, 2000, None))
+
+
+def test_tabla_desactualizada_lee_el_archivo_plano(datos):
+    particionados = particionar(datos)
+    ruta = os.path.join(particionados, ARCHIVOS['academica'])
+    academica = pd.read_csv(ruta)
+    academica.loc[academica['periodo_año'] == 2022, 'edad'] += 1
+    academica.to_csv(ruta, index=False)
+
+    obtenido = leer_rango('academica', 2022, 2022, datos=particionados)
+
+    comparar(obtenido, plano(particionados, 'academica', 2022, 2022))
+    assert obtenido['edad'].sum() == academica.loc[academica['periodo_año'] == 2022, 'edad'].sum()
+
+
+def test_sin_rango_lee_la_tabla_completa(particionados):
+    comparar(leer_rango('academica', datos=particionados), leer_tabla(os.path.join(particionados, ARCHIVOS['academica'])))
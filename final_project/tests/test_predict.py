@@ -0,0 +1,161 @@
+"""Predicción de riesgo de deserción (src/models/predict.py)"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.predict import (
+    ARCHIVO_FEATURES,
+    DIR_MODELOS,
+    PredictorDesercion,
+    cargar_predictor,
+    clasificar_nivel,
+    leer_features,
+    score_heuristico,
+)
+
+def prediccion_base(edad, genero, estrato, modalidad, jornada):
+    """Reglas del callback realizar_prediccion original, estudiante por estudiante"""
+    score = 0
+    if estrato <= 2:
+        score += 30
+    if modalidad in ['VIRTUAL', 'DISTANCIA']:
+        score += 25
+    if edad < 18 or edad > 30:
+        score += 20
+    if jornada == 'NOCTURNA':
+        score += 15
+    if genero == 'M':
+        score += 5
+    probabilidad = min(score, 100) / 100
+    return probabilidad, nivel_base(probabilidad)
+
+
+def nivel_base(probabilidad):
+    """Umbrales de nivel del callback realizar_prediccion original"""
+    if probabilidad < 0.3:
+        return "BAJO"
+    elif probabilidad < 0.5:
+        return "MEDIO"
+    elif probabilidad < 0.7:
+        return "ALTO"
+    return "CRÍTICO"
+
+
+@pytest.fixture
+def cohorte():
+    """Todas las combinaciones de los valores que cambian alguna regla"""
+    combinaciones = itertools.product(
+        [15, 17, 18, 30, 31, 45], ['F', 'M'], [1, 2, 3, 6],
+        ['PRESENCIAL', 'VIRTUAL', 'DISTANCIA'], ['DIURNA', 'NOCTURNA', 'EXTENDIDA'],
+    )
+    return pd.DataFrame(combinaciones, columns=['edad', 'genero', 'estrato_num', 'modalidad', 'jornada'])
+
+
+class ModeloFijo:
+    """Modelo de prueba: guarda la matriz que recibe y responde una probabilidad fija"""
+
+    def __init__(self, probabilidad=0.5):
+        self.probabilidad = probabilidad
+        self.matrices = []
+
+    def predict_proba(self, X):
+        self.matrices.append(np.asarray(X))
+        return np.column_stack([np.full(len(X), 1 - self.probabilidad), np.full(len(X), self.probabilidad)])
+
+
+def scaler_ajustado(features):
+    """Scaler ajustado sobre una matriz aleatoria con las columnas del modelo"""
+    preprocesamiento = pytest.importorskip('sklearn.preprocessing')
+    generador = np.random.default_rng(5)
+    matriz = pd.DataFrame(generador.uniform(0, 1, (200, len(features))), columns=features)
+    matriz['edad'] = generador.uniform(16, 50, 200)
+    matriz['estrato_num'] = generador.uniform(1, 6, 200)
+    matriz['periodo_año'] = generador.integers(2018, 2025, 200)
+    return preprocesamiento.StandardScaler().fit(matriz)
+
+
+def test_features_en_el_orden_de_features_csv():
+    features = leer_features()
+    predictor = PredictorDesercion(ModeloFijo(), features=features)
+
+    X = predictor.construir_features({
+        'edad': 35, 'genero': ' m ', 'estrato_num': 2, 'modalidad': 'virtual',
+        'jornada': 'DIURNA - NOCTURA', 'periodo_año': 2024, 'periodo_semestre': 1,
+    })
+
+    assert list(X.columns) == features
+    fila = X.iloc[0]
+    esperado = {
+        'edad': 35, 'estrato_num': 2, 'periodo_año': 2024, 'periodo_semestre': 1,
+        'edad_fuera_rango': 1, 'es_virtual': 1, 'estrato_bajo': 1, 'genero_M': 1,
+        'modalidad_PRESENCIAL': 0, 'modalidad_VIRTUAL': 1, 'jornada_DIURNA - NOCTURA': 1,
+        'jornada_EXTENDIDA': 0, 'jornada_NOCTURNA': 0, 'jornada_OTRA': 0,
+    }
+    assert fila.to_dict() == esperado
+
+
+def test_el_modelo_recibe_la_matriz_escalada_en_orden(cohorte):
+    features = leer_features()
+    scaler = scaler_ajustado(features)
+    modelo = ModeloFijo(0.55)
+    predictor = PredictorDesercion(modelo, scaler, features)
+
+    resultado = predictor.predecir(cohorte)
+
+    esperado = scaler.transform(predictor.construir_features(cohorte))
+    np.testing.assert_allclose(modelo.matrices[-1], esperado)
+    assert (resultado['nivel_riesgo'] == 'ALTO').all()
+    assert resultado.index.equals(cohorte.index)
+
+
+def test_faltantes_e_invalidos_se_imputan_con_la_media():
+    features = leer_features()
+    scaler = scaler_ajustado(features)
+    predictor = PredictorDesercion(ModeloFijo(), scaler, features)
+    medias = dict(zip(features, scaler.mean_))
+
+    # Edad no numérica, sin estrato ni periodo
+    X = predictor.construir_features([
+        {'edad': 'sin dato', 'genero': 'F', 'modalidad': 'PRESENCIAL', 'jornada': 'NOCTURNA'},
+        {'edad': None, 'genero': None, 'modalidad': None, 'jornada': None},
+    ])
+
+    for columna in ('edad', 'estrato_num', 'periodo_año', 'periodo_semestre'):
+        assert X[columna].tolist() == pytest.approx([medias[columna]] * 2)
+    # estrato_bajo se deriva del estrato ya imputado, como en el entrenamiento
+    assert X['estrato_bajo'].tolist() == [float(medias['estrato_num'] <= 2)] * 2
+    assert not X.isna().any().any()
+    # Escaladas, las columnas imputadas quedan en 0 (valor neutro para el modelo)
+    escalada = pd.DataFrame(scaler.transform(X), columns=features)
+    assert np.abs(escalada[['edad', 'estrato_num', 'periodo_año', 'periodo_semestre']].to_numpy()).max() < 1e-9
+    # Una categórica nula no enciende ninguna columna one-hot
+    assert X.loc[1, ['genero_M', 'modalidad_PRESENCIAL', 'modalidad_VIRTUAL', 'jornada_NOCTURNA']].sum() == 0
+
+
+def test_sin_modelo_usa_el_score_heuristico(tmp_path, cohorte):
+    # Solo features.csv: sin .pkl el predictor no usa modelo
+    (tmp_path / ARCHIVO_FEATURES).write_text('features\nedad\n', encoding='utf-8')
+    for directorio in (str(tmp_path), DIR_MODELOS):
+        predictor = cargar_predictor(directorio)
+        assert not predictor.usa_modelo
+
+        resultado = predictor.predecir(cohorte)
+
+        esperado = [prediccion_base(*fila) for fila in cohorte.itertuples(index=False)]
+        assert resultado['probabilidad'].tolist() == pytest.approx([p for p, _ in esperado])
+        assert resultado['nivel_riesgo'].tolist() == [nivel for _, nivel in esperado]
+
+
+def test_score_heuristico_acepta_estrato_y_un_estudiante():
+    estudiante = {'edad': 17, 'genero': 'M', 'estrato': 1, 'modalidad': 'DISTANCIA', 'jornada': 'NOCTURNA'}
+
+    assert score_heuristico(pd.DataFrame([estudiante])).tolist() == pytest.approx([0.95])
+    assert PredictorDesercion().predecir(estudiante)['nivel_riesgo'].tolist() == ['CRÍTICO']
+
+
+@pytest.mark.parametrize('probabilidad', [0.0, 0.29, 0.3, 0.49, 0.5, 0.5000001, 0.69, 0.7, 0.95, 1.0])
+def test_niveles_como_realizar_prediccion(probabilidad):
+    assert clasificar_nivel([probabilidad]).tolist() == [nivel_base(probabilidad)]
@@ -0,0 +1,75 @@
+"""Registro perezoso de datos con fuentes faltantes (dashboards/registro.py)"""
+
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from registro import RegistroDatos
+
+
+def crear_registro(llamadas):
+    """Registro con un grupo de procesados al que le falta la fuente 'sena'"""
+    def cargar_procesados():
+        llamadas.append('procesados')
+        time.sleep(0.05)
+        # Como cargar_procesados del dashboard: una fuente sin archivo se omite
+        return {'academica': pd.DataFrame({'edad': [20, 30]}), 'no_academica': pd.DataFrame()}
+
+    def cargar_kpis():
+        raise FileNotFoundError('kpis_principales.csv')
+
+    registro = RegistroDatos({'version': 'v1'})
+    registro.registrar('procesados', ['academica', 'no_academica', 'sena'], cargar_procesados)
+    registro.registrar('kpis', ['kpis'], cargar_kpis)
+    return registro
+
+
+def test_fuente_faltante_no_impide_las_demas():
+    registro = crear_registro([])
+
+    assert len(registro['academica']) == 2
+    assert registro.get('sena') is None
+    assert 'sena' not in registro
+    with pytest.raises(KeyError):
+        registro['sena']
+    assert registro.cargado('procesados')
+
+
+def test_claves_sin_cargar():
+    llamadas = []
+    registro = crear_registro(llamadas)
+
+    assert {'version', 'academica', 'sena', 'kpis'} <= set(registro)
+    assert llamadas == []
+    registro.cargar('procesados')
+    # Una vez cargado el grupo, la fuente que faltó deja de listarse
+    assert 'sena' not in set(registro) and 'academica' in set(registro)
+
+
+def test_grupo_se_carga_una_vez_con_hilos_concurrentes():
+    llamadas = []
+    registro = crear_registro(llamadas)
+
+    hilos = [threading.Thread(target=registro.get, args=('academica',)) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert llamadas == ['procesados']
+
+
+def test_precargar_continua_tras_un_error(capsys):
+    llamadas = []
+    registro = crear_registro(llamadas)
+
+    registro.precargar(['kpis', 'procesados'])
+
+    assert llamadas == ['procesados']
+    assert not registro.cargado('kpis')
+    # El grupo que falló se reintenta en el siguiente acceso
+    with pytest.raises(FileNotFoundError):
+        registro['kpis']
+    assert 'Error precargando kpis' in capsys.readouterr().out
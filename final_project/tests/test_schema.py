@@ -0,0 +1,87 @@
+"""Esquema compacto y diccionarios compartidos (src/data/schema.py)"""
+
+import pandas as pd
+
+from src.data.schema import aplicar_esquemas, alinear_columnas, construir_diccionarios
+
+
+def fuentes():
+    """Fuentes crudas como las leen los CSV: texto, enteros como float y columnas propias de cada una"""
+    return {
+        'academica': pd.DataFrame({
+            'genero': ['F', 'M', None, 'F'],
+            'jornada': ['DIURNA', 'NOCTURNA', 'DIURNA', None],
+            'modalidad': ['PRESENCIAL', 'PRESENCIAL', 'VIRTUAL', 'PRESENCIAL'],
+            'estrato': ['1', '3', None, '6'],
+            'edad': [19.0, 24.0, None, 31.0],
+            'periodo_año': [2020.0, 2021.0, 2021.0, 2022.0],
+        }),
+        'no_academica': pd.DataFrame({
+            'jornada': ['EXTENDIDA', 'DIURNA'],
+            'modalidad': pd.Categorical(['DISTANCIA', 'PRESENCIAL']),
+            'no_estudiantes': [120.0, 45.0],
+            'periodo_año': [2020.0, 2023.0],
+        }),
+        'sena': pd.DataFrame({
+            'genero': ['M', 'X'],
+            'jornada': ['MIXTA', 'DIURNA'],
+            'estrato': ['2', '4'],
+            'periodo_año': [2021.0, 2022.0],
+        }),
+    }
+
+
+def test_diccionarios_unen_las_categorias_de_todas_las_fuentes():
+    diccionarios = construir_diccionarios(fuentes())
+
+    assert list(diccionarios['jornada'].categories) == ['DIURNA', 'EXTENDIDA', 'MIXTA', 'NOCTURNA']
+    assert list(diccionarios['genero'].categories) == ['F', 'M', 'X']
+    assert list(diccionarios['estrato'].categories) == ['1', '2', '3', '4', '6']
+    assert list(diccionarios['modalidad'].categories) == ['DISTANCIA', 'PRESENCIAL', 'VIRTUAL']
+
+
+def test_esquema_usa_el_mismo_diccionario_en_cada_fuente():
+    crudas = fuentes()
+    tipadas = aplicar_esquemas(crudas)
+    diccionarios = construir_diccionarios(crudas)
+
+    for nombre, df in tipadas.items():
+        for col, tipo in diccionarios.items():
+            if col in df.columns:
+                assert df[col].dtype == tipo, (nombre, col)
+                # Mismos valores que el texto original
+                original = crudas[nombre][col]
+                assert df[col].isna().tolist() == original.isna().tolist()
+    assert tipadas['academica']['edad'].dtype == 'Int8'
+    assert tipadas['academica']['estrato_num'].tolist()[:2] == [1, 3]
+    assert tipadas['no_academica']['periodo_año'].dtype == 'Int16'
+
+
+def test_concatenar_alineadas_conserva_categorias_y_codigos():
+    tipadas = aplicar_esquemas(fuentes())
+    diccionarios = construir_diccionarios(fuentes())
+
+    combinado = pd.concat(alinear_columnas(list(tipadas.values())), ignore_index=True)
+
+    for col, tipo in diccionarios.items():
+        # Columnas presentes solo en algunas fuentes también conservan el diccionario
+        assert combinado[col].dtype == tipo, col
+    partes = list(tipadas.values())
+    for col in ('jornada', 'genero', 'modalidad'):
+        # Los códigos del combinado son los de cada fuente, uno tras otro (nulos donde faltaba la columna)
+        esperado = pd.concat(
+            [df[col] if col in df.columns else pd.Series(index=df.index, dtype=diccionarios[col]) for df in partes],
+            ignore_index=True,
+        )
+        assert combinado[col].cat.codes.tolist() == esperado.cat.codes.tolist()
+    assert combinado['edad'].dtype == 'Int8' and combinado['edad'].isna().sum() == 1 + 2 + 2
+    assert combinado['no_estudiantes'].dtype == 'Int32'
+
+
+def test_alinear_no_modifica_dataframes_completos():
+    a = pd.DataFrame({'x': [1, 2]})
+    b = pd.DataFrame({'x': [3]})
+
+    alineados = alinear_columnas([a, b])
+
+    assert alineados[0] is a and alineados[1] is b
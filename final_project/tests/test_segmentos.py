@@ -0,0 +1,63 @@
+"""Segmentos compartidos de tablas (src/data/segmentos.py)"""
+
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.segmentos import AlmacenSegmentos, fcntl
+
+
+def tablas():
+    return {
+        'registros': pd.DataFrame({
+            'genero': pd.Categorical(['F', 'M', 'F']),
+            'edad': pd.array([20, None, 31], dtype='Int16'),
+            'score': np.array([0.1, 0.5, 0.9]),
+            'sede': ['TUNJA', 'DUITAMA', 'TUNJA'],
+        }),
+    }
+
+
+def test_publicar_y_adjuntar(tmp_path):
+    almacen = AlmacenSegmentos(str(tmp_path))
+
+    adjuntas = almacen.obtener('procesados', 'a', tablas)
+
+    esperado = tablas()['registros'].astype({'sede': 'category'})
+    pd.testing.assert_frame_equal(adjuntas['registros'], esperado)
+
+
+def test_retirar_conserva_la_anterior(tmp_path):
+    almacen = AlmacenSegmentos(str(tmp_path))
+    for firma in ('a', 'b', 'c'):
+        almacen.obtener('procesados', firma, tablas)
+        # El orden de retiro es por fecha de modificación
+        time.sleep(0.01)
+
+    assert not almacen.existe('procesados-a')
+    assert almacen.existe('procesados-b') and almacen.existe('procesados-c')
+
+
+@pytest.mark.skipif(fcntl is None, reason="flock solo existe en POSIX")
+def test_retirar_espera_a_quien_adjunta(tmp_path):
+    almacen = AlmacenSegmentos(str(tmp_path), conservar=1)
+    almacen.obtener('procesados', 'a', tablas)
+    retirada = threading.Event()
+
+    def publicar_nueva():
+        almacen.obtener('procesados', 'b', tablas)
+        retirada.set()
+
+    with almacen.bloqueo():
+        hilo = threading.Thread(target=publicar_nueva)
+        hilo.start()
+        # Mientras se adjunta, la generación anterior no se borra
+        assert not retirada.wait(0.3)
+        assert os.path.exists(os.path.join(str(tmp_path), 'procesados-a'))
+    hilo.join(5)
+
+    assert retirada.is_set() and not almacen.existe('procesados-a')
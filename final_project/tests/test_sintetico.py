@@ -0,0 +1,39 @@
+"""Determinismo del generador de datos sintéticos (src/data/sintetico.py)"""
+
+import os
+
+import pytest
+
+from src.data.sintetico import ARCHIVOS, generar_datos
+
+FILAS = {'academica': 700, 'no_academica': 300}
+GENERADOS = ['academica', 'no_academica', 'dim_estudiante', 'fact', 'kpis']
+
+
+def contenido(destino):
+    resultado = {}
+    for nombre in GENERADOS:
+        with open(os.path.join(destino, ARCHIVOS[nombre]), 'rb') as archivo:
+            resultado[nombre] = archivo.read()
+    return resultado
+
+
+@pytest.fixture(scope='module')
+def referencia(tmp_path_factory):
+    destino = tmp_path_factory.mktemp('sintetico_1000')
+    generar_datos(str(destino), filas=FILAS, semilla=3, bloque=1000)
+    return contenido(destino)
+
+
+@pytest.mark.parametrize('bloque', [64, 700])
+def test_misma_semilla_con_cualquier_bloque(tmp_path, referencia, bloque):
+    filas = generar_datos(str(tmp_path), filas=FILAS, semilla=3, bloque=bloque)
+
+    assert filas['academica'] == filas['dim_estudiante'] == filas['fact'] == FILAS['academica']
+    assert contenido(tmp_path) == referencia
+
+
+def test_otra_semilla_genera_otros_datos(tmp_path, referencia):
+    generar_datos(str(tmp_path), filas=FILAS, semilla=4, bloque=1000)
+
+    assert contenido(tmp_path)['academica'] != referencia['academica']